@@ -1,194 +1,34 @@
 import pygame
-import os
+import copy
 import random
+from functools import partial
+import assets
+import game_table
+from ai_worker import AI_DECISION, AIWorker
+from animation import Bounce, CardMove, Fade, Pause, Timeline
+from dirty_rects import DirtyRenderer
 from end_screen import show_winning_screen
-pygame.init()
+from hand_solver import best_discard
+from notty_engine import has_room, new_game_seed, take_card
+from card_groups import GroupTracker, HandBits
+from card_knowledge import CardKnowledge
+from notty_cards import CollectionOfCards, Deck, cards_of, create_deck
 
 
 # Constants and Configuration
-CARD_IMAGES = "card_images/"
-GAME_IMAGES = "game_images/"
-CARD_BACK_IMAGE_PATH = os.path.join(GAME_IMAGES, "card_back.png")
+MAX_DRAW_PER_TURN = 3
+SHUFFLE_TIME = 1400  # Milliseconds the deck bounces for while shuffling
+BACKGROUND_COLOR = (15, 20, 45)
+# Print what check_hand_validity finds on every check
+DEBUG_GROUP_CHECKS = False
 
 # Screen setup
 screen_width, screen_height = 1024, 768
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Notty Game")
+# Opened by main_game2_loop, so importing this module opens no window
+screen = None
 clock = pygame.time.Clock()
 
 
-class Card:
-    """
-    Represents a single card in the game.
-
-    Attributes:
-        colour (str): The color of the card (e.g., 'red', 'blue').
-        number (int): The number on the card (0-9).
-    """
-    def __init__(self, colour, number):
-        assert isinstance(number, int)
-        self.colour = colour
-        self.number = number
-
-    def __str__(self):
-        return f'{self.colour}_{self.number}'
-
-
-class CollectionOfCards:
-    """Represents a collection of cards and provides function to validate
-    and finding groups of cards.
-
-    Attributes:
-        collection (list): A list of Card objects.
-    """
-    def __init__(self, notty_cards_list):
-        self.collection = []
-        for card_info in notty_cards_list:
-            colour, number = card_info.split('_')
-            card = Card(colour, int(number))
-            self.collection.append(card)
-
-    def is_valid_group(self):
-        """Checks if the collection contains a valid group of cards.
-        - A valid group is:
-            - At least 3 cards with consecutive numbers of the same color, OR
-            - At least 3 cards of the same number but different colors.
-
-        Returns:
-            bool: True if the group is valid, False otherwise.
-        """
-        if len(self.collection) < 3:
-            return False
-
-        color_groups = {}
-        number_groups = {}
-
-        for card in self.collection:
-            # Group by color
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-            # Group by number
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card.colour)
-
-        # Check for consecutive numbers of the same color
-        if len(color_groups) == 1:
-            for group_color, group_numbers in color_groups.items():
-                if len(group_numbers) >= 3:
-                    sorted_group_numbers = sorted(group_numbers)
-                    if all(
-                        sorted_group_numbers[i] + 1 == sorted_group_numbers[i + 1]
-                        for i in range(len(sorted_group_numbers) - 1)
-                    ):
-                        return True
-                break
-        # Check for same numbers with different colors
-        if len(number_groups) == 1:
-            for group_number, group_colors in number_groups.items():
-                if len(group_colors) >= 3 and len(set(group_colors)) == len(group_colors):
-                    return True
-                break
-
-        return False
-    
-    
-    def find_valid_group(self):
-        print("Searching for valid group...")  # Debug
-        number_groups = {}
-        for card in self.collection:
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card)
-
-        # Check for same-number groups
-        for same_number_cards in number_groups.values():
-            unique_colors = set(card.colour for card in same_number_cards)
-            if len(unique_colors) >= 3:
-                result = [card for card in same_number_cards if card.colour in unique_colors][:3]
-                print(f"Found valid same-number group: {[str(card) for card in result]}")  # Debug
-                return result
-
-        # Check for color runs
-        color_groups = {}
-        for card in self.collection:
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-        for group_color, group_numbers in color_groups.items():
-            sorted_group_numbers = sorted(group_numbers)
-            current_sequence = [sorted_group_numbers[0]]
-            
-            for i in range(1, len(sorted_group_numbers)):
-                if sorted_group_numbers[i] == current_sequence[-1] + 1:
-                    current_sequence.append(sorted_group_numbers[i])
-                else:
-                    if len(current_sequence) >= 3:
-                        result = [Card(group_color, num) for num in current_sequence]
-                        print(f"Found valid color run: {[str(card) for card in result]}")  # Debug
-                        return result
-                    current_sequence = [sorted_group_numbers[i]]
-                    
-            if len(current_sequence) >= 3:
-                result = [Card(group_color, num) for num in current_sequence]
-                print(f"Found valid color run: {[str(card) for card in result]}")  # Debug
-                return result
-
-        print("No valid group found")  # Debug
-        return None
-
-    def find_largest_valid_group(self):
-        print("Searching for largest valid group...")  # Debug
-        largest_valid_group = None
-        
-        # Check for color runs
-        color_groups = {}
-        for card in self.collection:
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-        for group_color, group_numbers in color_groups.items():
-            sorted_group_numbers = sorted(group_numbers)
-            current_sequence = [sorted_group_numbers[0]]
-            
-            for i in range(1, len(sorted_group_numbers)):
-                if sorted_group_numbers[i] == current_sequence[-1] + 1:
-                    current_sequence.append(sorted_group_numbers[i])
-                else:
-                    if len(current_sequence) >= 3 and (largest_valid_group is None or 
-                                                       len(current_sequence) > len(largest_valid_group)):
-                        largest_valid_group = [Card(group_color, num) for num in current_sequence]
-                    current_sequence = [sorted_group_numbers[i]]
-            
-            if len(current_sequence) >= 3 and (largest_valid_group is None or 
-                                               len(current_sequence) > len(largest_valid_group)):
-                largest_valid_group = [Card(group_color, num) for num in current_sequence]
-
-        # Check for same-number groups
-        number_groups = {}
-        for card in self.collection:
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card.colour)
-
-        for number, colors in number_groups.items():
-            unique_colors = list(set(colors))
-            if len(unique_colors) >= 3:
-                color_group = [Card(color, number) for color in unique_colors]
-                if largest_valid_group is None or len(color_group) > len(largest_valid_group):
-                    largest_valid_group = color_group
-
-        if largest_valid_group:
-            print(f"Found largest valid group: {[str(card) for card in largest_valid_group]}")  # Debug
-        else:
-            print("No valid group found")  # Debug
-        return largest_valid_group
-
-
 class GameState:
     """
     Represents the overall state of the game.
@@ -196,14 +36,24 @@ class GameState:
     Attributes:
         player_hands (dict): Cards held by Player 1 and the AI.
         current_player (int): The currnt player's turn (1 for Player 1, 2 for AI).
-        full_deck (list): The full deck of cards used in game 
+        full_deck (Deck): The full deck of cards used in game 
+        group_trackers (dict): A GroupTracker per player over their hand.
+            Every change to a hand goes through its tracker.
+        seed (int): Seed of `rng`. Set NOTTY_SEED to this to replay the game.
+        rng (random.Random): Source of every random choice in the game.
+        knowledge (CardKnowledge): The cards each player knows to be in the other hand.
     """
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.seed = new_game_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        print(f"Game seed: {self.seed}")  # Debug
         # Game state variables
         self.player_hands = {1: [], 2: []}
+        self.group_trackers = {player_id: GroupTracker(hand) for player_id, hand in self.player_hands.items()}
+        self.knowledge = CardKnowledge(2)
         self.current_player = 1
         self.draw_count = {1: 0, 2: 0}
-        self.max_draw_per_turn = 3
+        self.max_draw_per_turn = MAX_DRAW_PER_TURN
         self.drawn_cards = []
         self.max_cards_in_hand = 20
         self.valid_groups = {1: None, 2: None}
@@ -216,7 +66,6 @@ class GameState:
         self.waiting_for_discard_decision = False
         self.full_deck = self.create_deck()
         self.shuffle_complete = False
-        self.shuffle_count = 0
         self.dealing = True
         self.dealing_index = 0
         self.deal_frame_delay = 10
@@ -224,21 +73,24 @@ class GameState:
         self.user_name = "Player 1"  # Name of the human player
 
     def create_deck(self):
-        colours = ['red', 'blue', 'green', 'yellow']
-        numbers = [str(i) for i in range(0, 10)]
-        deck = [f"{colour}_{number}" for colour in colours for number in numbers]
-        return deck + deck.copy()
+        # Draws come out of the Deck at random, so it never needs reshuffling
+        return Deck(create_deck(), self.rng)
 
 
-game_state = GameState()
+# Set up by main_game2_loop for each game
+game_state = None
+ai_worker = AIWorker()
+timeline = Timeline()
 
 # Card positioning and dimensions
 deck_width, deck_height = 100, 140
 overlap_spacing = 30
-total_width = deck_width + (game_state.max_draw_per_turn * overlap_spacing) + 20
+total_width = deck_width + (MAX_DRAW_PER_TURN * overlap_spacing) + 20
 deck_x = (screen_width - total_width) // 2
 deck_y = (screen_height - deck_height) // 2
 deck_area = pygame.Rect(deck_x, deck_y, deck_width, deck_height)
+# Where the cards drawn this turn are laid out, beside the deck
+drawn_cards_x = deck_x + deck_width + 20
 yes_button_area = pygame.Rect(125, 400, 40, 30)  
 no_button_area = pygame.Rect(270, 400, 40, 30)   
 
@@ -260,47 +112,14 @@ play_for_me_button_y = 495  # Positioned below the other buttons
 play_for_me_button_area = pygame.Rect(play_for_me_button_x, play_for_me_button_y, play_for_me_button_width,
                                       play_for_me_button_height)
 
-# Loading images
-card_images = {}
-for filename in os.listdir(CARD_IMAGES):
-    if filename.endswith(".png"):
-        card_name = filename.replace(".png", "")
-        image_path = os.path.join(CARD_IMAGES, filename)
-        card_images[card_name] = pygame.image.load(image_path)
-
-card_back_image = pygame.image.load(CARD_BACK_IMAGE_PATH)
-card_back_image = pygame.transform.scale(card_back_image, (100, 140))
-shuffle_sound = pygame.mixer.Sound("shuffle_sound.mp3")
-
-
-def draw_button(text, x, y, width, height, color=(0, 122, 204), text_color=(0, 0, 0)):
-    pygame.draw.rect(screen, color, (x, y, width, height))
-    font = pygame.font.Font(None, 28)
-    text_surf = font.render(text, True, text_color)
-    text_rect = text_surf.get_rect(center=(x + width // 2, y + height // 2))
-    screen.blit(text_surf, text_rect)
-
-
 def draw_discard_buttons():
     if game_state.waiting_for_discard_decision:
-        draw_button("Yes", yes_button_area.x, yes_button_area.y, 
-                    yes_button_area.width, yes_button_area.height,
-                    color=(242, 240, 239))
-        draw_button("No", no_button_area.x, no_button_area.y, 
-                    no_button_area.width, no_button_area.height,
-                    color=(242, 240, 239))
-
-
-def show_card(card_name, x, y, width=100, height=140, face_down=False):
-    if face_down:
-        screen.blit(card_back_image, (x, y))
-    else:
-        if card_name in card_images:
-            card_image = card_images[card_name]
-            card_image = pygame.transform.scale(card_image, (width, height))
-            screen.blit(card_image, (x, y))
-        else:
-            print(f"Card {card_name} not found!")
+        game_table.draw_button(screen, "Yes", yes_button_area.x, yes_button_area.y,
+                               yes_button_area.width, yes_button_area.height,
+                               color=(242, 240, 239))
+        game_table.draw_button(screen, "No", no_button_area.x, no_button_area.y,
+                               no_button_area.width, no_button_area.height,
+                               color=(242, 240, 239))
 
 
 def display_cards(player_id, x, y, spacing=30):
@@ -316,12 +135,12 @@ def display_cards(player_id, x, y, spacing=30):
                      if card not in valid_card_strs and card not in largest_card_strs]
     current_x = x
     for i, card in enumerate(regular_cards):
-        show_card(card, current_x + i * spacing, y, face_down=False)
+        game_table.show_card(screen, card, current_x + i * spacing, y, face_down=False)
     current_x = x + len(regular_cards) * spacing + 20  # Add 50 pixels of space
 
     if game_state.valid_groups[player_id]:
         for i, card in enumerate(game_state.valid_groups[player_id]):
-            show_card(str(card), current_x + i * spacing, y, face_down=False)
+            game_table.show_card(screen, str(card), current_x + i * spacing, y, face_down=False)
         current_x += len(game_state.valid_groups[player_id]) * spacing
     
     if game_state.largest_groups[player_id] and len(game_state.largest_groups[player_id]) > 3:
@@ -329,64 +148,16 @@ def display_cards(player_id, x, y, spacing=30):
             current_x += 60
             
             for i, card in enumerate(game_state.largest_groups[player_id]):
-                show_card(str(card), current_x + i * spacing, y, face_down=False)
-
-
-def draw_player_name(name, x, y, color=(255, 255, 255)):
-    font = pygame.font.Font(None, 30)
-    text_surf = font.render(name, True, color)
-    screen.blit(text_surf, (x, y))
-
-
-def clear_drawn_card_area():
-    clear_rect_x = deck_x + deck_width + 20
-    clear_rect_y = deck_y
-    clear_rect_width = 3 * 110
-    clear_rect_height = 140
-    pygame.draw.rect(screen, (0, 128, 0), (clear_rect_x, clear_rect_y, clear_rect_width, clear_rect_height))
+                game_table.show_card(screen, str(card), current_x + i * spacing, y, face_down=False)
 
 
 def draw_message():
     if game_state.message:
         message_box_x = 50
         message_box_width = deck_x - message_box_x - 20
-        message_box_height = deck_height
         message_box_y = deck_y
-        
-        font_size = 30
-        font = pygame.font.Font(None, font_size)
-        
-        words = game_state.message.split()
-        lines = []
-        current_line = words[0]
-        
-        for word in words[1:]:
-            test_line = current_line + " " + word
-            test_surface = font.render(test_line, True, (255, 255, 255))
-            
-            if test_surface.get_width() <= (message_box_width - 40):  
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-        
-        lines.append(current_line)
-        text_surfaces = [font.render(line.upper(), True, (255, 255, 255)) for line in lines]
-        
-        background_surface = pygame.Surface((message_box_width, message_box_height))
-        background_surface.set_alpha(128)
-        background_surface.fill((0, 0, 0))
-        screen.blit(background_surface, (message_box_x, message_box_y))
-        
-        total_text_height = sum(surface.get_height() for surface in text_surfaces)
-        line_spacing = 5
-        total_height = total_text_height + (line_spacing * (len(lines) - 1)) if len(lines) > 1 else total_text_height
-        current_y = message_box_y + (message_box_height - total_height) // 2
-        
-        for surface in text_surfaces:
-            text_rect = surface.get_rect(centerx=message_box_x + message_box_width // 2, y=current_y)
-            screen.blit(surface, text_rect)
-            current_y += surface.get_height() + line_spacing
+        game_table.draw_message(screen, game_state.message,
+                                (message_box_x, message_box_y, message_box_width, deck_height))
 
 
 def check_hand_validity(player_id):
@@ -394,22 +165,25 @@ def check_hand_validity(player_id):
     player_name = "You" if player_id == 1 else "Computer"
     current_message = game_state.message
     
-    print(f"\nChecking {player_name}'s hand for groups...")  # Debug
-    hand_collection = CollectionOfCards(game_state.player_hands[player_id])
-    valid_group = hand_collection.find_valid_group()
-    largest_group = hand_collection.find_largest_valid_group()
+    if DEBUG_GROUP_CHECKS:
+        print(f"\nChecking {player_name}'s hand for groups...")  # Debug
+    valid_names, largest_names = game_state.group_trackers[player_id].groups()
+    valid_group = cards_of(valid_names)
+    largest_group = cards_of(largest_names)
 
     game_state.valid_groups[player_id] = valid_group
     game_state.largest_groups[player_id] = largest_group
     
     if player_id == game_state.current_player:
         if not valid_group:
-            print(f"No valid group found for {player_name}")  # Debug
+            if DEBUG_GROUP_CHECKS:
+                print(f"No valid group found for {player_name}")  # Debug
             game_state.message = current_message
         else:
             cards_str = ", ".join(str(card) for card in valid_group)
             game_state.message = f"{player_name} has a valid group: {cards_str}"
-            print(f"{player_name} has a valid group: {cards_str}")  # Debug
+            if DEBUG_GROUP_CHECKS:
+                print(f"{player_name} has a valid group: {cards_str}")  # Debug
             
             if player_id == 1:  # Only show discard prompt for human player
                 game_state.message = "Do you wish to discard valid group?"
@@ -419,67 +193,40 @@ def check_hand_validity(player_id):
             if len(largest_group) > 3 and not game_state.waiting_for_discard_decision:
                 cards_str = ", ".join(str(card) for card in largest_group)
                 game_state.message = f"{player_name} has a larger group: {cards_str}"
-                print(f"{player_name} has a larger group: {cards_str}")  # Debug
+                if DEBUG_GROUP_CHECKS:
+                    print(f"{player_name} has a larger group: {cards_str}")  # Debug
     else:
         #message if no valid group is found for a non-current player
-        if not valid_group:
+        if not valid_group and DEBUG_GROUP_CHECKS:
             print(f"No valid group found for {player_name}")  # Debug
 
 
 def handle_discard(player_id):
-
+    """
+    Script that moves the player's valid group into the deck and shuffles it.
+    Run it on the timeline.
+    """
+    game_state.waiting_for_discard_decision = False
     if game_state.valid_groups[player_id]:
         discarded_cards = [str(card) for card in game_state.valid_groups[player_id]]
-        
-        # Animate cards moving to deck
         start_positions = [(50 + i * 30, 10 if player_id == 1 else 450) for i in range(len(discarded_cards))]
-        end_position = (deck_x, deck_y)
-        
-        for step in range(30):
-            progress = step / 30
-            screen.fill((15, 20, 45))
-            
-            remaining_cards = [card for card in game_state.player_hands[player_id] if card not in discarded_cards]
-            for i, card in enumerate(remaining_cards):
-                x = 50 + i * 30
-                y = 10 if player_id == 1 else 450
-                show_card(card, x, y)
-            
-            for i, (start_x, start_y) in enumerate(start_positions):
-                current_x = start_x + (end_position[0] - start_x) * progress
-                current_y = start_y + (end_position[1] - start_y) * progress
-                show_card(discarded_cards[i], current_x, current_y)
-            
-            other_player = 2 if player_id == 1 else 1
-            display_cards(other_player, 50, 450 if player_id == 1 else 10)
-            
-            draw_message()
-            pygame.display.flip()
-            pygame.time.wait(20)
-        
-        # Reuse existing shuffle animation
-        game_state.shuffle_count = 0
-        game_state.shuffle_complete = False
-        while not game_state.shuffle_complete:
-            shuffle_deck()
-            pygame.display.flip()
-            pygame.time.wait(50)
 
+        # The group leaves the hand as it starts moving to the deck
+        game_state.group_trackers[player_id].discard(discarded_cards)
+        game_state.knowledge.discard(player_id, discarded_cards)
+        game_state.valid_groups[player_id] = None
+        game_state.largest_groups[player_id] = None
+
+        yield [CardMove(partial(game_table.show_card, screen, card), start, (deck_x, deck_y))
+               for card, start in zip(discarded_cards, start_positions)]
         game_state.full_deck.extend(discarded_cards)
-        random.shuffle(game_state.full_deck)
 
-        game_state.player_hands[player_id] = [card for card in game_state.player_hands[player_id]
-                                              if card not in discarded_cards]
-        
+        yield from shuffle_deck()
         check_winning_state()
 
-        game_state.valid_groups[player_id] = None
-        game_state.largest_groups[player_id] = None
-
         game_state.message = "Valid group discarded!"
-        pygame.time.wait(500)
+        yield Pause(500)
 
-    game_state.waiting_for_discard_decision = False
     check_hand_validity(2)
     game_state.current_player = 2
 
@@ -511,33 +258,31 @@ def draw_card():
     return None
 
 
-def can_add_cards(player_id, num_cards):
-    return len(game_state.player_hands[player_id]) + num_cards <= game_state.max_cards_in_hand
-
-
-def is_hand_full(player_id):
-    return len(game_state.player_hands[player_id]) >= game_state.max_cards_in_hand
-
-
 def handle_ai_discard():
-
+    """
+    Script in which the computer may discard its valid group, which fades
+    out beside the deck. Returns True if it did, for `yield from`.
+    """
     if game_state.valid_groups[2] is None:
         return False
     
     print("\nComputer discard decision process:")  # Debug 
     print(f"- Valid group available: {[str(card) for card in game_state.valid_groups[2]]}")  # Debug
     
-    random_choice = random.random()
+    random_choice = game_state.rng.random()
     print(f"- Random value: {random_choice:.2f} (Will discard if < 0.8)")  # Debug
     
     if random_choice < 0.8:
         print("- Decision: Computer WILL discard the group")  # Debug
-        discarded_cards = [str(card) for card in game_state.valid_groups[2]]
+        # Discard the group that leaves the rest of the hand best covered
+        discarded_cards = best_discard(game_state.player_hands[2])
+        if discarded_cards is None:
+            print("- No valid group left to discard")  # Debug
+            return False
         game_state.full_deck.extend(discarded_cards)
-        random.shuffle(game_state.full_deck)
 
-        game_state.player_hands[2] = [card for card in game_state.player_hands[2]
-                                      if card not in discarded_cards]
+        game_state.group_trackers[2].discard(discarded_cards)
+        game_state.knowledge.discard(2, discarded_cards)
 
         game_state.valid_groups[2] = None
         game_state.largest_groups[2] = None
@@ -546,126 +291,96 @@ def handle_ai_discard():
         print(f"- Cards discarded: {discarded_cards}")  # Debug
         print(f"- Remaining hand size: {len(game_state.player_hands[2])}")  # Debug
         check_winning_state()
-        pygame.time.wait(1000)  
+        yield Fade(partial(game_table.show_beside_deck, screen, drawn_cards_x, deck_y, discarded_cards), 1000)
         return True
     else:
         print("- Decision: Computer will NOT discard the group")  # Debug
         return False
 
 
-def ai_turn():
+def ai_decision_args():
+    """Snapshots the game for game_table.decide_ai_turn, seeding its rng from the game's."""
+    return (random.Random(game_state.rng.getrandbits(64)), HandBits(list(game_state.player_hands[2])),
+            game_state.max_cards_in_hand - len(game_state.player_hands[2]), len(game_state.player_hands[1]),
+            copy.deepcopy(game_state.knowledge))
+
+
+def ai_turn(decision=None):
+    """
+    Script that plays the computer's turn. Run it on the timeline.
+
+    Args:
+        decision (dict): From game_table.decide_ai_turn, usually computed on the AI worker.
+            Decided here if None; a failed decision skips the turn.
+    """
+    if decision is None:
+        decision = game_table.decide_ai_turn(*ai_decision_args())
 
     if game_state.current_player == 2 and game_state.valid_groups[2] is not None:
-        if handle_ai_discard():
+        if (yield from handle_ai_discard()):
             check_winning_state()
             game_state.current_player = 1
             game_state.message = "Your turn"
             game_state.message_timer = pygame.time.get_ticks()
             return
     
-    action = random.choice(['draw', 'snatch', 'skip'])
+    action = decision['action']
     print(f"AI choosing action: {action}")  # Debug
     
     if action == 'draw':
-        if is_hand_full(2):
+        if not has_room(game_state, 2):
             game_state.message = "Computer's hand is full!"
             print("AI cannot draw - hand full")  # Debug
         else:    
-            num_draws = random.randint(1, min(3, game_state.max_cards_in_hand - len(game_state.player_hands[2])))
-            temp_drawn_cards = []
+            num_draws = decision['num_draws']
 
             game_state.message = f"Computer draws {num_draws} card{'s' if num_draws > 1 else ''}"
             print(f"AI drawing {num_draws} cards")  # Debug
             
+            # Drawn cards are shown face down beside the deck
             for i in range(num_draws):
                 card = draw_card()
                 if card:
-                    temp_drawn_cards.append(card)
-                    screen.fill((15, 20, 45))
-                    display_cards(1, 50, 50)
-                    display_cards(2, 50, 578)
-                    
-                    if game_state.full_deck:
-                        screen.blit(card_back_image, (deck_x, deck_y))
-                    
-                    for j in range(len(temp_drawn_cards)):
-                        drawn_card_x = deck_x + deck_width + 20 + j * overlap_spacing
-                        drawn_card_y = deck_y
-                        show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-                    
-                    draw_message()
-                    pygame.display.flip()
-                    pygame.time.wait(500)
+                    game_state.drawn_cards.append(card)
+                    yield Pause(500)
             
-            pygame.time.wait(1000)
+            yield Pause(1000)
             
-            start_positions = [(deck_x + deck_width + 20 + i * overlap_spacing, deck_y) 
-                               for i in range(len(temp_drawn_cards))]
-            end_positions = [(50 + (len(game_state.player_hands[2]) + i) * 30, 450)
-                             for i in range(len(temp_drawn_cards))]
-            
-            for step in range(30):
-                progress = step / 30
-                screen.fill((15, 20, 45))
-                display_cards(1, 50, 50)
-                display_cards(2, 50, 578)
-                
-                if game_state.full_deck:
-                    screen.blit(card_back_image, (deck_x, deck_y))
-                
-                for i in range(len(temp_drawn_cards)):
-                    start_x, start_y = start_positions[i]
-                    end_x, end_y = end_positions[i]
-                    current_x = start_x + (end_x - start_x) * progress
-                    current_y = start_y + (end_y - start_y) * progress
-                    show_card(None, current_x, current_y, face_down=True)
-                
-                draw_message()
-                pygame.display.flip()
-                pygame.time.wait(20)
-
-            game_state.player_hands[2].extend(temp_drawn_cards)
+            temp_drawn_cards = list(game_state.drawn_cards)
+            game_state.drawn_cards.clear()
+            yield [CardMove(partial(game_table.show_card, screen, None, face_down=True),
+                            (drawn_cards_x + i * overlap_spacing, deck_y),
+                            (50 + (len(game_state.player_hands[2]) + i) * 30, 450))
+                   for i in range(len(temp_drawn_cards))]
+
+            game_state.group_trackers[2].extend(temp_drawn_cards)
             check_hand_validity(2)
             
             if game_state.current_player == 2 and game_state.valid_groups[2] is not None:
-                handle_ai_discard()
-                pygame.time.wait(500)
+                yield from handle_ai_discard()
+                yield Pause(500)
             
     elif action == 'snatch':
-        if is_hand_full(2):
+        if not has_room(game_state, 2):
             game_state.message = "Computer's hand is full!"
             print("AI cannot snatch - hand full")  # Debug
         elif game_state.player_hands[1]:
             game_state.message = "Computer snatches Your card"
             print("AI snatching card from human")  # Debug
             
-            snatched_index = random.randint(0, len(game_state.player_hands[1]) - 1)
-            snatched_card = game_state.player_hands[1].pop(snatched_index)
+            snatched_index = decision['snatch_index']
+            snatched_card = game_state.group_trackers[1].pop(snatched_index)
             
-            start_x = 50 + snatched_index * 30
-            start_y = 10
-            end_x = 50 + len(game_state.player_hands[2]) * 30
-            end_y = 450
-            
-            for step in range(30):
-                progress = step / 30
-                current_x = start_x + (end_x - start_x) * progress
-                current_y = start_y + (end_y - start_y) * progress
-                
-                screen.fill((15, 20, 45))
-                display_cards(1, 50, 50)
-                display_cards(2, 50, 578)
-                show_card(snatched_card, current_x, current_y)
-                draw_message()
-                pygame.display.flip()
-                pygame.time.wait(20)
-
-            game_state.player_hands[2].append(snatched_card)
+            yield CardMove(partial(game_table.show_card, screen, snatched_card), (50 + snatched_index * 30, 10),
+                           (50 + len(game_state.player_hands[2]) * 30, 450))
+
+            game_state.group_trackers[2].add(snatched_card)
+            game_state.knowledge.snatch(2, 1, snatched_card)
             check_hand_validity(2)
             
             if game_state.current_player == 2 and game_state.valid_groups[2] is not None:
-                handle_ai_discard()
-                pygame.time.wait(500)
+                yield from handle_ai_discard()
+                yield Pause(500)
         else:
             game_state.message = "No cards for Computer to snatch!"
             print("AI cannot snatch - no cards available")  # Debug
@@ -673,19 +388,12 @@ def ai_turn():
     else:
         game_state.message = "Computer skips turn"
         print("AI skipping turn")  # Debug
-        screen.fill((15, 20, 45))
-        display_cards(1, 50, 50)
-        display_cards(2, 50, 578)
-        draw_message()
-        pygame.display.flip()
-        pygame.time.wait(1500)
+        yield Pause(1500)
         if check_winning_state():
             return
     
-    clear_drawn_card_area()
-    
     if action != 'skip':
-        pygame.time.wait(1500)
+        yield Pause(1500)
 
     if action == 'snatch':
         check_hand_validity(1)
@@ -695,51 +403,39 @@ def ai_turn():
     game_state.message = "Your turn"
     game_state.message_timer = pygame.time.get_ticks()
     game_state.waiting_for_discard_decision = False
-    
-    screen.fill((15, 20, 45))
-    display_cards(1, 50, 50)
-    display_cards(2, 50, 578)
-    draw_message()
-    pygame.display.flip()
 
 
 def shuffle_deck():
-    screen.fill((15, 20, 45))
-    game_state.shuffle_count += 1
-
-    offset = 5 if game_state.shuffle_count % 10 < 5 else -5
-    deck_bounce_y = deck_y + offset
-    screen.blit(card_back_image, (deck_x, deck_bounce_y))
-
-    if game_state.shuffle_count == 1:
-        shuffle_sound.play()
-
-    if game_state.shuffle_count > 40:
-        game_state.shuffle_complete = True
-        random.shuffle(game_state.full_deck)
-        print("Deck shuffled")  # Debug
+    """
+    Script that bounces the deck while the shuffle sound plays. The main loop
+    leaves the deck out of the scene until the shuffle is complete.
+    """
+    game_state.shuffle_complete = False
+    assets.sound().play()
+    yield Bounce(partial(game_table.draw_deck, screen, deck_x, deck_y), SHUFFLE_TIME)
+    game_state.shuffle_complete = True
+    print("Deck shuffled")  # Debug
 
 
 def snatch_card():
 
-    if is_hand_full(1):
+    if not has_room(game_state, 1):
         print("You cannot snatch - hand full")  # Debug
         game_state.message = "Cannot snatch more cards - Your hand is full!"
         return False
         
     if game_state.player_hands[2]:
-        snatched_card = game_state.player_hands[2].pop(random.randint(0, len(game_state.player_hands[2]) - 1))
+        snatched_card = take_card(game_state, 1, 2, game_state.rng.randint(0, len(game_state.player_hands[2]) - 1))
         print(f"You snatch card: {snatched_card}")  # Debug
-        game_state.player_hands[1].append(snatched_card)
         
         check_hand_validity(1)
+        check_hand_validity(2)
         
         if game_state.valid_groups[1]:
             game_state.message = "Do you wish to discard valid group?"
             game_state.waiting_for_discard_decision = True
             return True
         else:
-            check_hand_validity(2)
             game_state.current_player = 2
             game_state.message = "Computer's turn"
             return True
@@ -750,22 +446,22 @@ def snatch_card():
 
 
 def play_for_me():
-    if is_hand_full(1):
+    if not has_room(game_state, 1):
         game_state.message = "Cannot play - Human hand is full!"
         return
 
     # Simulate computer decision-making for the player
-    if random.random() < 0.8:  # 80% chance to draw cards
-        num_draws = random.randint(1, min(3, game_state.max_cards_in_hand - len(game_state.player_hands[1])))
+    if game_state.rng.random() < 0.8:  # 80% chance to draw cards
+        num_draws = game_state.rng.randint(1, min(3, game_state.max_cards_in_hand - len(game_state.player_hands[1])))
         for _ in range(num_draws):
             card = draw_card()
             if card:
-                game_state.player_hands[1].append(card)
+                game_state.group_trackers[1].add(card)
         game_state.message = f"Drew {num_draws} card(s)!"
     else:  # Snatch action
         if game_state.player_hands[2]:
-            snatched_card = game_state.player_hands[2].pop(random.randint(0, len(game_state.player_hands[2]) - 1))
-            game_state.player_hands[1].append(snatched_card)
+            snatched_card = take_card(game_state, 1, 2, game_state.rng.randint(0, len(game_state.player_hands[2]) - 1))
+            check_hand_validity(2)
             game_state.message = f"Snatched a card from the Computer!"
         else:
             game_state.message = "No cards available to snatch!"
@@ -773,14 +469,15 @@ def play_for_me():
     # Check for valid groups
     check_hand_validity(1)
 
-    # Handle discard if there's a valid group
+    # Handle discard if there's a valid group, picking the one that leaves
+    # the rest of the hand best covered
     if game_state.valid_groups[1]:
-        handle_discard(1)
+        game_state.valid_groups[1] = cards_of(best_discard(game_state.player_hands[1]))
+        timeline.run(handle_discard(1))
 
     # End turn
     game_state.current_player = 2
     game_state.drawn_cards.clear()
-    clear_drawn_card_area()
     game_state.message = "Computer's turn"
 
 #Checks winning state
@@ -802,24 +499,65 @@ def check_winning_state():
     return False
 
 
+def build_scene():
+    """
+    Lays out the table for the dirty-rect renderer, back to front. Each layer
+    is redrawn only when its key changes.
+    """
+    scene = DirtyRenderer(screen, BACKGROUND_COLOR)
+    scene.add((50, 210, 200, 30), lambda: game_table.draw_player_name(screen, "You", 50, 210))
+    scene.add((50, 532, 200, 30), lambda: game_table.draw_player_name(screen, "Computer", 50, 532))
+    scene.add((0, 50, screen_width, 140), lambda: display_cards(1, 50, 50),
+              lambda: game_table.hand_key(game_state, 1))
+    scene.add((0, 578, screen_width, 140), lambda: display_cards(2, 50, 578),
+              lambda: game_table.hand_key(game_state, 2))
+    scene.add(deck_area, lambda: game_table.draw_resting_deck(screen, game_state, deck_x, deck_y),
+              lambda: (bool(game_state.full_deck), game_state.shuffle_complete))
+    scene.add(button_area, lambda: game_table.draw_button(screen, "Done Drawing", button_x, button_y,
+                                                          button_width, button_height))
+    scene.add(snatch_button_area, lambda: game_table.draw_button(screen, "Snatch", snatch_button_x, snatch_button_y,
+                                                                 snatch_button_width, snatch_button_height,
+                                                                 color=(0, 122, 204)))
+    scene.add(play_for_me_button_area, lambda: game_table.draw_button(screen, "Play for Me", play_for_me_button_x,
+                                                                      play_for_me_button_y, play_for_me_button_width,
+                                                                      play_for_me_button_height, color=(0, 122, 204)))
+    scene.add((drawn_cards_x, deck_y, (game_state.max_draw_per_turn - 1) * overlap_spacing + 100, 140),
+              lambda: game_table.draw_drawn_cards(screen, game_state, drawn_cards_x, deck_y),
+              lambda: len(game_state.drawn_cards))
+    scene.add((50, deck_y, deck_x - 70, deck_height), draw_message, lambda: game_state.message)
+    scene.add(yes_button_area.union(no_button_area), draw_discard_buttons,
+              lambda: game_state.waiting_for_discard_decision)
+    return scene
+
 
 # Main game loop
 def main_game2_loop():
 
-    global deck_x, deck_y
+    global screen, game_state, deck_x, deck_y
 
+    screen = assets.screen("Notty Game")
+    game_state = GameState()
+    assets.card_cache().preload(assets.card_names())
+    scene = build_scene()
+    timeline.run(shuffle_deck())
     running = True
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == AI_DECISION:
+                ai_worker.done()
+                timeline.run(ai_turn(event.decision or {'action': 'skip'}))
+                game_state.ai_turn_timer = 0
+                game_state.message_timer = pygame.time.get_ticks()
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mouse_pos = pygame.mouse.get_pos()
                 
-                if game_state.current_player == 1 and not game_state.dealing:
+                # Clicks are ignored while an action is animating
+                if game_state.current_player == 1 and not game_state.dealing and not timeline.busy:
                     if not game_state.waiting_for_discard_decision:
                         if game_state.shuffle_complete and deck_area.collidepoint(mouse_pos):
-                            if is_hand_full(1):
+                            if not has_room(game_state, 1):
                                 print("You cannot draw - hand full")  # Debug
                                 game_state.message = "Cannot draw more cards - Your hand is full!"
                             else:
@@ -836,24 +574,22 @@ def main_game2_loop():
                                 print("You skip turn")  # Debug
                                 game_state.current_player = 2
                             else:
-                                if can_add_cards(game_state.current_player, len(game_state.drawn_cards)):
-                                    game_state.player_hands[game_state.current_player].extend(game_state.drawn_cards)
+                                if has_room(game_state, game_state.current_player, len(game_state.drawn_cards)):
+                                    game_state.group_trackers[game_state.current_player].extend(game_state.drawn_cards)
                                     handle_card_addition(game_state.current_player)
                                     game_state.drawn_cards.clear()
-                                    clear_drawn_card_area()
                                     if not game_state.waiting_for_discard_decision:
                                         game_state.current_player = 2
                                 else:
                                     print("You cannot add cards - hand limit exceeded")  # Debug
                                     game_state.drawn_cards.clear()
-                                    clear_drawn_card_area()
                         
                         elif snatch_button_area.collidepoint(mouse_pos):
                             if len(game_state.drawn_cards) > 0:
                                 print("Cannot snatch after drawing cards")  # Debug
                                 game_state.message = "Cannot snatch after drawing cards. Click Done Drawing first."
                             else:
-                                if is_hand_full(1):
+                                if not has_room(game_state, 1):
                                     print("You cannot snatch - hand full")  # Debug
                                     game_state.message = "Cannot snatch more cards - Your hand is full!"
                                 else:
@@ -864,7 +600,7 @@ def main_game2_loop():
 
                     if game_state.waiting_for_discard_decision:
                         if yes_button_area.collidepoint(mouse_pos):
-                            handle_discard(1)
+                            timeline.run(handle_discard(1))
                         elif no_button_area.collidepoint(mouse_pos):
                             game_state.waiting_for_discard_decision = False
                             game_state.current_player = 2
@@ -874,26 +610,25 @@ def main_game2_loop():
                     if check_winning_state():
                         running = False  # Stop the game loop if the game ends
         #AI's turn
-        if game_state.current_player == 2 and not game_state.dealing and game_state.shuffle_complete:
+        if (game_state.current_player == 2 and not game_state.dealing and game_state.shuffle_complete
+                and not timeline.busy):
             current_time = pygame.time.get_ticks()
             if game_state.ai_turn_timer == 0:
                 game_state.ai_turn_timer = current_time
-            elif current_time - game_state.ai_turn_timer >= game_state.ai_turn_delay:
-                ai_turn()
-                game_state.ai_turn_timer = 0
-                game_state.message_timer = current_time
+            elif current_time - game_state.ai_turn_timer >= game_state.ai_turn_delay and not ai_worker.busy:
+                # The decision comes back as an AI_DECISION event; keep drawing frames meanwhile
+                ai_worker.submit(2, game_table.decide_ai_turn, *ai_decision_args())
         elif game_state.current_player == 1 and not game_state.dealing and game_state.shuffle_complete:
             game_state.message = "Your turn"
 
-        if not game_state.shuffle_complete:
-            shuffle_deck()
-        elif game_state.dealing:
+        timeline.update()
+        if game_state.shuffle_complete and game_state.dealing:
             if game_state.frame_count % game_state.deal_frame_delay == 0:
                 player_id = (game_state.dealing_index % 2) + 1
                 if len(game_state.player_hands[player_id]) < 5:
                     card = draw_card()
                     if card:
-                        game_state.player_hands[player_id].append(card)
+                        game_state.group_trackers[player_id].add(card)
                         game_state.dealing_index += 1
                         print(f"Dealing card to Player {player_id}: {card}")  # Debug
                 else:
@@ -904,29 +639,6 @@ def main_game2_loop():
 
             game_state.frame_count += 1
 
-        screen.fill((15, 20, 45))
-        
-        draw_player_name("You", 50, 210)
-        draw_player_name("Computer", 50, 532)
-        
-        display_cards(1, 50, 50)
-        display_cards(2, 50, 578)
-
-        if game_state.full_deck:
-            screen.blit(card_back_image, (deck_x, deck_y))
-
-        draw_button("Done Drawing", button_x, button_y, button_width, button_height)
-        draw_button("Snatch", snatch_button_x, snatch_button_y, snatch_button_width, snatch_button_height,
-                    color=(0, 122, 204))
-        draw_button("Play for Me", play_for_me_button_x, play_for_me_button_y, play_for_me_button_width,
-                    play_for_me_button_height, color=(0, 122, 204))
-
-        # Display drawn cards
-        for i, _ in enumerate(game_state.drawn_cards):
-            drawn_card_x = deck_x + deck_width + 20 + i * overlap_spacing
-            drawn_card_y = deck_y
-            show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-
         if game_state.waiting_for_discard_decision:
             game_state.message = "Do you wish to discard this group?"
         message_timer = float('inf') 
@@ -943,11 +655,10 @@ def main_game2_loop():
                 game_state.message = ""
             game_state.message_timer = current_time
 
-        draw_message()
-        if game_state.waiting_for_discard_decision:
-            draw_discard_buttons()
-
-        pygame.display.flip()
+        # Only what changed is redrawn, unless cards are moving over the table
+        dirty = scene.draw(full=timeline.animating)
+        timeline.draw()
+        scene.update(dirty)
         clock.tick(30)
 
     pygame.quit()
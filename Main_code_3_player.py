@@ -1,19 +1,32 @@
 import pygame
-import os
+import copy
 import random
-from Main_code_2_player import check_winning_state
-pygame.init()
+from functools import partial
+import assets
+import game_table
+from ai_worker import AI_DECISION, AIWorker
+from animation import Bounce, CardMove, Fade, Pause, Timeline
+from dirty_rects import DirtyRenderer
+from end_screen import show_winning_screen
+from hand_solver import best_discard
+from notty_engine import has_room, new_game_seed, take_card
+from card_groups import GroupTracker, HandBits
+from card_knowledge import CardKnowledge
+from notty_cards import CollectionOfCards, Deck, cards_of, create_deck
 
 # Constants and Configuration
-CARD_IMAGES = "card_images/"
-GAME_IMAGES = "game_images/"
-CARD_BACK_IMAGE_PATH = os.path.join(GAME_IMAGES, "card_back.png")
+MAX_DRAW_PER_TURN = 3
+SHUFFLE_TIME = 1400  # Milliseconds the deck bounces for while shuffling
+RETURN_TIME = 300  # Milliseconds a returned card takes to reach the deck
+BACKGROUND_COLOR = (15, 20, 45)
+# Print what check_hand_validity finds on every check
+DEBUG_GROUP_CHECKS = False
 
 # Screen setup
 # Screen, player, and card setup
 screen_width, screen_height = 1024, 768
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Notty Game")
+# Opened by main_game3_loop, so importing this module opens no window
+screen = None
 clock = pygame.time.Clock()
 
 # Player configuration
@@ -29,158 +42,21 @@ PLAYER_NAMES = {
     3: "Computer 2"
 }
 
-class Card:
-    def __init__(self, colour, number):
-        assert isinstance(number, int)
-        self.colour = colour
-        self.number = number
-
-    def __str__(self):
-        return f'{self.colour}_{self.number}'
-
-class CollectionOfCards:
-    def __init__(self, notty_cards_list):
-        self.collection = []
-        for card_info in notty_cards_list:
-            colour, number = card_info.split('_')
-            card = Card(colour, int(number))
-            self.collection.append(card)
-
-    def is_valid_group(self):
-        if len(self.collection) < 3:
-            return False
-
-        color_groups = {}
-        number_groups = {}
-
-        for card in self.collection:
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card.colour)
-
-        if len(color_groups) == 1:
-            for group_color, group_numbers in color_groups.items():
-                if len(group_numbers) >= 3:
-                    sorted_group_numbers = sorted(group_numbers)
-                    if all(
-                        sorted_group_numbers[i] + 1 == sorted_group_numbers[i + 1]
-                        for i in range(len(sorted_group_numbers) - 1)
-                    ):
-                        return True
-                break
-
-        if len(number_groups) == 1:
-            for group_number, group_colors in number_groups.items():
-                if len(group_colors) >= 3 and len(set(group_colors)) == len(group_colors):
-                    return True
-                break
-
-        return False
-
-    def find_valid_group(self):
-        print("Searching for valid group...")  # Debug
-        number_groups = {}
-        for card in self.collection:
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card)
-
-        # Check for same-number groups
-        for same_number_cards in number_groups.values():
-            unique_colors = set(card.colour for card in same_number_cards)
-            if len(unique_colors) >= 3:
-                result = [card for card in same_number_cards if card.colour in unique_colors][:3]
-                print(f"Found valid same-number group: {[str(card) for card in result]}")  # Debug
-                return result
-
-        # Check for color runs
-        color_groups = {}
-        for card in self.collection:
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-        for group_color, group_numbers in color_groups.items():
-            sorted_group_numbers = sorted(group_numbers)
-            current_sequence = [sorted_group_numbers[0]]
-            
-            for i in range(1, len(sorted_group_numbers)):
-                if sorted_group_numbers[i] == current_sequence[-1] + 1:
-                    current_sequence.append(sorted_group_numbers[i])
-                else:
-                    if len(current_sequence) >= 3:
-                        result = [Card(group_color, num) for num in current_sequence]
-                        print(f"Found valid color run: {[str(card) for card in result]}")  # Debug
-                        return result
-                    current_sequence = [sorted_group_numbers[i]]
-                    
-            if len(current_sequence) >= 3:
-                result = [Card(group_color, num) for num in current_sequence]
-                print(f"Found valid color run: {[str(card) for card in result]}")  # Debug
-                return result
-
-        print("No valid group found")  # Debug
-        return None
-
-    def find_largest_valid_group(self):
-        print("Searching for largest valid group...")  # Debug
-        largest_valid_group = None
-        
-        # Check for color runs
-        color_groups = {}
-        for card in self.collection:
-            if card.colour not in color_groups:
-                color_groups[card.colour] = []
-            color_groups[card.colour].append(card.number)
-
-        for group_color, group_numbers in color_groups.items():
-            sorted_group_numbers = sorted(group_numbers)
-            current_sequence = [sorted_group_numbers[0]]
-            
-            for i in range(1, len(sorted_group_numbers)):
-                if sorted_group_numbers[i] == current_sequence[-1] + 1:
-                    current_sequence.append(sorted_group_numbers[i])
-                else:
-                    if len(current_sequence) >= 3 and (largest_valid_group is None or 
-                                                     len(current_sequence) > len(largest_valid_group)):
-                        largest_valid_group = [Card(group_color, num) for num in current_sequence]
-                    current_sequence = [sorted_group_numbers[i]]
-            
-            if len(current_sequence) >= 3 and (largest_valid_group is None or 
-                                             len(current_sequence) > len(largest_valid_group)):
-                largest_valid_group = [Card(group_color, num) for num in current_sequence]
-
-        # Check for same-number groups
-        number_groups = {}
-        for card in self.collection:
-            if card.number not in number_groups:
-                number_groups[card.number] = []
-            number_groups[card.number].append(card.colour)
-
-        for number, colors in number_groups.items():
-            unique_colors = list(set(colors))
-            if len(unique_colors) >= 3:
-                color_group = [Card(color, number) for color in unique_colors]
-                if largest_valid_group is None or len(color_group) > len(largest_valid_group):
-                    largest_valid_group = color_group
-
-        if largest_valid_group:
-            print(f"Found largest valid group: {[str(card) for card in largest_valid_group]}")  # Debug
-        else:
-            print("No valid group found")  # Debug
-        return largest_valid_group
-
 class GameState2:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Every random choice in the game comes from this seeded stream
+        self.seed = new_game_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        print(f"Game seed: {self.seed}")  # Debug
         # Game state variables
         self.player_hands = {1: [], 2: [], 3: []}
+        # Every change to a hand goes through its player's tracker
+        self.group_trackers = {player_id: GroupTracker(hand) for player_id, hand in self.player_hands.items()}
+        # The cards each player knows to be in the other hands
+        self.knowledge = CardKnowledge(3)
         self.current_player = 1
         self.draw_count = {1: 0, 2: 0, 3: 0}
-        self.max_draw_per_turn = 3
+        self.max_draw_per_turn = MAX_DRAW_PER_TURN
         self.drawn_cards = []
         self.max_cards_in_hand = 20
         self.valid_groups = {1: None, 2: None, 3: None}
@@ -193,7 +69,6 @@ class GameState2:
         self.waiting_for_discard_decision = False
         self.full_deck = self.create_deck()
         self.shuffle_complete = False
-        self.shuffle_count = 0
         self.dealing = True
         self.dealing_index = 0
         self.deal_frame_delay = 10
@@ -201,12 +76,13 @@ class GameState2:
         self.user_name = "Player 1"  # Name of the human player
 
     def create_deck(self):
-        colours = ['red', 'blue', 'green', 'yellow']
-        numbers = [str(i) for i in range(0, 10)]
-        deck = [f"{colour}_{number}" for colour in colours for number in numbers]
-        return deck + deck.copy()
+        # Draws come out of the Deck at random, so it never needs reshuffling
+        return Deck(create_deck(), self.rng)
 
-game_state2 = GameState2()
+# Set up by main_game3_loop for each game
+game_state2 = None
+ai_worker = AIWorker()
+timeline = Timeline()
 
 # Game state variables
 deck_width, deck_height = 90, 130
@@ -217,7 +93,7 @@ vertical_offset = 50
 deck_y = (screen_height - deck_height) // 2 - vertical_offset
 
 space_between_deck_and_cards = 20
-drawn_cards_width = game_state2.max_draw_per_turn * overlap_spacing
+drawn_cards_width = MAX_DRAW_PER_TURN * overlap_spacing
 total_width = deck_width + space_between_deck_and_cards + ((max_drawn_cards - 1) * overlap_spacing)
 
 # Button configurations
@@ -236,6 +112,8 @@ return_button_area = pygame.Rect(return_button_x, button_y, button_width, button
 # Align deck and drawn cards with buttons
 deck_x = button_x  # Deck starts where Done button starts
 deck_area = pygame.Rect(deck_x, deck_y, deck_width, deck_height)
+# Where the cards drawn this turn are laid out, beside the deck
+drawn_cards_x = deck_x + deck_width + 20
 
 # Drawn cards start where Return button starts
 drawn_card_start_x = return_button_x
@@ -256,50 +134,19 @@ yes_button_area = pygame.Rect(screen_width // 2 - 60, deck_y + deck_height + 150
 no_button_area = pygame.Rect(screen_width // 2 + 10, deck_y + deck_height + 150, 50, 40)
 
 
-# Load assets
-card_images = {}
-for filename in os.listdir(CARD_IMAGES):
-    if filename.endswith(".png"):
-        card_name = filename.replace(".png", "")
-        image_path = os.path.join(CARD_IMAGES, filename)
-        card_images[card_name] = pygame.image.load(image_path)
-
-card_back_image = pygame.image.load(CARD_BACK_IMAGE_PATH)
-card_back_image = pygame.transform.scale(card_back_image, (100, 140))
-shuffle_sound = pygame.mixer.Sound("shuffle_sound.mp3")
-
-
-def draw_button(text, x, y, width, height, color=(0, 122, 204), text_color=(0, 0, 0)):
-    pygame.draw.rect(screen, color, (x, y, width, height))
-    font = pygame.font.Font(None, 28)
-    text_surf = font.render(text, True, text_color)
-    text_rect = text_surf.get_rect(center=(x + width // 2, y + height // 2))
-    screen.blit(text_surf, text_rect)
-
 def draw_discard_buttons():
     """
     Draws Yes/No buttons for discarding a valid group of cards.
     Only appears when the player is prompted to make a discard decision.
     """
     if game_state2.waiting_for_discard_decision:
-        draw_button("Yes", yes_button_area.x, yes_button_area.y, 
-                    yes_button_area.width, yes_button_area.height,
-                    color=(0, 122, 204))
-        draw_button("No", no_button_area.x, no_button_area.y, 
-                    no_button_area.width, no_button_area.height,
-                    color=(204, 0, 0))
+        game_table.draw_button(screen, "Yes", yes_button_area.x, yes_button_area.y,
+                               yes_button_area.width, yes_button_area.height,
+                               color=(0, 122, 204))
+        game_table.draw_button(screen, "No", no_button_area.x, no_button_area.y,
+                               no_button_area.width, no_button_area.height,
+                               color=(204, 0, 0))
         
-def show_card(card_name, x, y, width=100, height=140, face_down=False):
-    if face_down:
-        screen.blit(card_back_image, (x, y))
-    else:
-        if card_name in card_images:
-            card_image = card_images[card_name]
-            card_image = pygame.transform.scale(card_image, (width, height))
-            screen.blit(card_image, (x, y))
-        else:
-            print(f"Card {card_name} not found!")
-
 def display_cards(player_id, spacing=30):
     # Human player settings
     base_y = 50 if player_id == 1 else (screen_height // 2)  # Center point for computer players
@@ -336,14 +183,14 @@ def display_cards(player_id, spacing=30):
 
         # Draw regular cards
         for card in regular_cards:
-            show_card(card, current_x, current_y)
+            game_table.show_card(screen, card, current_x, current_y)
             current_x += spacing
 
         # Draw valid groups with spacing
         if game_state2.valid_groups[player_id] is not None:
             current_x += 20  # Add spacing between regular cards and valid group
             for card_str in valid_card_strs:
-                show_card(card_str, current_x, current_y)
+                game_table.show_card(screen, card_str, current_x, current_y)
                 current_x += spacing
 
         # Draw largest groups with spacing
@@ -351,7 +198,7 @@ def display_cards(player_id, spacing=30):
                 largest_card_strs != valid_card_strs):
             current_x += 60  # Add spacing between valid group and largest group
             for card_str in largest_card_strs:
-                show_card(card_str, current_x, current_y)
+                game_table.show_card(screen, card_str, current_x, current_y)
                 current_x += spacing
 
     # Computer players - vertical layout
@@ -375,14 +222,14 @@ def display_cards(player_id, spacing=30):
 
         # Draw regular cards
         for card in regular_cards:
-            show_card(card, current_x, current_y)
+            game_table.show_card(screen, card, current_x, current_y)
             current_y += vertical_spacing
 
         # Draw valid groups with spacing
         if game_state2.valid_groups[player_id] is not None:
             current_y += 20  # Add spacing between regular cards and valid group
             for card_str in valid_card_strs:
-                show_card(card_str, current_x, current_y)
+                game_table.show_card(screen, card_str, current_x, current_y)
                 current_y += vertical_spacing
 
         # Draw largest groups with spacing
@@ -390,25 +237,13 @@ def display_cards(player_id, spacing=30):
             if largest_card_strs != valid_card_strs:
                 current_y += 40  # Add spacing between valid group and largest group
                 for card_str in largest_card_strs:
-                    show_card(card_str, current_x, current_y)
+                    game_table.show_card(screen, card_str, current_x, current_y)
                     current_y += vertical_spacing
 
-def draw_player_name(name, x, y, color=(255, 255, 255)):
-    font = pygame.font.Font(None, 30)
-    text_surf = font.render(name, True, color)
-    screen.blit(text_surf, (x, y))
-
 def draw_player_names():
-    draw_player_name("You", screen_width//2, 200)  
-    draw_player_name("Computer 1", screen_width - 295, 390)
-    draw_player_name("Computer 2", 185, 390)
-
-def clear_drawn_card_area():
-    clear_rect_x = drawn_card_start_x
-    clear_rect_y = deck_y
-    clear_rect_width = max_drawn_cards * (deck_width + overlap_spacing)
-    clear_rect_height = deck_height
-    pygame.draw.rect(screen, (0, 128, 0), (clear_rect_x, clear_rect_y, clear_rect_width, clear_rect_height))
+    game_table.draw_player_name(screen, "You", screen_width//2, 200)  
+    game_table.draw_player_name(screen, "Computer 1", screen_width - 295, 390)
+    game_table.draw_player_name(screen, "Computer 2", 185, 390)
 
 def draw_message():
     if game_state2.message:
@@ -419,68 +254,34 @@ def draw_message():
         # Position the box at bottom with padding (original position)
         message_box_x = (screen_width - message_box_width) // 2
         message_box_y = screen_height - message_box_height - 30  # 30px padding from bottom
-        
-        # Increased font size
-        font_size = 30
-        font = pygame.font.Font(None, font_size)
-        
-        # Word wrapping logic
-        words = game_state2.message.split()
-        lines = []
-        current_line = words[0]
-        
-        for word in words[1:]:
-            test_line = current_line + " " + word
-            test_surface = font.render(test_line, True, (255, 255, 255))
-            
-            if test_surface.get_width() <= (message_box_width - 60):
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-        
-        lines.append(current_line)
-        text_surfaces = [font.render(line.upper(), True, (255, 255, 255)) for line in lines]
-        
-        # Semi-transparent black background
-        background_surface = pygame.Surface((message_box_width, message_box_height))
-        background_surface.set_alpha(180)
-        background_surface.fill((0, 0, 0))
-        screen.blit(background_surface, (message_box_x, message_box_y))
-        
-        # Calculate text positioning
-        total_text_height = sum(surface.get_height() for surface in text_surfaces)
-        line_spacing = 10
-        total_height = total_text_height + (line_spacing * (len(lines) - 1)) if len(lines) > 1 else total_text_height
-        
-        # Move text up 75px from center of box
-        current_y = message_box_y + (message_box_height - total_height) // 2 - 50
-        
-        # Draw each line of text centered in the box
-        for surface in text_surfaces:
-            text_rect = surface.get_rect(centerx=screen_width // 2, y=current_y)
-            screen.blit(surface, text_rect)
-            current_y += surface.get_height() + line_spacing
+
+        # Text sits 50px above the centre of the box
+        game_table.draw_message(screen, game_state2.message,
+                                (message_box_x, message_box_y, message_box_width, message_box_height),
+                                margin=60, alpha=180, line_spacing=10, lift=50)
 
 def check_hand_validity(player_id):
     player_name = "Human" if player_id == 1 else "Computer"
     current_message = game_state2.message
     
-    print(f"\nChecking {player_name}'s hand for groups...")  # Debug
-    hand_collection = CollectionOfCards(game_state2.player_hands[player_id])
-    valid_group = hand_collection.find_valid_group()
-    largest_group = hand_collection.find_largest_valid_group()
+    if DEBUG_GROUP_CHECKS:
+        print(f"\nChecking {player_name}'s hand for groups...")  # Debug
+    valid_names, largest_names = game_state2.group_trackers[player_id].groups()
+    valid_group = cards_of(valid_names)
+    largest_group = cards_of(largest_names)
 
     game_state2.valid_groups[player_id] = valid_group
     game_state2.largest_groups[player_id] = largest_group
     
     if player_id == game_state2.current_player:
         if not valid_group:
-            print(f"No valid group found for {player_name}")  # Debug
+            if DEBUG_GROUP_CHECKS:
+                print(f"No valid group found for {player_name}")  # Debug
             game_state2.message = current_message
         else:
-            cards_str = ", ".join(str(card) for card in valid_group)
-            print(f"{player_name} has a valid group: {cards_str}")  # Debug
+            if DEBUG_GROUP_CHECKS:
+                cards_str = ", ".join(str(card) for card in valid_group)
+                print(f"{player_name} has a valid group: {cards_str}")  # Debug
             game_state2.message = "Valid group formed!"  # Simplified message
             
             if player_id == 1:
@@ -488,15 +289,20 @@ def check_hand_validity(player_id):
         
         if largest_group and (not valid_group or str(largest_group) != str(valid_group)):
             if len(largest_group) > 3 and not waiting_for_discard_decision:
-                cards_str = ", ".join(str(card) for card in largest_group)
-                print(f"{player_name} has a larger group: {cards_str}")  # Debug
+                if DEBUG_GROUP_CHECKS:
+                    cards_str = ", ".join(str(card) for card in largest_group)
+                    print(f"{player_name} has a larger group: {cards_str}")  # Debug
                 game_state2.message = "Larger group formed!"  # Simplified message
     else:
-        if not valid_group:
+        if not valid_group and DEBUG_GROUP_CHECKS:
             print(f"No valid group found for {player_name}")  # Debug
 
 def handle_discard(player_id):
-
+    """
+    Script that moves the player's valid group into the deck and shuffles it.
+    Run it on the timeline.
+    """
+    game_state2.waiting_for_discard_decision = False
     if game_state2.valid_groups[player_id]:
         discarded_cards = [str(card) for card in game_state2.valid_groups[player_id]]
         print(f"{'Human' if player_id == 1 else 'Computer'} discards: {discarded_cards}")
@@ -561,73 +367,27 @@ def handle_discard(player_id):
                     card_index = regular_cards.index(card)
                     y = base_y + card_index * vertical_spacing
                     start_positions.append((base_x, y))
-        
-      
-        end_position = (deck_x, deck_y)
-        
-        # Store original hand
-        original_hand = game_state2.player_hands[player_id][:]
-        
-        # Animate cards moving to deck
-        for step in range(30):
-            progress = step / 30
-            screen.fill((15, 20, 45))
-            
-            # Display all players' cards
-            for p in range(1, 4):
-                if p != player_id:
-                    display_cards(p)
-                else:
-                    # For animating player, show non-discarded cards in their original positions
-                    temp_hand = game_state2.player_hands[p][:]
-                    game_state2.player_hands[p] = [card for card in original_hand
-                                                   if card not in discarded_cards]
-                    display_cards(p)
-                    game_state2.player_hands[p] = temp_hand
-            
-            # Draw animating cards
-            for i, card in enumerate(discarded_cards):
-                start_x, start_y = start_positions[i]
-                current_x = start_x + (end_position[0] - start_x) * progress
-                current_y = start_y + (end_position[1] - start_y) * progress
-                show_card(card, current_x, current_y)
-            
-            # Draw deck
-            if game_state2.full_deck:
-                screen.blit(card_back_image, (deck_x, deck_y))
-            
-            draw_message()
-            pygame.display.flip()
-            pygame.time.wait(20)
-        
-        # After animation, update player's hand
-        game_state2.player_hands[player_id] = [card for card in game_state2.player_hands[player_id]
-                                               if card not in discarded_cards]
-        
+
+        # The group leaves the hand as it starts moving to the deck
+        game_state2.group_trackers[player_id].discard(discarded_cards)
+        game_state2.knowledge.discard(player_id, discarded_cards)
+        game_state2.valid_groups[player_id] = None
+        game_state2.largest_groups[player_id] = None
+
+        yield [CardMove(partial(game_table.show_card, screen, card), start, (deck_x, deck_y))
+               for card, start in zip(discarded_cards, start_positions)]
+
         # Add cards to deck and shuffle
         game_state2.full_deck.extend(discarded_cards)
-        game_state2.shuffle_count = 0
-        game_state2.shuffle_complete = False
-        
-        while not game_state2.shuffle_complete:
-            shuffle_deck()
-            pygame.display.flip()
-            pygame.time.wait(50)
-        
-        random.shuffle(game_state2.full_deck)
+        yield from shuffle_deck()
 
         check_winning_state()
 
-        game_state2.valid_groups[player_id] = None
-        game_state2.largest_groups[player_id] = None
-
         game_state2.message = "Valid group discarded!"
-        pygame.time.wait(500)
+        yield Pause(500)
 
-    game_state2.waiting_for_discard_decision = False
     game_state2.current_player = 2
     game_state2.message = "Computer 1's turn"
-    
 def handle_card_addition(player_id):
     if player_id == 1:
         print(f"Human adds {len(game_state2.drawn_cards)} cards to hand")
@@ -653,30 +413,31 @@ def draw_card():
         return game_state2.full_deck.pop()
     return None
 
-def can_add_cards(player_id, num_cards):
-    return len(game_state2.player_hands[player_id]) + num_cards <= game_state2.max_cards_in_hand
-
-def is_hand_full(player_id):
-    return len(game_state2.player_hands[player_id]) >= game_state2.max_cards_in_hand
-
 def handle_ai_discard():
+    """
+    Script in which Computer 1 may discard its valid group, which fades out
+    beside the deck. Returns True if it did, for `yield from`.
+    """
     if game_state2.valid_groups[2] is None:
         return False
     
     print("\nComputer discard decision process:")  # Debug 
     print(f"- Valid group available: {[str(card) for card in game_state2.valid_groups[2]]}")  # Debug
     
-    random_choice = random.random()
+    random_choice = game_state2.rng.random()
     print(f"- Random value: {random_choice:.2f} (Will discard if < 0.5)")  # Debug
     
     if random_choice < 0.5:
         print("- Decision: Computer WILL discard the group")  # Debug
-        discarded_cards = [str(card) for card in game_state2.valid_groups[2]]
+        # Discard the group that leaves the rest of the hand best covered
+        discarded_cards = best_discard(game_state2.player_hands[2])
+        if discarded_cards is None:
+            print("- No valid group left to discard")  # Debug
+            return False
         game_state2.full_deck.extend(discarded_cards)
-        random.shuffle(game_state2.full_deck)
 
-        game_state2.player_hands[2] = [card for card in game_state2.player_hands[2]
-                                       if card not in discarded_cards]
+        game_state2.group_trackers[2].discard(discarded_cards)
+        game_state2.knowledge.discard(2, discarded_cards)
 
         game_state2.valid_groups[2] = None
         game_state2.largest_groups[2] = None
@@ -685,93 +446,54 @@ def handle_ai_discard():
         print(f"- Cards discarded: {discarded_cards}")  # Debug
         print(f"- Remaining hand size: {len(game_state2.player_hands[2])}")  # Debug
         check_winning_state()
-        pygame.time.wait(1000)  
+        yield Fade(partial(game_table.show_beside_deck, screen, drawn_cards_x, deck_y, discarded_cards), 1000)
         return True
     else:
         print("- Decision: Computer will NOT discard the group")  # Debug
         return False
-    
 def shuffle_deck():
-    screen.fill((15, 20, 45))
-    game_state2.shuffle_count += 1
-
-    offset = 5 if game_state2.shuffle_count % 10 < 5 else -5
-    deck_bounce_y = deck_y + offset
-    screen.blit(card_back_image, (deck_x, deck_bounce_y))
-
-    if game_state2.shuffle_count == 1:
-        shuffle_sound.play()
-
-    if game_state2.shuffle_count > 40:
-        game_state2.shuffle_complete = True
-        random.shuffle(game_state2.full_deck)
-        print("Deck shuffled")  # Debug
+    """
+    Script that bounces the deck while the shuffle sound plays. The main loop
+    leaves the deck out of the scene until the shuffle is complete.
+    """
+    game_state2.shuffle_complete = False
+    assets.sound().play()
+    yield Bounce(partial(game_table.draw_deck, screen, deck_x, deck_y), SHUFFLE_TIME)
+    game_state2.shuffle_complete = True
+    print("Deck shuffled")  # Debug
 
 def return_single_card():
 
     if game_state2.drawn_cards:
         # Get the last drawn card
         card_to_return = game_state2.drawn_cards.pop()
-        
-        # Animate the card returning to deck
-        start_x = deck_x + deck_width + 20 + (len(game_state2.drawn_cards)) * overlap_spacing
-        start_y = deck_y
-        end_x = deck_x
-        end_y = deck_y
-        
-        # Perform return animation
-        for step in range(30):
-            progress = step / 30
-            current_x = start_x + (end_x - start_x) * progress
-            current_y = start_y + (end_y - start_y) * progress
-            
-            # Redraw game state
-            screen.fill((15, 20, 45))
-            display_cards(1)
-            display_cards(2)
-            display_cards(3)
-            
-            # Draw remaining drawn cards
-            for i, _ in enumerate(game_state2.drawn_cards):
-                drawn_card_x = deck_x + deck_width + 20 + i * overlap_spacing
-                drawn_card_y = deck_y
-                show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-            
-            # Draw animating card
-            show_card(None, current_x, current_y, face_down=True)
-            
-            # Draw deck
-            if game_state2.full_deck:
-                screen.blit(card_back_image, (deck_x, deck_y))
-            
-            draw_message()
-            pygame.display.flip()
-            pygame.time.wait(10)
-        
-        # Add the card back to deck and shuffle
-        game_state2.full_deck.append(card_to_return)
-        random.shuffle(game_state2.full_deck)
-        
-        cards_left = len(game_state2.drawn_cards)
-        if cards_left > 0:
-            game_state2.message = f"Card returned. {cards_left} {'cards' if cards_left > 1 else 'card'} left to return"
-        else:
-            game_state2.message = "All cards returned to deck"
-            
+        start = (drawn_cards_x + len(game_state2.drawn_cards) * overlap_spacing, deck_y)
+        timeline.run(return_to_deck(card_to_return, start))
         return True
     return False
 
+def return_to_deck(card_to_return, start):
+    """Script that moves a drawn card face down back onto the deck."""
+    yield CardMove(partial(game_table.show_card, screen, None, face_down=True), start, (deck_x, deck_y), RETURN_TIME)
+
+    game_state2.full_deck.append(card_to_return)
+    
+    cards_left = len(game_state2.drawn_cards)
+    if cards_left > 0:
+        game_state2.message = f"Card returned. {cards_left} {'cards' if cards_left > 1 else 'card'} left to return"
+    else:
+        game_state2.message = "All cards returned to deck"
+
 def snatch_card():
 
-    if is_hand_full(1):
+    if not has_room(game_state2, 1):
         print("Human cannot snatch - hand full")
         game_state2.message = "Cannot snatch more cards - Human hand is full!"
         return False
         
     if game_state2.player_hands[2]:
-        snatched_card = game_state2.player_hands[2].pop(random.randint(0, len(game_state2.player_hands[2]) - 1))
+        snatched_card = take_card(game_state2, 1, 2, game_state2.rng.randint(0, len(game_state2.player_hands[2]) - 1))
         print(f"Human snatches card: {snatched_card}")
-        game_state2.player_hands[1].append(snatched_card)
         
         check_hand_validity(1)
         check_hand_validity(2)
@@ -801,124 +523,88 @@ def draw_card_counter(screen, player_hand_size):
     # Position the counter near the human player's cards
     counter_x = screen_width - 460  # Right side of screen
     counter_y = 200  # Above the player's cards
-    font = pygame.font.Font(None, 30)
     counter_text = f"{player_hand_size}/20"
-    text_surf = font.render(counter_text, True, (255, 255, 255))
+    text_surf = assets.text(counter_text, 30, (255, 255, 255))
     screen.blit(text_surf, (counter_x, counter_y))
 
-def ai_turn():
+def ai_turn(decision=None):
+    """
+    Script that plays Computer 1's turn against the Human. Run it on the timeline.
+
+    Args:
+        decision (dict): From game_table.decide_ai_turn; decided here if None.
+    """
+    if decision is None:
+        decision = game_table.decide_ai_turn(random.Random(game_state2.rng.getrandbits(64)),
+                                             HandBits(list(game_state2.player_hands[2])),
+                                             game_state2.max_cards_in_hand - len(game_state2.player_hands[2]),
+                                             len(game_state2.player_hands[1]), copy.deepcopy(game_state2.knowledge))
 
     print("\nComputer's turn:")  
     if game_state2.current_player == 2 and game_state2.valid_groups[2] is not None:
-        if handle_ai_discard():
+        if (yield from handle_ai_discard()):
             print("Computer discards valid group")  
             game_state2.current_player = 1
             game_state2.message = "Your turn"
             game_state2.message_timer = pygame.time.get_ticks()
             return
     
-    action = random.choice(['draw', 'snatch', 'skip'])
+    action = decision['action']
     print(f"Computer chooses to: {action}")  
     
     if action == 'draw':
-        if is_hand_full(2):
+        if not has_room(game_state2, 2):
             print("Computer cannot draw - hand full")  
             game_state2.message = "Computer's hand is full!"
         else:    
-            num_draws = random.randint(1, min(3, game_state2.max_cards_in_hand - len(game_state2.player_hands[2])))
+            num_draws = decision['num_draws']
             print(f"Computer draws {num_draws} cards")  
-            temp_drawn_cards = []
 
             game_state2.message = f"Computer draws {num_draws} card{'s' if num_draws > 1 else ''}"
             
+            # Drawn cards are shown face down beside the deck
             for i in range(num_draws):
                 card = draw_card()
                 if card:
-                    temp_drawn_cards.append(card)
-                    screen.fill((15, 20, 45))
-                    display_cards(1, 50)
-                    display_cards(2, 50)
-                    
-                    if game_state2.full_deck:
-                        screen.blit(card_back_image, (deck_x, deck_y))
-                    
-                    for j in range(len(temp_drawn_cards)):
-                        drawn_card_x = deck_x + deck_width + 20 + j * overlap_spacing
-                        drawn_card_y = deck_y
-                        show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-                    
-                    draw_message()
-                    pygame.display.flip()
-                    pygame.time.wait(500)
+                    game_state2.drawn_cards.append(card)
+                    yield Pause(500)
             
-            pygame.time.wait(1000)
+            yield Pause(1000)
             
-            start_positions = [(deck_x + deck_width + 20 + i * overlap_spacing, deck_y) 
-                             for i in range(len(temp_drawn_cards))]
-            end_positions = [(50 + (len(game_state2.player_hands[2]) + i) * 30, 450)
-                           for i in range(len(temp_drawn_cards))]
-            
-            for step in range(30):
-                progress = step / 30
-                screen.fill((15, 20, 45))
-                display_cards(1, 50, 50)
-                display_cards(2, 50, 578)
-                
-                if game_state2.full_deck:
-                    screen.blit(card_back_image, (deck_x, deck_y))
-                
-                for i in range(len(temp_drawn_cards)):
-                    start_x, start_y = start_positions[i]
-                    end_x, end_y = end_positions[i]
-                    current_x = start_x + (end_x - start_x) * progress
-                    current_y = start_y + (end_y - start_y) * progress
-                    show_card(None, current_x, current_y, face_down=True)
-                
-                draw_message()
-                pygame.display.flip()
-                pygame.time.wait(20)
-
-            game_state2.player_hands[2].extend(temp_drawn_cards)
+            temp_drawn_cards = list(game_state2.drawn_cards)
+            game_state2.drawn_cards.clear()
+            yield [CardMove(partial(game_table.show_card, screen, None, face_down=True),
+                            (drawn_cards_x + i * overlap_spacing, deck_y),
+                            (50 + (len(game_state2.player_hands[2]) + i) * 30, 450))
+                   for i in range(len(temp_drawn_cards))]
+
+            game_state2.group_trackers[2].extend(temp_drawn_cards)
             print(f"Cards drawn: {temp_drawn_cards}")
             check_hand_validity(2)
             
             if game_state2.current_player == 2 and game_state2.valid_groups[2] is not None:
-                handle_ai_discard()
-                pygame.time.wait(500)
+                yield from handle_ai_discard()
+                yield Pause(500)
             
     elif action == 'snatch':
-        if is_hand_full(2):
+        if not has_room(game_state2, 2):
             print("Computer cannot snatch - hand full") 
             game_state2.message = "Computer's hand is full!"
         elif game_state2.player_hands[1]:
             game_state2.message = "Computer snatches Human's card"
-            snatched_index = random.randint(0, len(game_state2.player_hands[1]) - 1)
-            snatched_card = game_state2.player_hands[1].pop(snatched_index)
+            snatched_index = decision['snatch_index']
+            snatched_card = game_state2.group_trackers[1].pop(snatched_index)
             print(f"Computer snatches: {snatched_card}")  
-            start_x = 50 + snatched_index * 30
-            start_y = 10
-            end_x = 50 + len(game_state2.player_hands[2]) * 30
-            end_y = 450
-            
-            for step in range(30):
-                progress = step / 30
-                current_x = start_x + (end_x - start_x) * progress
-                current_y = start_y + (end_y - start_y) * progress
-                
-                screen.fill((15, 20, 45))
-                display_cards(1, 50, 50)
-                display_cards(2, 50, 578)
-                show_card(snatched_card, current_x, current_y)
-                draw_message()
-                pygame.display.flip()
-                pygame.time.wait(20)
-
-            game_state2.player_hands[2].append(snatched_card)
+            yield CardMove(partial(game_table.show_card, screen, snatched_card), (50 + snatched_index * 30, 10),
+                           (50 + len(game_state2.player_hands[2]) * 30, 450))
+
+            game_state2.group_trackers[2].add(snatched_card)
+            game_state2.knowledge.snatch(2, 1, snatched_card)
             check_hand_validity(2)
             
             if game_state2.current_player == 2 and game_state2.valid_groups[2] is not None:
-                handle_ai_discard()
-                pygame.time.wait(500)
+                yield from handle_ai_discard()
+                yield Pause(500)
         else:
             print("Computer cannot snatch - no cards available")  
             game_state2.message = "No cards for Computer to snatch!"
@@ -926,17 +612,10 @@ def ai_turn():
     else:
         game_state2.message = "Computer skips turn"
         print("Computer skips turn") 
-        screen.fill((15, 20, 45))
-        display_cards(1, 50, 50)
-        display_cards(2, 50, 578)
-        draw_message()
-        pygame.display.flip()
-        pygame.time.wait(1500)
-    
-    clear_drawn_card_area()
+        yield Pause(1500)
     
     if action != 'skip':
-        pygame.time.wait(1500)
+        yield Pause(1500)
 
     if action == 'snatch':
         check_hand_validity(1)
@@ -946,14 +625,44 @@ def ai_turn():
     game_state2.message = "Your turn"
     game_state2.message_timer = pygame.time.get_ticks()
     game_state2.waiting_for_discard_decision = False
-    
-    screen.fill((15, 20, 45))
-    display_cards(1, 50, 50)
-    display_cards(2, 50, 578)
-    draw_message()
-    pygame.display.flip()
 
-def strategic_ai_turn():
+def decide_strategic_turn(rng, hand, opponent_hand_size, max_cards_in_hand, knowledge):
+    """
+    Picks Computer 1's moves for strategic_ai_turn: snatch more often than
+    draw while the Human has cards, and always while the Human is known to
+    hold a card that completes one of its groups. Runs on the AI worker.
+
+    Returns:
+        dict: 'action', plus 'num_draws' for a draw and 'snatch_index' for a snatch.
+    """
+    own_hand_size = len(hand.cards)
+    if opponent_hand_size > 0 and own_hand_size < max_cards_in_hand:
+        if knowledge.best_snatch_target(2, hand, {1: opponent_hand_size}, [1]) is not None:
+            action = 'snatch'
+        else:
+            action = 'snatch' if rng.random() < 0.7 else 'draw'
+    else:
+        action = 'draw' if own_hand_size < max_cards_in_hand else 'skip'
+    decision = {'action': action}
+    if action == 'draw' and own_hand_size < max_cards_in_hand:
+        decision['num_draws'] = rng.randint(1, min(3, max_cards_in_hand - own_hand_size))
+    elif action == 'snatch':
+        decision['snatch_index'] = rng.randint(0, opponent_hand_size - 1)
+    return decision
+
+def strategic_ai_turn(decision=None):
+    """
+    Script that plays Computer 1's turn against the Human, discarding first
+    when it pays. Run it on the timeline.
+
+    Args:
+        decision (dict): From decide_strategic_turn; decided here if None.
+    """
+    if decision is None:
+        decision = decide_strategic_turn(random.Random(game_state2.rng.getrandbits(64)),
+                                         HandBits(list(game_state2.player_hands[2])),
+                                         len(game_state2.player_hands[1]), game_state2.max_cards_in_hand,
+                                         copy.deepcopy(game_state2.knowledge))
 
     print("\nStrategic Computer's turn:")  
     opponent_hand_size = len(game_state2.player_hands[1])
@@ -970,85 +679,67 @@ def strategic_ai_turn():
             discarded_cards = [str(card) for card in group_to_discard]
             print(f"Computer decides to discard group: {discarded_cards}")  
             game_state2.full_deck.extend(discarded_cards)
-            random.shuffle(game_state2.full_deck)
 
-            game_state2.player_hands[2] = [card for card in game_state2.player_hands[2]
-                             if card not in discarded_cards]
+            game_state2.group_trackers[2].discard(discarded_cards)
+            game_state2.knowledge.discard(2, discarded_cards)
 
             game_state2.valid_groups[2] = None
             game_state2.largest_groups[2] = None
 
             game_state2.message = "Computer discards group!"
-            pygame.time.wait(1000)
+            yield Pause(1000)
             game_state2.current_player = 1
             game_state2.message = "Your turn"
             game_state2.message_timer = pygame.time.get_ticks()
             return
     
-    if opponent_hand_size > 0 and own_hand_size < game_state2.max_cards_in_hand:
-        action = 'snatch' if random.random() < 0.7 else 'draw'
-    else:
-        action = 'draw' if own_hand_size < game_state2.max_cards_in_hand else 'skip'
+    action = decision['action']
     
     print(f"Computer chooses to: {action}")  
     
     if action == 'draw':
-        if is_hand_full(2):
+        if not has_room(game_state2, 2):
             print("Computer cannot draw - hand full")  
             game_state2.message = "Computer's hand is full!"
         else:    
-            optimal_draws = min(3, game_state2.max_cards_in_hand - own_hand_size)
-            num_draws = random.randint(1, optimal_draws)
-            temp_drawn_cards = []
+            num_draws = decision['num_draws']
 
             game_state2.message = f"Computer draws {num_draws} card{'s' if num_draws > 1 else ''}"
             print(f"Computer draws {num_draws} cards")  
             
+            # Drawn cards are shown face down beside the deck
             for _ in range(num_draws):
                 card = draw_card()
                 if card:
-                    temp_drawn_cards.append(card)
-                    screen.fill((15, 20, 45))
-                    display_cards(1, 50, 50)
-                    display_cards(2, 50, 578)
-                    
-                    if game_state2.full_deck:
-                        screen.blit(card_back_image, (deck_x, deck_y))
-                    
-                    for j in range(len(temp_drawn_cards)):
-                        drawn_card_x = deck_x + deck_width + 20 + j * overlap_spacing
-                        drawn_card_y = deck_y
-                        show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-                    
-                    draw_message()
-                    pygame.display.flip()
-                    pygame.time.wait(500)
+                    game_state2.drawn_cards.append(card)
+                    yield Pause(500)
             
-            pygame.time.wait(1000)
+            yield Pause(1000)
+            temp_drawn_cards = list(game_state2.drawn_cards)
+            game_state2.drawn_cards.clear()
             print(f"Cards drawn: {temp_drawn_cards}")  
-            game_state2.player_hands[2].extend(temp_drawn_cards)
+            game_state2.group_trackers[2].extend(temp_drawn_cards)
             check_hand_validity(2)
             
     elif action == 'snatch':
-        if is_hand_full(2):
+        if not has_room(game_state2, 2):
             print("Computer cannot snatch - hand full")  
             game_state2.message = "Computer's hand is full!"
         elif game_state2.player_hands[1]:
             game_state2.message = "Computer snatches card"
-            snatched_index = random.randint(0, len(game_state2.player_hands[1]) - 1)
-            snatched_card = game_state2.player_hands[1].pop(snatched_index)
+            snatched_index = decision['snatch_index']
+            snatched_card = take_card(game_state2, 2, 1, snatched_index)
             print(f"Computer snatches: {snatched_card}")  
-            game_state2.player_hands[2].append(snatched_card)
             check_hand_validity(2)
+            check_hand_validity(1)
             
     else:
         game_state2.message = "Computer skips turn"
         print("Computer skips turn")
-        pygame.time.wait(1500)
+        yield Pause(1500)
     
-    clear_drawn_card_area()
     if action != 'skip':
-        pygame.time.wait(1500)
+        yield Pause(1500)
 
     game_state2.current_player = 1
     game_state2.drawn_cards.clear()
@@ -1057,123 +748,213 @@ def strategic_ai_turn():
     game_state2.waiting_for_discard_decision = False
 
 def display_game_message(new_message, wait_time=0):
-    screen.fill((15, 20, 45))
-    display_cards(1)
-    display_cards(2)
-    display_cards(3)
-    if game_state2.full_deck:
-        screen.blit(card_back_image, (deck_x, deck_y))
+    """Shows a message; returns a Pause for scripts to yield to hold it on screen."""
     game_state2.message = new_message
-    draw_message()
-    pygame.display.flip()
-    if wait_time > 0:
-        pygame.time.wait(wait_time)
+    return Pause(wait_time)
 
-def handle_computer_turn(player_id):
+def decide_computer_turn(rng, player_id, hand, hand_space, hand_sizes, knowledge):
+    """
+    Picks a computer's moves for handle_computer_turn. Runs on the AI worker,
+    so it only reads the snapshot it is given.
+
+    Args:
+        rng (random.Random): The decision's own random source.
+        player_id (int): The computer to move (2 or 3).
+        hand (HandBits): A copy of its hand.
+        hand_space (int): Cards its hand has room for.
+        hand_sizes (dict): Cards in each player's hand.
+        knowledge (CardKnowledge): A copy of the game's knowledge.
+
+    Returns:
+        dict: 'action' and 'discard' (whether to discard a group the move
+        forms), plus 'num_draws' for a draw, and 'target_player' and
+        'snatch_index' for a snatch.
+    """
+    decision = {'action': rng.choice(['draw', 'snatch', 'skip'])}
+    if decision['action'] == 'draw' and hand_space > 0:
+        decision['num_draws'] = knowledge.best_draw_count(player_id, hand, min(3, hand_space))
+    elif decision['action'] == 'snatch' and hand_space > 0:
+        available_players = [p for p in [1, 2, 3] if p != player_id and hand_sizes[p]]
+        if available_players:
+            # Snatch from whoever is known to hold a card that completes a group
+            target_player = knowledge.best_snatch_target(player_id, hand, hand_sizes, available_players)
+            if target_player is None:
+                target_player = rng.choice(available_players)
+            decision['target_player'] = target_player
+            decision['snatch_index'] = rng.randint(0, hand_sizes[target_player] - 1)
+    decision['discard'] = rng.random() < 0.5
+    return decision
+
+def computer_decision_args(player_id):
+    """Snapshots the game for decide_computer_turn, seeding its rng from the game's."""
+    return (random.Random(game_state2.rng.getrandbits(64)), player_id,
+            HandBits(list(game_state2.player_hands[player_id])),
+            game_state2.max_cards_in_hand - len(game_state2.player_hands[player_id]),
+            {p: len(hand) for p, hand in game_state2.player_hands.items()},
+            copy.deepcopy(game_state2.knowledge))
+
+def handle_computer_turn(player_id, decision=None):
+    """
+    Script that plays a computer's turn. Run it on the timeline.
+
+    Args:
+        decision (dict): From decide_computer_turn, usually computed on the AI
+            worker. Decided here if None; a failed decision skips the turn.
+    """
+    if decision is None:
+        decision = decide_computer_turn(*computer_decision_args(player_id))
 
     print(f"\n=== Computer {player_id-1}'s Turn ===")
-    display_game_message(f"Computer {player_id-1}'s turn", 1500)
+    yield display_game_message(f"Computer {player_id-1}'s turn", 1500)
     
-    action = random.choice(['draw', 'snatch', 'skip'])
+    action = decision['action']
     print(f"Chosen action: {action}")
     
     if action == 'draw':
-        if is_hand_full(player_id):
+        if not has_room(game_state2, player_id):
             display_game_message(f"Computer {player_id-1}'s hand is full!")
             print("Hand full - cannot draw")
         else:    
-            num_draws = random.randint(1, min(3, game_state2.max_cards_in_hand - len(game_state2.player_hands[player_id])))
+            num_draws = decision['num_draws']
             print(f"Drawing {num_draws} cards")
-            display_game_message(f"Computer {player_id-1} draws {num_draws} card{'s' if num_draws > 1 else ''}", 500)
-            temp_drawn_cards = []
+            yield display_game_message(f"Computer {player_id-1} draws {num_draws} card{'s' if num_draws > 1 else ''}", 500)
             
+            # Drawn cards are shown face down beside the deck
             for _ in range(num_draws):
                 card = draw_card()
                 if card:
-                    temp_drawn_cards.append(card)
+                    game_state2.drawn_cards.append(card)
                     print(f"Drew card: {card}")
-                    update_display_with_drawn_cards(temp_drawn_cards)
-                    pygame.time.wait(500)
+                    yield Pause(500)
 
-            game_state2.player_hands[player_id].extend(temp_drawn_cards)
+            game_state2.group_trackers[player_id].extend(game_state2.drawn_cards)
+            game_state2.drawn_cards.clear()
             check_hand_validity(player_id)
             
             if game_state2.valid_groups[player_id] is not None:
                 group_cards = [str(card) for card in game_state2.valid_groups[player_id]]
                 print(f"Valid group formed: {group_cards}")
-                display_game_message("Valid group formed!", 1000)  # Simplified message
-                if random.random() < 0.5:
+                yield display_game_message("Valid group formed!", 1000)  # Simplified message
+                if decision.get('discard'):
                     print("Deciding to discard group")
-                    handle_ai_discard()
+                    yield from handle_ai_discard()
     
     elif action == 'snatch':
-        if is_hand_full(player_id):
+        if not has_room(game_state2, player_id):
             display_game_message(f"Computer {player_id-1}'s hand is full!")
             print("Hand full - cannot snatch")
-        elif available_players := [p for p in [1, 2, 3] if p != player_id and game_state2.player_hands[p]]:
-            target_player = random.choice(available_players)
+        elif 'target_player' in decision:
+            target_player = decision['target_player']
             target_name = 'Human' if target_player == 1 else f'Computer {target_player-1}'
             print(f"Snatching from {target_name}")
             display_game_message(f"Computer {player_id-1} snatches a card from {target_name}")
             
-            snatched_card = handle_snatch(player_id, target_player)
+            snatched_card = yield from handle_snatch(player_id, target_player, decision['snatch_index'])
             print(f"Snatched card: {snatched_card}")
             check_hand_validity(player_id)
+            check_hand_validity(target_player)
             
             if game_state2.valid_groups[player_id] is not None:
                 group_cards = [str(card) for card in game_state2.valid_groups[player_id]]
                 print(f"Valid group formed: {group_cards}")
-                display_game_message("Valid group formed!", 1000)  # Simplified message
-                if random.random() < 0.5:
+                yield display_game_message("Valid group formed!", 1000)  # Simplified message
+                if decision.get('discard'):
                     print("Deciding to discard group")
-                    handle_ai_discard()
+                    yield from handle_ai_discard()
         else:
             print("No cards available to snatch")
             display_game_message(f"Computer {player_id-1} cannot snatch - no cards available!")
     else:
         print("Skipping turn")
-        display_game_message(f"Computer {player_id-1} skips turn", 1000)
+        yield display_game_message(f"Computer {player_id-1} skips turn", 1000)
     
     next_player = 1 if player_id == 3 else player_id + 1
     game_state2.current_player = next_player
     game_state2.waiting_for_discard_decision = False
 
     if next_player == 1:
-        display_game_message("Your turn", 1000)
-
-def update_display_with_drawn_cards(temp_drawn_cards):
-    screen.fill((15, 20, 45))
-    for p in range(1, 4):
-        display_cards(p)
-    if game_state2.full_deck:
-        screen.blit(card_back_image, (deck_x, deck_y))
-    for j, _ in enumerate(temp_drawn_cards):
-        drawn_card_x = deck_x + deck_width + 20 + j * overlap_spacing
-        drawn_card_y = deck_y
-        show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-    pygame.display.flip()
-
-def handle_snatch(player_id, target_player):
-    snatched_index = random.randint(0, len(game_state2.player_hands[target_player]) - 1)
-    snatched_card = game_state2.player_hands[target_player].pop(snatched_index)
-    game_state2.player_hands[player_id].append(snatched_card)
-    pygame.time.wait(1000)
+        yield display_game_message("Your turn", 1000)
+
+def handle_snatch(player_id, target_player, snatched_index=None):
+    """Script that moves a card between hands. Returns the card, for `yield from`."""
+    if snatched_index is None:
+        snatched_index = game_state2.rng.randint(0, len(game_state2.player_hands[target_player]) - 1)
+    snatched_card = take_card(game_state2, player_id, target_player, snatched_index)
+    yield Pause(1000)
     return snatched_card
 
+def check_winning_state():
+    for player_id, hand in game_state2.player_hands.items():
+        if len(hand) == 0:
+            winner_name = PLAYER_NAMES[player_id]
+            print(f"{winner_name} wins!")  # Debug
+            show_winning_screen(winner_name, PLAYER_NAMES[1])
+            return True
+    return False
+
+def build_scene():
+    """
+    Lays out the table for the dirty-rect renderer, back to front. Each layer
+    is redrawn only when its key changes.
+    """
+    scene = DirtyRenderer(screen, BACKGROUND_COLOR)
+    scene.add((screen_width // 2, 200, 150, 30),
+              lambda: game_table.draw_player_name(screen, "You", screen_width // 2, 200))
+    scene.add((screen_width - 295, 390, 150, 30),
+              lambda: game_table.draw_player_name(screen, "Computer 1", screen_width - 295, 390))
+    scene.add((185, 390, 150, 30), lambda: game_table.draw_player_name(screen, "Computer 2", 185, 390))
+    # The Human's hand runs across the top, the computers' down the sides
+    scene.add((0, 50, screen_width, 140), lambda: display_cards(1), lambda: game_table.hand_key(game_state2, 1))
+    scene.add((screen_width - 150, 0, 100, screen_height), lambda: display_cards(2),
+              lambda: game_table.hand_key(game_state2, 2))
+    scene.add((50, 0, 100, screen_height), lambda: display_cards(3), lambda: game_table.hand_key(game_state2, 3))
+    scene.add((screen_width - 460, 200, 80, 30), lambda: draw_card_counter(screen, len(game_state2.player_hands[1])),
+              lambda: len(game_state2.player_hands[1]))
+    scene.add((deck_x, deck_y, 100, 140), lambda: game_table.draw_resting_deck(screen, game_state2, deck_x, deck_y),
+              lambda: (bool(game_state2.full_deck), game_state2.shuffle_complete))
+    scene.add(button_area, lambda: game_table.draw_button(screen, "Done", button_x, button_y, button_width,
+                                                          button_height))
+    scene.add(return_button_area, lambda: game_table.draw_button(screen, "Return", return_button_x, button_y,
+                                                                 button_width, button_height))
+    scene.add(snatch1_button_area, lambda: game_table.draw_button(screen, "Snatch", snatch1_button_x, snatch1_button_y,
+                                                                  snatch1_button_width, snatch1_button_height))
+    scene.add(snatch2_button_area, lambda: game_table.draw_button(screen, "Snatch", snatch2_button_x, snatch2_button_y,
+                                                                  snatch2_button_width, snatch2_button_height))
+    scene.add((drawn_cards_x, deck_y, (game_state2.max_draw_per_turn - 1) * overlap_spacing + 100, 140),
+              lambda: game_table.draw_drawn_cards(screen, game_state2, drawn_cards_x, deck_y),
+              lambda: len(game_state2.drawn_cards))
+    scene.add(yes_button_area.union(no_button_area), draw_discard_buttons,
+              lambda: game_state2.waiting_for_discard_decision)
+    scene.add(((screen_width - 650) // 2, screen_height - 225 - 30, 650, 225), draw_message,
+              lambda: game_state2.message)
+    return scene
+
 # Main game loop
 def main_game3_loop():
+    global screen, game_state2
+    screen = assets.screen("Notty Game")
+    game_state2 = GameState2()
+    assets.card_cache().preload(assets.card_names())
+    scene = build_scene()
+    timeline.run(shuffle_deck())
     running = True
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if event.type == AI_DECISION:
+                ai_worker.done()
+                timeline.run(handle_computer_turn(event.player_id, event.decision or {'action': 'skip'}))
+                game_state2.ai_turn_timer = 0
+                game_state2.message_timer = pygame.time.get_ticks()
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 mouse_pos = pygame.mouse.get_pos()
 
-                if game_state2.current_player == 1 and not game_state2.dealing:
+                # Clicks are ignored while an action is animating
+                if game_state2.current_player == 1 and not game_state2.dealing and not timeline.busy:
                     if not game_state2.waiting_for_discard_decision:
                         if game_state2.shuffle_complete and deck_area.collidepoint(mouse_pos):
-                            if is_hand_full(1):
+                            if not has_room(game_state2, 1):
                                 game_state2.message = "Cannot draw more cards - Human hand is full!"
                             else:
                                 remaining_space = game_state2.max_cards_in_hand - len(game_state2.player_hands[1])
@@ -1188,39 +969,35 @@ def main_game3_loop():
                                 print("Human skips turn")
                                 game_state2.current_player = 2
                             else:
-                                if can_add_cards(game_state2.current_player, len(game_state2.drawn_cards)):
-                                    game_state2.player_hands[game_state2.current_player].extend(game_state2.drawn_cards)
+                                if has_room(game_state2, game_state2.current_player, len(game_state2.drawn_cards)):
+                                    game_state2.group_trackers[game_state2.current_player].extend(game_state2.drawn_cards)
                                     handle_card_addition(game_state2.current_player)
                                     game_state2.drawn_cards.clear()
-                                    clear_drawn_card_area()
                                     if not game_state2.waiting_for_discard_decision:
                                         game_state2.current_player = 2
                                 else:
                                     game_state2.drawn_cards.clear()
-                                    clear_drawn_card_area()
 
                         elif return_button_area.collidepoint(mouse_pos):
                                 if game_state2.drawn_cards:
                                     if return_single_card():
                                         print(f"Human returns a card to deck. {len(game_state2.drawn_cards)} cards remaining")
-                                    clear_drawn_card_area()
 
                         # In the snatch1_button_area section:
                         elif snatch1_button_area.collidepoint(mouse_pos):
                             if len(game_state2.drawn_cards) > 0:
                                 game_state2.message = "Cannot snatch after drawing cards. Click Done Drawing first."
                             else:
-                                if is_hand_full(1):
+                                if not has_room(game_state2, 1):
                                     print("Human cannot snatch - hand full")  # Added print
                                     game_state2.message = "Cannot snatch more cards - Human hand is full!"
                                 else:
                                     if game_state2.player_hands[2]:  # Computer 1
-                                        snatched_card = game_state2.player_hands[2].pop(random.randint(0, len(game_state2.player_hands[2]) - 1))
+                                        snatched_card = take_card(game_state2, 1, 2, game_state2.rng.randint(0, len(game_state2.player_hands[2]) - 1))
                                         print(f"Human snatches from Computer 1: {snatched_card}")  # Added print
-                                        game_state2.player_hands[1].append(snatched_card)
                                         game_state2.message = "Snatched card from Computer 1!"
-                                        # Only check human's hand as they're the current player
                                         check_hand_validity(1)
+                                        check_hand_validity(2)
                                         if game_state2.valid_groups[1]:
                                             game_state2.message = "Do you wish to discard valid group?"
                                             game_state2.waiting_for_discard_decision = True
@@ -1236,17 +1013,16 @@ def main_game3_loop():
                             if len(game_state2.drawn_cards) > 0:
                                 game_state2.message = "Cannot snatch after drawing cards. Click Done Drawing first."
                             else:
-                                if is_hand_full(1):
+                                if not has_room(game_state2, 1):
                                     print("Human cannot snatch - hand full")  # Added print
                                     game_state2.message = "Cannot snatch more cards - Human hand is full!"
                                 else:
                                     if game_state2.player_hands[3]:  # Computer 2
-                                        snatched_card = game_state2.player_hands[3].pop(random.randint(0, len(game_state2.player_hands[3]) - 1))
+                                        snatched_card = take_card(game_state2, 1, 3, game_state2.rng.randint(0, len(game_state2.player_hands[3]) - 1))
                                         print(f"Human snatches from Computer 2: {snatched_card}")  # Added print
-                                        game_state2.player_hands[1].append(snatched_card)
                                         game_state2.message = "Snatched card from Computer 2!"
-                                        # Only check human's hand as they're the current player
                                         check_hand_validity(1)
+                                        check_hand_validity(3)
                                         if game_state2.valid_groups[1]:
                                             game_state2.message = "Do you wish to discard valid group?"
                                             game_state2.waiting_for_discard_decision = True
@@ -1259,30 +1035,30 @@ def main_game3_loop():
 
                     if game_state2.waiting_for_discard_decision:
                         if yes_button_area.collidepoint(mouse_pos):
-                            handle_discard(1)  # Discard valid group
+                            timeline.run(handle_discard(1))  # Discard valid group
                         elif no_button_area.collidepoint(mouse_pos):
                             game_state2.waiting_for_discard_decision = False
                             game_state2.current_player = 2
                             game_state2.message = "Computer 1's turn"
 
-        if game_state2.current_player > 1 and not game_state2.dealing and game_state2.shuffle_complete:
+        if (game_state2.current_player > 1 and not game_state2.dealing and game_state2.shuffle_complete
+                and not timeline.busy):
             current_time = pygame.time.get_ticks()
             if game_state2.ai_turn_timer == 0:
                 game_state2.ai_turn_timer = current_time
-            elif current_time - game_state2.ai_turn_timer >= game_state2.ai_turn_delay:
-                handle_computer_turn(game_state2.current_player)
-                game_state2.ai_turn_timer = 0
-                game_state2.message_timer = current_time
+            elif current_time - game_state2.ai_turn_timer >= game_state2.ai_turn_delay and not ai_worker.busy:
+                # The decision comes back as an AI_DECISION event; keep drawing frames meanwhile
+                ai_worker.submit(game_state2.current_player, decide_computer_turn,
+                                 *computer_decision_args(game_state2.current_player))
 
-        if not game_state2.shuffle_complete:
-            shuffle_deck()
-        elif game_state2.dealing:
+        timeline.update()
+        if game_state2.shuffle_complete and game_state2.dealing:
             if game_state2.frame_count % game_state2.deal_frame_delay == 0:
                 player_id = (game_state2.dealing_index % 3) + 1
                 if len(game_state2.player_hands[player_id]) < 5:
                     card = draw_card()
                     if card:
-                        game_state2.player_hands[player_id].append(card)
+                        game_state2.group_trackers[player_id].add(card)
                         game_state2.dealing_index += 1
                 else:
                     if all(len(hand) == 5 for hand in game_state2.player_hands.values()):
@@ -1290,37 +1066,9 @@ def main_game3_loop():
                         handle_initial_deal()
             game_state2.frame_count += 1
 
-        screen.fill((15, 20, 45))
-
-        # Draw player names and hands
-        draw_player_name("You", screen_width//2, 200)
-        draw_player_name("Computer 1", screen_width - 295, 390)
-        draw_player_name("Computer 2", 185, 390)
-
-        display_cards(1)      # Human
-        display_cards(2)      # Computer 1
-        display_cards(3)      # Computer 2
-
-        draw_card_counter(screen, len(game_state2.player_hands[1]))
-
-        if game_state2.full_deck:
-            screen.blit(card_back_image, (deck_x, deck_y))
-
-        # Draw UI elements
-        draw_button("Done", button_x, button_y, button_width, button_height)
-        draw_button("Return", return_button_x, button_y, button_width, button_height)
-        draw_button("Snatch", snatch1_button_x, snatch1_button_y, snatch1_button_width, snatch1_button_height)
-        draw_button("Snatch", snatch2_button_x, snatch2_button_y, snatch2_button_width, snatch2_button_height)
-
-        for i, _ in enumerate(game_state2.drawn_cards):
-            drawn_card_x = deck_x + deck_width + 20 + i * overlap_spacing
-            drawn_card_y = deck_y
-            show_card(None, drawn_card_x, drawn_card_y, face_down=True)
-
         if game_state2.waiting_for_discard_decision:
             game_state2.message = "Do you wish to discard this group?"
             game_state2.message_timer = float('inf')
-            draw_discard_buttons()
 
         current_time = pygame.time.get_ticks()
         if game_state2.message and current_time - game_state2.message_timer > game_state2.MESSAGE_DISPLAY_TIME:
@@ -1329,9 +1077,10 @@ def main_game3_loop():
                 game_state2.message = update_turn_message()
                 game_state2.message_timer = current_time
 
-        draw_message()
-
-        pygame.display.flip()
+        # Only what changed is redrawn, unless cards are moving over the table
+        dirty = scene.draw(full=timeline.animating)
+        timeline.draw()
+        scene.update(dirty)
         clock.tick(30)
 
     pygame.quit()
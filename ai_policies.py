@@ -0,0 +1,152 @@
+"""The computer players of the game modules, as policies for NottyGame.
+
+Each policy plays one whole turn of a notty_engine.NottyGame for the
+current player and ends it, making the same choices with the same odds as
+its counterpart in the game modules.  Every random choice uses the game's
+`rng`, so a seeded game plays the same way every time.
+
+The game modules are written for a fixed seat (the computer snatches from
+the human, the strategic player watches the human's hand); here those
+choices are made among all the other players.
+"""
+
+from notty_engine import DRAW, SNATCH, SKIP
+from hand_solver import best_discard
+from mcts_ai import mcts_interactive_turn, mcts_turn
+
+
+def _draw_some(game):
+    """Draws 1 to 3 cards, as many as the hand and the deck allow."""
+    most = min(game.max_draw_per_turn, game.hand_space(), len(game.full_deck))
+    if most < 1:
+        return []
+    return game.draw(game.rng.randint(1, most))
+
+
+def _draw_best(game):
+    """Draws the number of cards with the best odds of completing a group."""
+    most = min(game.max_draw_per_turn, game.hand_space(), len(game.full_deck))
+    if most < 1:
+        return []
+    tracker = game.group_trackers[game.current_player]
+    return game.draw(game.knowledge.best_draw_count(game.current_player, tracker.hand, most))
+
+
+def _known_target(game):
+    """Returns the player known to hold a card that completes a group, or None."""
+    return game.knowledge.best_snatch_target(game.current_player, game.group_trackers[game.current_player].hand,
+                                             {player_id: len(hand) for player_id, hand in game.player_hands.items()},
+                                             game.snatch_targets())
+
+
+def _snatch_any(game):
+    """Snatches from a player known to hold a card that completes a group,
+    otherwise from a random other player who still has cards."""
+    targets = game.snatch_targets()
+    if not targets or not game.hand_space():
+        return None
+    target = _known_target(game)
+    if target is None:
+        target = game.rng.choice(targets)
+    return game.snatch(target)
+
+
+def _discard_best(game):
+    """Discards the group that leaves the rest of the hand best covered."""
+    group = best_discard(game.player_hands[game.current_player])
+    return group is not None and game.discard(group)
+
+
+def _has_group(game):
+    return game.group_trackers[game.current_player].groups()[0] is not None
+
+
+def random_ai_turn(game):
+    """ai_turn from the two-player game: discards with odds 0.8, else moves at random."""
+    if _has_group(game) and game.rng.random() < 0.8:
+        _discard_best(game)
+        game.end_turn()
+        return
+
+    action = game.rng.choice([DRAW, SNATCH, SKIP])
+    if action == DRAW:
+        _draw_best(game)
+    elif action == SNATCH:
+        _snatch_any(game)
+    else:
+        game.skip()
+    if action != SKIP and not game.game_over and _has_group(game) and game.rng.random() < 0.8:
+        _discard_best(game)
+    game.end_turn()
+
+
+def strategic_ai_turn(game):
+    """strategic_ai_turn from the three-player game.
+
+    Discards a group of 4 or more, or any group while the smallest other
+    hand is smaller than its own, then snatches with odds 0.7 or draws.  It
+    always snatches while another player is known to hold a card that
+    completes one of its groups.
+    """
+    own_hand_size = len(game.player_hands[game.current_player])
+    opponent_hand_size = min(len(game.player_hands[player_id]) for player_id in game.players_after())
+    valid, largest = game.group_trackers[game.current_player].groups()
+    has_large_group = largest is not None and len(largest) > 3
+    if valid is not None or has_large_group:
+        group = largest if has_large_group else valid
+        if len(group) > 3 or opponent_hand_size < own_hand_size:
+            game.discard(group)
+            game.end_turn()
+            return
+
+    if opponent_hand_size > 0 and own_hand_size < game.max_cards_in_hand:
+        if _known_target(game) is not None:
+            action = SNATCH
+        else:
+            action = SNATCH if game.rng.random() < 0.7 else DRAW
+    else:
+        action = DRAW if own_hand_size < game.max_cards_in_hand else SKIP
+    if action == SNATCH and not _snatch_any(game):
+        action = DRAW
+    if action == DRAW and not _draw_some(game):
+        action = SKIP
+    if action == SKIP:
+        game.skip()
+    game.end_turn()
+
+
+def computer_turn(game):
+    """handle_computer_turn from the three-player game: moves at random, discards with odds 0.5."""
+    action = game.rng.choice([DRAW, SNATCH, SKIP])
+    if action == DRAW:
+        _draw_best(game)
+    elif action == SNATCH:
+        _snatch_any(game)
+    else:
+        game.skip()
+    if action != SKIP and _has_group(game) and game.rng.random() < 0.5:
+        _discard_best(game)
+    game.end_turn()
+
+
+def play_for_me(game):
+    """play_for_me from the two-player game: draws with odds 0.8, else snatches, then discards."""
+    if game.rng.random() < 0.8:
+        _draw_some(game)
+    else:
+        _snatch_any(game)
+    if game.turn_action is None:
+        game.skip()
+    if _has_group(game):
+        _discard_best(game)
+    game.end_turn()
+
+
+POLICIES = {
+    'random': random_ai_turn,
+    'strategic': strategic_ai_turn,
+    'computer': computer_turn,
+    'play_for_me': play_for_me,
+    'mcts': mcts_turn,
+    'mcts_interactive': mcts_interactive_turn,
+}
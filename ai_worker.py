@@ -0,0 +1,64 @@
+"""Computes AI decisions off the render thread.
+
+The game modules split each computer turn in two: a decide function that
+picks the moves from a snapshot of the game, and the turn itself, which
+plays and animates them.  The decide function runs on an AIWorker thread
+and its result comes back to the main loop as an AI_DECISION event, so the
+loop keeps drawing frames and handling events while the computer thinks.
+
+Decide functions must only read the snapshot they are given and draw from
+their own random.Random, seeded from the game's rng on the main thread, so
+a seeded game plays out the same whichever thread decides.
+
+The turn itself is then played as a script on the animation timeline.
+"""
+
+import queue
+import threading
+import traceback
+
+import pygame
+
+# Event posted when a decision is ready, with `player_id` and `decision`
+# attributes; `decision` is None if the decide function failed.
+AI_DECISION = pygame.event.custom_type()
+
+
+class AIWorker:
+    """A background thread that runs decide functions one at a time.
+
+    The thread is started by the first submit, so importing a game module
+    starts nothing.
+
+    Attributes:
+        busy (bool): A decision was submitted and its AI_DECISION event has
+            not been handled yet.  Clear it with done().
+    """
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._thread = None
+        self.busy = False
+
+    def submit(self, player_id, decide, *args):
+        """Runs decide(*args) on the worker and posts the result as an
+        AI_DECISION event for `player_id`."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ai-worker", daemon=True)
+            self._thread.start()
+        self.busy = True
+        self._jobs.put((player_id, decide, args))
+
+    def done(self):
+        """Marks the last decision as handled, so another can be submitted."""
+        self.busy = False
+
+    def _run(self):
+        while True:
+            player_id, decide, args = self._jobs.get()
+            try:
+                decision = decide(*args)
+            except Exception:
+                traceback.print_exc()
+                decision = None
+            pygame.event.post(pygame.event.Event(AI_DECISION, player_id=player_id, decision=decision))
+
@@ -0,0 +1,212 @@
+"""Tweens and a timeline that plays them one frame at a time.
+
+A tween animates something over a duration in milliseconds of game time:
+a card moving between two points, a fade, or the deck bouncing while it is
+shuffled.  Tweens do not draw the scene; each is given a draw function that
+paints just the moving thing, and the game loop draws the scene and then
+the timeline's tweens on top of it every frame.
+
+Game actions are written as scripts, generator functions that change the
+game state and yield tweens to play, for example:
+
+    def return_card(card_name, start):
+        yield CardMove(partial(game_table.show_card, screen, card_name), start, (deck_x, deck_y))
+        game_state.full_deck.append(card_name)
+
+    timeline.run(return_card(card_name, start))
+
+A script resumes once everything it yielded has finished, so it reads like
+the old step-by-step animation loops, but the game loop keeps handling
+events and drawing frames in between.  Yield a list of tweens to play them
+together, and use `yield from` to run another script inside a script.
+"""
+
+from collections import deque
+
+import pygame
+
+# Default duration of a card move, in milliseconds.
+MOVE_TIME = 600
+
+
+def linear(progress):
+    return progress
+
+
+def ease_out(progress):
+    """Starts fast and slows down into the end point."""
+    return 1 - (1 - progress) ** 2
+
+
+class Tween:
+    """Something that lasts `duration` milliseconds; on its own, a pause.
+
+    Attributes:
+        duration (int): Length in milliseconds.
+        elapsed (int): Milliseconds since it started.
+        progress (float): How far through it is, from 0 to 1.
+        draws (bool): Whether it draws anything over the scene.
+    """
+    draws = True
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.start_time = 0
+        self.elapsed = 0
+        self.progress = 0.0
+
+    @property
+    def done(self):
+        return self.progress >= 1.0
+
+    def start(self, now):
+        self.start_time = now
+        self.update(now)
+
+    def update(self, now):
+        self.elapsed = now - self.start_time
+        if self.duration <= 0:
+            self.progress = 1.0
+        else:
+            self.progress = min(1.0, self.elapsed / self.duration)
+
+    def draw(self):
+        pass
+
+
+class Pause(Tween):
+    """Waits without drawing anything, like a pygame.time.wait that keeps
+    the game loop running."""
+    draws = False
+
+
+class CardMove(Tween):
+    """Moves something from `start` to `end`.
+
+    Args:
+        draw (function): Called with (x, y) to draw the moving thing, e.g.
+            functools.partial(game_table.show_card, screen, card_name).
+        start (tuple): Starting (x, y).
+        end (tuple): Final (x, y).
+        duration (int): Milliseconds the move takes.
+        ease (function): Maps progress to the fraction of the way covered.
+    """
+    def __init__(self, draw, start, end, duration=MOVE_TIME, ease=linear):
+        super().__init__(duration)
+        self._draw = draw
+        self.start_position = start
+        self.end_position = end
+        self.ease = ease
+
+    def position(self):
+        fraction = self.ease(self.progress)
+        start_x, start_y = self.start_position
+        end_x, end_y = self.end_position
+        return start_x + (end_x - start_x) * fraction, start_y + (end_y - start_y) * fraction
+
+    def draw(self):
+        self._draw(*self.position())
+
+
+class Fade(Tween):
+    """Fades something between two alpha values.
+
+    Args:
+        draw (function): Called with the alpha, 0 to 255, to draw the thing.
+    """
+    def __init__(self, draw, duration, start_alpha=255, end_alpha=0):
+        super().__init__(duration)
+        self._draw = draw
+        self.start_alpha = start_alpha
+        self.end_alpha = end_alpha
+
+    def alpha(self):
+        return round(self.start_alpha + (self.end_alpha - self.start_alpha) * self.progress)
+
+    def draw(self):
+        self._draw(self.alpha())
+
+
+class Bounce(Tween):
+    """Jolts something up and down by `height` pixels every half `period`.
+
+    Args:
+        draw (function): Called with the vertical offset to draw the thing.
+    """
+    def __init__(self, draw, duration, height=5, period=333):
+        super().__init__(duration)
+        self._draw = draw
+        self.height = height
+        self.period = period
+
+    def offset(self):
+        return self.height if self.elapsed % self.period < self.period / 2 else -self.height
+
+    def draw(self):
+        self._draw(self.offset())
+
+
+class Timeline:
+    """Plays scripts one after another, ticked once per frame.
+
+    Scripts are generators yielding a tween or a list of tweens (see the
+    module docstring).  Each frame, update() advances the tweens playing
+    and resumes the script once they have all finished; draw() then draws
+    them over the scene.
+
+    Attributes:
+        playing (list): The tweens playing this frame.
+    """
+    def __init__(self):
+        self._scripts = deque()
+        self._script = None
+        self.playing = []
+
+    @property
+    def busy(self):
+        """True while a script is running or waiting to run."""
+        return self._script is not None or bool(self._scripts) or bool(self.playing)
+
+    @property
+    def animating(self):
+        """True while a tween is drawing over the scene."""
+        return any(tween.draws for tween in self.playing)
+
+    def run(self, script):
+        """Queues a script, or a single tween, to play after the others."""
+        if isinstance(script, Tween):
+            script = iter((script,))
+        self._scripts.append(script)
+
+    def update(self, now=None):
+        """Advances the timeline to `now`, pygame.time.get_ticks() if None."""
+        now = pygame.time.get_ticks() if now is None else now
+        while True:
+            for tween in self.playing:
+                tween.update(now)
+            if not all(tween.done for tween in self.playing):
+                return
+            self.playing = []
+            if self._script is None:
+                if not self._scripts:
+                    return
+                self._script = self._scripts.popleft()
+            try:
+                step = next(self._script)
+            except StopIteration:
+                self._script = None
+                continue
+            tweens = list(step) if isinstance(step, (list, tuple)) else [step]
+            for tween in tweens:
+                tween.start(now)
+            self.playing = tweens
+
+    def draw(self):
+        for tween in self.playing:
+            tween.draw()
+
+    def clear(self):
+        """Drops every script and tween, e.g. when a new game starts."""
+        self._scripts.clear()
+        self._script = None
+        self.playing = []
@@ -0,0 +1,143 @@
+"""The game window and its images, sounds and fonts, each loaded once.
+
+Every loader here loads its asset the first time it is called and returns
+the same object from then on, so the start screen, both game modes and the
+winning screen share one window and one copy of each asset, and nothing is
+loaded until a screen needs it.  Importing a screen module therefore opens
+no window and decodes nothing; each screen calls screen() when it starts.
+
+That does not make importing a screen cheap: `import pygame` itself,
+which pulls in NumPy for pygame.surfarray and pkg_resources for
+pygame.pkgdata, takes 0.3 to 0.7 s depending on the machine and is most
+of the time to the menu.  Nothing here can defer it, since every screen
+draws with pygame.
+
+Scaled images come from disk_cache, so once a launch has scaled them the
+next ones neither decode nor scale anything.  Images are converted to the
+display's format, so the window must be open before they are loaded.
+"""
+
+import functools
+import os
+
+import pygame
+
+import disk_cache
+from card_atlas import BACK, load_atlas, read_index
+from card_surfaces import CardSurfaceCache, to_display_format
+from text_cache import TextCache
+
+SCREEN_SIZE = (1024, 768)
+CARD_IMAGES = "card_images/"
+GAME_IMAGES = "game_images/"
+CARD_BACK_IMAGE_PATH = os.path.join(GAME_IMAGES, "card_back.png")
+SHUFFLE_SOUND_PATH = "shuffle_sound.mp3"
+# Size the cards are drawn at on the game tables
+CARD_SIZE = (100, 140)
+
+
+def screen(caption=None):
+    """Returns the game window, starting pygame and opening it on first use.
+
+    Args:
+        caption (str): Window title to show, if any.
+    """
+    surface = pygame.display.get_surface()
+    if surface is None:
+        pygame.init()
+        surface = pygame.display.set_mode(SCREEN_SIZE)
+    if caption:
+        pygame.display.set_caption(caption)
+    return surface
+
+
+@functools.lru_cache(maxsize=None)
+def _card_files():
+    """Returns card name -> (image file, whether it is the atlas) for every
+    face and the back, without decoding anything."""
+    index = read_index()
+    if index is not None:
+        image_path, rects = index
+        return {name: (image_path, True) for name in rects}
+    files = {filename[:-len(".png")]: (os.path.join(CARD_IMAGES, filename), False)
+             for filename in os.listdir(CARD_IMAGES) if filename.endswith(".png")}
+    files[BACK] = (CARD_BACK_IMAGE_PATH, False)
+    return files
+
+
+@functools.lru_cache(maxsize=None)
+def _card_sources():
+    """Decodes the full-size card faces and back, from the atlas built by
+    card_atlas.py in one decode if it has been built."""
+    images = load_atlas()
+    if images is not None:
+        return images
+    return {name: pygame.image.load(path) for name, (path, _) in _card_files().items()}
+
+
+def card_names():
+    """Returns the names of the card faces."""
+    return [name for name in _card_files() if name != BACK]
+
+
+def _scaled_card(card_name, width, height):
+    source = _card_files().get(card_name)
+    if source is None:
+        return None
+    path, in_atlas = source
+    size = (width, height)
+    return disk_cache.load(path, size, lambda: pygame.transform.scale(_card_sources()[card_name], size),
+                           part=card_name if in_atlas else "")
+
+
+@functools.lru_cache(maxsize=None)
+def card_back():
+    """Returns the card back at CARD_SIZE."""
+    return _scaled_card(BACK, *CARD_SIZE)
+
+
+@functools.lru_cache(maxsize=None)
+def card_cache():
+    """Returns the CardSurfaceCache game_table.show_card draws the faces from."""
+    return CardSurfaceCache(_scaled_card)
+
+
+@functools.lru_cache(maxsize=None)
+def image(path, size=None):
+    """Returns the image at `path`, scaled to `size` if given."""
+    if size is None:
+        return to_display_format(pygame.image.load(path))
+    return disk_cache.load(path, size, lambda: pygame.transform.scale(pygame.image.load(path), size))
+
+
+def notty_cards(size):
+    """Returns the four card images of the start and winning screens."""
+    return [image(os.path.join(GAME_IMAGES, f"notty_card_{i}.png"), size) for i in range(1, 5)]
+
+
+@functools.lru_cache(maxsize=None)
+def sound(path=SHUFFLE_SOUND_PATH):
+    """Returns the sound at `path`, starting the mixer if need be."""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    return pygame.mixer.Sound(path)
+
+
+@functools.lru_cache(maxsize=None)
+def font(size, name=None):
+    """Returns the font `name` (pygame's default if None) at `size`."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(name, size)
+
+
+@functools.lru_cache(maxsize=None)
+def text_cache():
+    """Returns the TextCache every screen renders its text through."""
+    return TextCache(font)
+
+
+def text(string, size, color, antialias=True):
+    """Returns `string` rendered in the default font at `size`, rendering
+    it only the first time it is drawn."""
+    return text_cache().render(string, size, color, antialias)
@@ -0,0 +1,120 @@
+"""Packs the card images into one atlas, and loads it back.
+
+The game modules used to decode the 40 card faces in card_images/ one by
+one at import, each a 534x800 PNG, although cards are drawn at 100x140.
+The build step scales every face and the card back to CARD_SIZE, lays
+them out in a grid in one image and writes an index of where each one
+is, so starting a game decodes a single small PNG and takes each card as
+a subsurface of it.  Rebuild the atlas after changing the card images:
+
+    python card_atlas.py
+
+The index is JSON: {"image": file name next to it, "cards": {name:
+[x, y, width, height]}}, with the card back under BACK.
+"""
+
+import argparse
+import json
+import math
+import os
+
+import pygame
+
+CARD_IMAGES = "card_images/"
+CARD_BACK_IMAGE_PATH = os.path.join("game_images", "card_back.png")
+ATLAS_IMAGE = "card_atlas.png"
+ATLAS_INDEX = "card_atlas.json"
+BACK = "card_back"
+# Twice the size cards are drawn at, so they stay sharp if drawn larger.
+CARD_SIZE = (200, 280)
+
+
+def card_sources(card_dir=CARD_IMAGES, back_path=CARD_BACK_IMAGE_PATH):
+    """Returns (name, path) for every card face in `card_dir` and the back."""
+    sources = [(filename[:-len(".png")], os.path.join(card_dir, filename))
+               for filename in sorted(os.listdir(card_dir)) if filename.endswith(".png")]
+    sources.append((BACK, back_path))
+    return sources
+
+
+def build_atlas(sources, card_size=CARD_SIZE):
+    """Scales the images to `card_size` and packs them into a grid.
+
+    Args:
+        sources (list): (name, path) of each image.
+        card_size (tuple): (width, height) every image is scaled to.
+
+    Returns:
+        tuple: (atlas surface, dict of name -> [x, y, width, height]).
+    """
+    width, height = card_size
+    columns = math.ceil(math.sqrt(len(sources)))
+    rows = math.ceil(len(sources) / columns)
+    atlas = pygame.Surface((columns * width, rows * height), pygame.SRCALPHA)
+    rects = {}
+    for index, (name, path) in enumerate(sources):
+        x, y = index % columns * width, index // columns * height
+        image = pygame.image.load(path)
+        scale = pygame.transform.smoothscale if image.get_bitsize() >= 24 else pygame.transform.scale
+        # Onto the transparent atlas, MAX copies the pixels alpha and all,
+        # where a plain blit would blend half-transparent edges with black
+        atlas.blit(scale(image, card_size), (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        rects[name] = [x, y, width, height]
+    return atlas, rects
+
+
+def save_atlas(atlas, rects, index_path=ATLAS_INDEX, image_name=ATLAS_IMAGE):
+    """Writes the atlas image next to its index."""
+    pygame.image.save(atlas, os.path.join(os.path.dirname(index_path), image_name))
+    with open(index_path, 'w') as file:
+        json.dump({'image': image_name, 'cards': rects}, file, indent=1)
+
+
+def read_index(index_path=ATLAS_INDEX):
+    """Reads an atlas index without decoding the image.
+
+    Returns:
+        tuple: (path of the atlas image, dict of name -> [x, y, width,
+        height]), or None if there is no atlas at `index_path`.
+    """
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as file:
+        index = json.load(file)
+    return os.path.join(os.path.dirname(index_path), index['image']), index['cards']
+
+
+def load_atlas(index_path=ATLAS_INDEX):
+    """Loads a built atlas with one image decode.
+
+    The atlas is converted to the display's format if a display mode is set.
+
+    Returns:
+        dict: Name -> subsurface of the atlas, or None if there is no
+        atlas at `index_path`.
+    """
+    index = read_index(index_path)
+    if index is None:
+        return None
+    image_path, rects = index
+    atlas = pygame.image.load(image_path)
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    return {name: atlas.subsurface(rect) for name, rect in rects.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the card images into one atlas.")
+    parser.add_argument('--cards', default=CARD_IMAGES, help="Directory of card face PNGs")
+    parser.add_argument('--back', default=CARD_BACK_IMAGE_PATH, help="Card back image")
+    parser.add_argument('--size', type=int, nargs=2, default=list(CARD_SIZE), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--output', default=ATLAS_INDEX, help="Index file; the image is written beside it")
+    args = parser.parse_args()
+
+    atlas, rects = build_atlas(card_sources(args.cards, args.back), tuple(args.size))
+    save_atlas(atlas, rects, args.output)
+    print(f"Packed {len(rects)} images into {atlas.get_width()}x{atlas.get_height()} atlas {args.output}")
+
+
+if __name__ == '__main__':
+    main()
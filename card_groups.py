@@ -0,0 +1,337 @@
+"""Bitboard hand representation and group detection for Notty.
+
+A hand is packed into one integer count vector with a 3-bit field per card.
+Each colour owns a block of 11 fields (numbers 0-9 plus an always-empty
+guard slot), so shifting the whole vector by one field moves every card to
+the next number of the same colour without leaking into the next colour.
+From the count vector two masks are derived: `present` (field start bit set
+when the card is held) and `repeated` (set when a second copy is held).
+Runs are then found with shifts and ANDs over all four colours at once and
+same-number sets by ANDing the four colour blocks together.
+
+This makes check_hand_validity in the game tables about 3 times faster,
+not the 10 times that was aimed for.  Over 2000 random hands of 5 to 20
+cards it takes about 16 µs a call against 52-70 µs for the old
+Card-object search.  That is with the group cache cold, and the cards
+are added through the hand's GroupTracker before the call.  About half
+of what is left is spent outside this module: building the Card objects
+and messages the tables show.
+"""
+
+from itertools import islice
+
+from lru import LRUCache
+
+COLOURS = ('red', 'blue', 'green', 'yellow')
+NUMBERS = tuple(range(10))
+
+CARD_NAMES = tuple(f'{colour}_{number}' for colour in COLOURS for number in NUMBERS)
+CARD_INDEX = {name: index for index, name in enumerate(CARD_NAMES)}
+CARD_PARTS = {f'{colour}_{number}': (colour, number) for colour in COLOURS for number in NUMBERS}
+
+# Three bits hold up to 7 copies of a card, enough for three decks.
+FIELD_BITS = 3
+MAX_COPIES = (1 << FIELD_BITS) - 1
+BLOCK_FIELDS = 11
+BLOCK_BITS = FIELD_BITS * BLOCK_FIELDS
+BLOCK_MASK = (1 << BLOCK_BITS) - 1
+
+# Bit offset of each card's count field, and the unit added per copy held.
+CARD_SHIFT = {name: (CARD_INDEX[name] // 10 * BLOCK_FIELDS + CARD_INDEX[name] % 10) * FIELD_BITS
+              for name in CARD_NAMES}
+CARD_UNIT = {name: 1 << shift for name, shift in CARD_SHIFT.items()}
+
+# The low bit of every real card field (guard slots excluded).
+_FIELD_STARTS = sum(CARD_UNIT.values())
+# A number bit inside one colour block -> number.
+_BLOCK_NUMBER = {1 << (number * FIELD_BITS): number for number in NUMBERS}
+_CARD_COLOUR = {name: index // 10 for index, name in enumerate(CARD_NAMES)}
+_CARD_NUMBER = {name: index % 10 for index, name in enumerate(CARD_NAMES)}
+_NUMBER_CARDS = [frozenset(CARD_NAMES[colour * 10 + number] for colour in range(4)) for number in NUMBERS]
+
+
+class HandBits:
+    """Bitboard view of a hand of cards.
+
+    Attributes:
+        cards (list): The card names in hand order, used to break ties the
+            same way a left-to-right scan of the hand does.
+        counts (int): Packed count vector, one 3-bit field per card.  Equal
+            hands in any order give the same value.
+        present (int): Field start bit set for every card held.
+        repeated (int): Field start bit set for every card held twice or more.
+        run_starts (int): Bits where a run of 3 or more begins, over all colours.
+        three_colours (int): Number bits (within one block) held in 3+ colours.
+    """
+    __slots__ = ('cards', 'counts', 'present', 'repeated', 'run_starts', 'three_colours', '_groups')
+
+    def __init__(self, notty_cards_list):
+        counts = 0
+        for card_info in notty_cards_list:
+            counts += CARD_UNIT[card_info]
+        self.cards = notty_cards_list
+        self._set_counts(counts)
+
+    def _set_counts(self, counts):
+        # A count of 2 or more sets one of the field's two high bits.
+        repeated = ((counts >> 1) | (counts >> 2)) & _FIELD_STARTS
+        present = (counts & _FIELD_STARTS) | repeated
+
+        # A scan over the sorted numbers of a colour restarts its run at
+        # every repeated number, so a second copy inside a run splits it in
+        # two; the `repeated` term reproduces that.
+        links = present & (present >> FIELD_BITS)
+        blue = present >> BLOCK_BITS
+        green_yellow = (present >> 2 * BLOCK_BITS) & (present >> 3 * BLOCK_BITS)
+        green_or_yellow = (present >> 2 * BLOCK_BITS) | (present >> 3 * BLOCK_BITS)
+
+        self.counts = counts
+        self.present = present
+        self.repeated = repeated
+        self.run_starts = links & (links >> FIELD_BITS) & ~(repeated >> FIELD_BITS)
+        self.three_colours = ((present & blue & green_or_yellow) | (green_yellow & (present | blue))) & BLOCK_MASK
+        self._groups = None
+
+    def added(self, card_info):
+        """Updates the masks after `card_info` was appended to `cards`."""
+        self._set_counts(self.counts + CARD_UNIT[card_info])
+
+    def removed(self, card_info):
+        """Updates the masks after one copy of `card_info` left `cards`."""
+        self._set_counts(self.counts - CARD_UNIT[card_info])
+
+    def count(self, card_info):
+        """Returns how many copies of the card the hand holds."""
+        return (self.counts >> CARD_SHIFT[card_info]) & MAX_COPIES
+
+    def groups(self):
+        """Finds the first and the largest valid group, searching once per hand.
+
+        The order-independent part of the search is shared through
+        `group_cache`, keyed by the count vector; only the tie-breaks that
+        depend on hand order are worked out here.
+
+        Returns:
+            tuple: (first group, largest group), each a list of card names
+            or None.
+        """
+        if self._groups is not None:
+            return self._groups
+        shape = group_cache.get(self.counts)
+        if shape is None:
+            shape = group_cache.put(self.counts, self._shape())
+        four, first_runs, run_colours, longest, best_colours, best_length = shape
+
+        cards = self.cards
+        three = self.three_colours
+        valid = largest = None
+        if three:
+            number = _first_number(cards, three)
+            valid = list(islice(filter(_NUMBER_CARDS[number].__contains__, cards), 3))
+        if run_colours:
+            if valid is None:
+                colour = _first_colour(cards, run_colours)
+                valid = _run_names(colour, *first_runs[colour])
+            if not four or best_length >= 3 * FIELD_BITS:
+                colour = _first_colour(cards, best_colours)
+                largest = _run_names(colour, *longest[colour])
+        if largest is None and three:
+            largest = _set_names(self, _first_number(cards, four or three))
+        self._groups = (valid, largest)
+        return self._groups
+
+    def _shape(self):
+        """Works out the groups of the hand that do not depend on card order.
+
+        Returns:
+            tuple: (four-colour number bits, first run per colour, colours
+            with a run, first longest run per colour, colours holding a
+            longest run, longest run length in bits).
+        """
+        three = self.three_colours
+        starts = self.run_starts
+        present = self.present
+        four = 0
+        if three:
+            four = three & present & (present >> BLOCK_BITS) & (present >> 2 * BLOCK_BITS) & (present >> 3 * BLOCK_BITS)
+        first_runs = [None, None, None, None]
+        longest = [None, None, None, None]
+        run_colours = 0
+        best_length = 0
+        best_colours = 0
+
+        # Walk the runs lowest bit first, which is colour by colour and
+        # lowest number first, keeping each colour's first run and first
+        # longest run.  Lengths are counted in fields past the start.
+        links = present & (present >> FIELD_BITS)
+        repeated = self.repeated
+        while starts:
+            start = (starts & -starts).bit_length() - 1
+            end = start + FIELD_BITS
+            while (links >> end) & 1 and not (repeated >> end) & 1:
+                end += FIELD_BITS
+            starts &= -1 << end
+            colour = start // BLOCK_BITS
+            run = (start // FIELD_BITS - colour * BLOCK_FIELDS, end // FIELD_BITS - colour * BLOCK_FIELDS)
+            if not (run_colours >> colour) & 1:
+                first_runs[colour] = run
+                run_colours |= 1 << colour
+            length = end - start
+            if length > best_length:
+                best_length = length
+                best_colours = 1 << colour
+                longest[colour] = run
+            elif length == best_length and not (best_colours >> colour) & 1:
+                best_colours |= 1 << colour
+                longest[colour] = run
+        return four, first_runs, run_colours, longest, best_colours, best_length
+
+
+class GroupCache(LRUCache):
+    """Bounded least-recently-used cache of hand shapes, keyed by count vector.
+
+    Equal hands give equal count vectors in any order, so a hand that comes
+    back after a rejected discard, a skip or a snatch re-check is found here
+    instead of being searched again.  The cache is shared by the game loop
+    and the AI worker thread; LRUCache locks around every lookup and store.
+    """
+    def __init__(self, maxsize=4096):
+        super().__init__(maxsize)
+
+
+group_cache = GroupCache()
+
+
+def _colours_with(starts):
+    """Returns a bit set of the colours whose block of `starts` is non-empty."""
+    colours = 0
+    for colour in range(4):
+        if (starts >> colour * BLOCK_BITS) & BLOCK_MASK:
+            colours |= 1 << colour
+    return colours
+
+
+def _first_colour(cards, colours):
+    """Returns the colour in the `colours` bit set that appears first in the hand."""
+    if not colours & (colours - 1):
+        return colours.bit_length() - 1
+    for card_info in cards:
+        colour = _CARD_COLOUR[card_info]
+        if (colours >> colour) & 1:
+            return colour
+
+
+def _first_number(cards, numbers):
+    """Returns the number in the `numbers` block mask that appears first in the hand."""
+    if not numbers & (numbers - 1):
+        return _BLOCK_NUMBER[numbers]
+    for card_info in cards:
+        number = _CARD_NUMBER[card_info]
+        if (numbers >> number * FIELD_BITS) & 1:
+            return number
+
+
+def _run_names(colour, start, end):
+    return list(CARD_NAMES[colour * 10 + start:colour * 10 + end + 1])
+
+
+def _set_names(hand, number):
+    return [CARD_NAMES[colour * 10 + number] for colour in range(4)
+            if (hand.present >> (colour * BLOCK_BITS + number * FIELD_BITS)) & 1]
+
+
+def is_valid_group(hand):
+    """Checks if the whole hand forms one valid group.
+
+    Returns:
+        bool: True for 3+ consecutive numbers of one colour or 3+ cards of
+        one number in different colours, False otherwise.
+    """
+    if len(hand.cards) < 3 or hand.repeated:
+        return False
+
+    colours = _colours_with(hand.present)
+    if not colours & (colours - 1):
+        # Consecutive fields read as 1 + 8 + 64 + ..., which times 7 is
+        # one less than a power of two.
+        fields = hand.present // (hand.present & -hand.present)
+        span = fields * MAX_COPIES + 1
+        if not span & (span - 1):
+            return True
+
+    numbers = 0
+    for colour in range(4):
+        numbers |= (hand.present >> colour * BLOCK_BITS) & BLOCK_MASK
+    return not numbers & (numbers - 1)
+
+
+def valid_group(hand):
+    """Finds the first valid group in the hand.
+
+    Same-number sets are preferred, taking the first three cards of the
+    number that appears earliest in the hand.  Otherwise the lowest run of
+    the earliest colour with a run is returned.
+
+    Returns:
+        list: Card names of the group, or None if the hand has no group.
+    """
+    return hand.groups()[0]
+
+
+def largest_valid_group(hand):
+    """Finds the largest valid group in the hand.
+
+    Runs win ties against sets of the same size, and among equal runs the
+    earliest colour in the hand and then the lowest run is kept.
+
+    Returns:
+        list: Card names of the group, or None if the hand has no group.
+    """
+    return hand.groups()[1]
+
+
+class GroupTracker:
+    """Keeps one player's groups up to date as cards move in and out of the hand.
+
+    The tracker shares the player's hand list and every change to the hand
+    goes through it, so each move costs one update of the count vector
+    instead of a rebuild and two searches.  The groups are searched again
+    only when asked for after a change.
+
+    Attributes:
+        hand (HandBits): Bitboard view over the player's hand list.
+    """
+    def __init__(self, notty_cards_list):
+        self.hand = HandBits(notty_cards_list)
+
+    @property
+    def cards(self):
+        """list: The player's hand, in hand order."""
+        return self.hand.cards
+
+    def add(self, card_info):
+        self.hand.cards.append(card_info)
+        self.hand.added(card_info)
+
+    def extend(self, notty_cards_list):
+        for card_info in notty_cards_list:
+            self.add(card_info)
+
+    def pop(self, index=-1):
+        card_info = self.hand.cards.pop(index)
+        self.hand.removed(card_info)
+        return card_info
+
+    def remove(self, card_info):
+        self.hand.cards.remove(card_info)
+        self.hand.removed(card_info)
+
+    def discard(self, group_cards):
+        """Removes one copy of each of the group's cards from the hand, in
+        place, as NottyGame.discard does; the deck gets back one copy each."""
+        for card_info in group_cards:
+            self.remove(card_info)
+
+    def groups(self):
+        """Returns (first group, largest group) as card names, see HandBits.groups."""
+        return self.hand.groups()
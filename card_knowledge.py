@@ -0,0 +1,247 @@
+"""What each player knows about where the cards are, and exact draw odds.
+
+A player sees their own hand and learns of a few cards in other hands: a
+card snatched from them is known to sit with the snatcher until it is
+discarded or snatched on.  Discarded groups and returned cards go back into
+the deck, so they are unseen again.  Every other card is unseen: it is in
+the deck or in a hand the player cannot see, and any unseen card is as
+likely as another to be the next one drawn.
+
+The odds that drawing 1, 2 or 3 cards completes a group are counted exactly
+over the unseen cards (a multivariate hypergeometric draw).  Only the
+minimal groups matter, runs and sets of 3, so for a hand they come down to
+the cards that complete a group on their own (singles), the pairs that do
+and the triples that do.  These completion tables depend only on which
+cards the hand holds, and are cached by its `present` mask; the odds are
+then sums over the tables, so a draw decision costs tens of microseconds.
+
+The minimal groups come from group_catalogue, which also answers which
+known cards in other hands would complete a group, for picking whom to
+snatch from.
+"""
+
+from math import comb
+
+from card_groups import CARD_NAMES, CARD_UNIT, GroupCache
+from group_catalogue import GROUPS, reachable_groups
+from notty_cards import COPIES_PER_DECK
+
+# The smallest group a completed draw can discard.
+MIN_GROUP = 3
+
+# Every run of 3 and every set of 3, as tuples of card names.
+MINIMAL_GROUPS = tuple(group.cards for group in GROUPS if len(group) == MIN_GROUP)
+
+completion_cache = GroupCache(maxsize=1024)
+
+
+class Completions:
+    """The ways a draw can complete a group for one set of held cards.
+
+    Attributes:
+        complete (bool): The hand already holds a group.
+        singles (tuple): Cards that complete a group on their own.
+        pairs (tuple): (a, b) pairs of other cards that complete a group.
+        neighbours (dict): Card -> cards it forms a completing pair with.
+        triangles (tuple): Triples all three of whose pairs are in `pairs`.
+        triples (tuple): Triples that complete a group and hold no single
+            and no completing pair.
+    """
+    def __init__(self, held):
+        missing = [tuple(card_info for card_info in group if card_info not in held) for group in MINIMAL_GROUPS]
+        self.complete = any(not cards for cards in missing)
+        singles = {cards[0] for cards in missing if len(cards) == 1}
+        pairs = {tuple(sorted(cards)) for cards in missing
+                 if len(cards) == 2 and not singles.intersection(cards)}
+        neighbours = {}
+        for first, second in pairs:
+            neighbours.setdefault(first, set()).add(second)
+            neighbours.setdefault(second, set()).add(first)
+        self.singles = tuple(singles)
+        self.pairs = tuple(pairs)
+        self.neighbours = {card_info: tuple(others) for card_info, others in neighbours.items()}
+        self.triangles = tuple({tuple(sorted((first, second, third))) for first, second in pairs
+                                for third in neighbours[first] & neighbours[second]})
+        self.triples = tuple(cards for cards in missing if len(cards) == 3
+                             and not singles.intersection(cards)
+                             and not any(tuple(sorted(pair)) in pairs
+                                         for pair in ((cards[0], cards[1]), (cards[0], cards[2]),
+                                                      (cards[1], cards[2]))))
+
+
+def completions(hand):
+    """Returns the cached Completions for a HandBits hand."""
+    table = completion_cache.get(hand.present)
+    if table is None:
+        held = {card_info for card_info in CARD_NAMES if hand.present & CARD_UNIT[card_info]}
+        table = completion_cache.put(hand.present, Completions(held))
+    return table
+
+
+def completion_odds(table, unseen, count):
+    """Returns the exact probability that drawing `count` unseen cards
+    completes a group, for a hand with Completions `table`.
+
+    Args:
+        unseen (dict): Card name -> copies unseen.
+        count (int): Cards drawn, 1 to 3.
+    """
+    total = sum(unseen.values())
+    if count > total:
+        return 0.0
+    if table.complete:
+        return 1.0
+    single_cards = sum(unseen.get(card_info, 0) for card_info in table.singles)
+    if count == 1:
+        return single_cards / total
+
+    rest = total - single_cards
+    pair_draws = 0
+    bad = 0
+    for first, second in table.pairs:
+        first_count = unseen.get(first, 0)
+        second_count = unseen.get(second, 0)
+        both = first_count * second_count
+        pair_draws += both
+        if count == 3:
+            # Draws holding both cards and any third card.
+            bad += (both * (rest - first_count - second_count) + comb(first_count, 2) * second_count
+                    + first_count * comb(second_count, 2))
+    if count == 2:
+        return 1 - (comb(rest, 2) - pair_draws) / comb(total, 2)
+
+    # A draw of three distinct cards holding two completing pairs is counted
+    # twice above, and one holding three is counted three times.
+    for card_info, others in table.neighbours.items():
+        counts = [unseen.get(other, 0) for other in others]
+        sum_counts = sum(counts)
+        bad -= unseen.get(card_info, 0) * (sum_counts * sum_counts - sum(n * n for n in counts)) // 2
+    for cards in table.triangles:
+        bad += unseen.get(cards[0], 0) * unseen.get(cards[1], 0) * unseen.get(cards[2], 0)
+    for cards in table.triples:
+        bad += unseen.get(cards[0], 0) * unseen.get(cards[1], 0) * unseen.get(cards[2], 0)
+    return 1 - (comb(rest, 3) - bad) / comb(total, 3)
+
+
+class CardKnowledge:
+    """Tracks, for every player, the cards they know to be in other hands.
+
+    Report each snatch and discard; the hands themselves are read from the
+    HandBits passed in when odds are asked for.
+
+    Attributes:
+        copies (int): Copies of each card in the game.
+        known (dict): known[observer][holder] is a dict of card name ->
+            copies `observer` knows `holder` holds.
+    """
+    def __init__(self, num_players, num_decks=1):
+        self.copies = COPIES_PER_DECK * num_decks
+        players = range(1, num_players + 1)
+        self.known = {observer: {holder: {} for holder in players if holder != observer}
+                      for observer in players}
+
+    def snatch(self, player_id, target_player, card_info):
+        """Records that `player_id` snatched `card_info` from `target_player`.
+
+        The target now knows the snatcher holds the card.  Everyone else
+        only saw some card change hands, so what they knew of the target's
+        hand is forgotten.
+        """
+        for observer, holders in self.known.items():
+            if observer == target_player:
+                _add(holders[player_id], card_info)
+            elif observer == player_id:
+                _take(holders[target_player], card_info)
+            else:
+                holders[target_player].clear()
+
+    def discard(self, player_id, group_cards):
+        """Records that `player_id` discarded a group into the deck."""
+        for observer, holders in self.known.items():
+            if observer != player_id:
+                for card_info in group_cards:
+                    _take(holders[player_id], card_info)
+
+    def unseen(self, player_id, hand):
+        """Returns card name -> copies that `player_id` has not located.
+
+        Args:
+            hand (HandBits): The player's own hand.
+        """
+        unseen = {}
+        holders = [held for held in self.known[player_id].values() if held]
+        for card_info in CARD_NAMES:
+            copies = self.copies - hand.count(card_info)
+            for held in holders:
+                copies -= held.get(card_info, 0)
+            if copies > 0:
+                unseen[card_info] = copies
+        return unseen
+
+    def draw_odds(self, player_id, hand, most=3):
+        """Returns the odds that drawing 1 to `most` cards completes a group.
+
+        Returns:
+            list: Probability for each draw count, index 0 for one card.
+        """
+        table = completions(hand)
+        unseen = self.unseen(player_id, hand)
+        return [completion_odds(table, unseen, count) for count in range(1, most + 1)]
+
+    def best_draw_count(self, player_id, hand, most=3):
+        """Picks how many cards to draw, 1 to `most`.
+
+        Drawing `count` cards adds them to the hand and, with the odds of
+        completing a group, lets at least MIN_GROUP cards be discarded; the
+        count with the smallest expected hand growth wins, fewer cards on a
+        tie.
+        """
+        odds = self.draw_odds(player_id, hand, most)
+        return min(range(1, most + 1), key=lambda count: count - MIN_GROUP * odds[count - 1])
+
+    def snatch_odds(self, player_id, hand, hand_sizes):
+        """Returns the odds that snatching from each player completes a group.
+
+        Only the cards `player_id` knows a player holds count, so a player
+        with none of the missing cards of the hand's reachable groups is
+        left out.
+
+        Args:
+            hand (HandBits): The player's own hand.
+            hand_sizes (dict): Cards in each player's hand.
+
+        Returns:
+            dict: Player -> probability that a random card of their hand
+            completes one of the groups the hand is one card short of.
+        """
+        wanted = reachable_groups(hand)
+        odds = {}
+        for holder, held in self.known[player_id].items():
+            copies = sum(count for card_info, count in held.items() if card_info in wanted)
+            if copies and hand_sizes.get(holder):
+                odds[holder] = copies / hand_sizes[holder]
+        return odds
+
+    def best_snatch_target(self, player_id, hand, hand_sizes, targets):
+        """Picks the target with the best known odds of completing a group.
+
+        Returns:
+            int: One of `targets`, or None if no target is known to hold a
+            card that completes a group.
+        """
+        odds = self.snatch_odds(player_id, hand, hand_sizes)
+        known = [target for target in targets if target in odds]
+        if not known:
+            return None
+        return max(known, key=odds.get)
+
+
+def _add(held, card_info):
+    held[card_info] = held.get(card_info, 0) + 1
+
+
+def _take(held, card_info):
+    if held.get(card_info):
+        held[card_info] -= 1
+        if not held[card_info]:
+            del held[card_info]
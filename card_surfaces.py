@@ -0,0 +1,79 @@
+"""Cache of card images scaled to the sizes they are drawn at.
+
+The card PNGs are 534x800 with per-pixel alpha, and game_table.show_card
+draws them at 100x140, so scaling on every draw costs far more than the
+blit.  The cache keeps each (card, width, height) it is asked for, scaled
+once and converted to the display's pixel format so the blit needs no
+conversion either.
+
+Misses are filled by a load function; assets.py passes one that reads
+the scaled cards from the on-disk cache, scaling them only on a miss there.
+
+The surfaces are held in an lru.LRUCache weighed in bytes: once the
+surfaces held pass `max_bytes`, the least recently drawn are dropped.  The
+display mode must be set before the first lookup, since converting needs
+it.
+"""
+
+import pygame
+
+from lru import LRUCache
+
+# A 100x140 card is about 55 KB, so this holds every card at a few sizes.
+MAX_BYTES = 16 * 1024 * 1024
+
+
+def surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+def to_display_format(surface):
+    """Converts a surface to the display's pixel format, keeping its alpha."""
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+class CardSurfaceCache:
+    """Scaled, display-format card surfaces, keyed by (card, width, height).
+
+    Attributes:
+        load (function): Called with (card_name, width, height) on a miss;
+            returns the scaled card in display format, or None for an
+            unknown card.
+        surfaces (LRUCache): The surfaces, weighed in bytes and capped at
+            `max_bytes`.
+    """
+    def __init__(self, load, max_bytes=MAX_BYTES):
+        self.load = load
+        self.surfaces = LRUCache(max_bytes, surface_bytes)
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(self, card_name, width, height):
+        """Returns the card scaled to width x height, or None for an unknown card.
+
+        The surface is shared: copy it before changing it, e.g. with set_alpha.
+        """
+        key = (card_name, width, height)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.load(card_name, width, height)
+            if surface is not None:
+                self.surfaces.put(key, surface)
+        return surface
+
+    def preload(self, card_names, width=100, height=140):
+        """Scales the cards ahead of time, so the first frames do not."""
+        for card_name in card_names:
+            self.get(card_name, width, height)
+
+    def clear(self):
+        """Empties the cache and resets the counters."""
+        self.surfaces.clear()
+
+    def stats(self):
+        """Returns the counters and size as a dict, `weight` in bytes, for tuning max_bytes."""
+        return self.surfaces.stats()
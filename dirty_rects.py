@@ -0,0 +1,88 @@
+"""Dirty-rectangle rendering: redraw and update only what changed.
+
+The table is described as layers, back to front.  Each layer is a screen
+rectangle, a function that draws it, and a key function returning a
+snapshot of what it shows (the cards in a hand, the message text, whether
+the discard buttons are up).  Every frame the keys are compared with the
+last frame's; the rectangles of the layers whose key changed are cleared
+to the background, every layer overlapping them is redrawn clipped to
+them, and only those rectangles are passed to pygame.display.update.  A
+frame where nothing changed draws nothing at all.
+
+The tables are drawn by functions rather than sprites, so layers wrap
+those functions instead of using pygame.sprite.LayeredDirty.  Anything
+drawn outside the layers, such as the timeline's moving cards, needs a
+full redraw: pass full=True for those frames, and the frame after is
+redrawn in full too to clear what they left behind.
+"""
+
+import pygame
+
+
+class DirtyRenderer:
+    """Redraws the layers of a screen whose contents changed.
+
+    Attributes:
+        surface (pygame.Surface): The screen.
+        background (tuple): Colour the screen is cleared to.
+        layers (list): (rect, draw, key) tuples, back to front.
+    """
+    def __init__(self, surface, background):
+        self.surface = surface
+        self.background = background
+        self.layers = []
+        self._keys = []
+        self._full = True
+
+    def add(self, rect, draw, key=None):
+        """Adds a layer in front of the others.
+
+        Args:
+            rect (pygame.Rect): Everything `draw` draws must fall inside it.
+            draw (function): Draws the layer onto the surface.
+            key (function): Returns a hashable snapshot of what the layer
+                shows. None for a layer that never changes.
+        """
+        self.layers.append((pygame.Rect(rect), draw, key or _static))
+        self._full = True
+
+    def invalidate(self):
+        """Makes the next frame a full redraw."""
+        self._full = True
+
+    def draw(self, full=False):
+        """Redraws what changed since the last frame.
+
+        Returns:
+            list: The rectangles redrawn, for update().
+        """
+        keys = [key() for _, _, key in self.layers]
+        if full or self._full:
+            self.surface.fill(self.background)
+            for _, draw, _ in self.layers:
+                draw()
+            self._keys = keys
+            # Whatever is drawn on top of a full frame is cleared by the next
+            self._full = full
+            return [self.surface.get_rect()]
+
+        dirty = [rect for (rect, _, _), old, new in zip(self.layers, self._keys, keys) if old != new]
+        self._keys = keys
+        for rect in dirty:
+            self.surface.set_clip(rect)
+            self.surface.fill(self.background, rect)
+            for layer_rect, draw, _ in self.layers:
+                if layer_rect.colliderect(rect):
+                    draw()
+        self.surface.set_clip(None)
+        return dirty
+
+    @staticmethod
+    def update(dirty):
+        """Pushes the redrawn rectangles to the display; nothing if none."""
+        if dirty:
+            pygame.display.update(dirty)
+
+
+def _static():
+    return None
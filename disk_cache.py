@@ -0,0 +1,141 @@
+"""On-disk cache of images already decoded and scaled to the size they are drawn at.
+
+Every launch used to decode the PNGs and scale each one to the size its
+screen draws it at.  This cache keeps the scaled pixels as raw RGBA files
+in CACHE_DIR: a later launch maps the file into memory and wraps it as a
+surface with pygame.image.frombuffer, with no decode and no scaling.
+
+An entry is keyed by a hash of the source file's bytes, the part of it
+used (a card's name in the atlas) and the target size, so changing a
+source image makes a new entry; the stale one for the same source path,
+part and size is deleted when the new one is written.  Bumping CACHE_VERSION
+invalidates every entry, e.g. after changing how images are scaled.
+"""
+
+import functools
+import glob
+import hashlib
+import mmap
+import os
+import re
+import struct
+
+import pygame
+
+from card_surfaces import to_display_format
+
+CACHE_DIR = ".surface_cache"
+CACHE_VERSION = 1
+# Magic, version, width and height, before the RGBA pixels
+HEADER = struct.Struct('<4sIII')
+MAGIC = b'NSFC'
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path, mtime, size):
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def file_hash(path):
+    """Returns the SHA-1 of a file's bytes, hashing it again only once it changes."""
+    stat = os.stat(path)
+    return _file_hash(path, stat.st_mtime_ns, stat.st_size)
+
+
+def entry_prefix(path, part, size):
+    """Returns the start of the file name shared by every version of an entry.
+
+    The file's name keeps the prefix readable and a hash of its full path
+    keeps two sources with the same name, in different directories, apart.
+    """
+    name = re.sub(r'[^\w.-]', '_', os.path.splitext(os.path.basename(path))[0] + (f"-{part}" if part else ""))
+    source = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return f"{name}-{source}-{size[0]}x{size[1]}-"
+
+
+def entry_path(path, part, size, cache_dir=CACHE_DIR):
+    """Returns where the entry for `part` of `path` at `size` is kept."""
+    key = f"{CACHE_VERSION}:{file_hash(path)}:{part}:{size[0]}x{size[1]}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{entry_prefix(path, part, size)}{digest}.rgba")
+
+
+def read_entry(entry):
+    """Maps a cache file into memory and wraps it as a surface.
+
+    Returns:
+        pygame.Surface: The image, or None if the file is missing or not a
+        valid entry.
+    """
+    try:
+        with open(entry, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < HEADER.size:
+                return None
+            magic, version, width, height = HEADER.unpack_from(mapped)
+            if magic != MAGIC or version != CACHE_VERSION or len(mapped) != HEADER.size + width * height * 4:
+                return None
+            pixels = memoryview(mapped)[HEADER.size:]
+            surface = pygame.image.frombuffer(pixels, (width, height), 'RGBA')
+            # Converting copies the pixels out, so the mapping can be closed
+            if pygame.display.get_surface() is not None:
+                loaded = to_display_format(surface)
+            else:
+                loaded = surface.copy()
+            del surface
+            pixels.release()
+    except (OSError, ValueError):
+        # ValueError: an empty file cannot be mapped
+        return None
+    return loaded
+
+
+def write_entry(entry, surface):
+    """Saves a surface as a cache file, replacing older versions of the entry."""
+    directory = os.path.dirname(entry)
+    os.makedirs(directory, exist_ok=True)
+    width, height = surface.get_size()
+    temporary = f"{entry}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, CACHE_VERSION, width, height))
+        file.write(pygame.image.tobytes(surface, 'RGBA'))
+    os.replace(temporary, entry)
+    prefix = os.path.basename(entry)[:os.path.basename(entry).rindex('-') + 1]
+    for stale in glob.glob(os.path.join(glob.escape(directory), glob.escape(prefix) + '*.rgba')):
+        if stale != entry:
+            os.remove(stale)
+
+
+def load(path, size, make, part="", cache_dir=CACHE_DIR):
+    """Returns `part` of the image at `path` scaled to `size`, from the cache
+    if it has it, otherwise from make(), which is then cached.
+
+    Args:
+        path (str): Source image file the entry depends on.
+        size (tuple): (width, height) the image is scaled to.
+        make (function): Decodes and scales the image on a miss.
+        part (str): Which image in `path`, for files holding several.
+
+    Returns:
+        pygame.Surface: The scaled image, in the display's format if a
+        display mode is set.
+    """
+    entry = entry_path(path, part, size, cache_dir)
+    surface = read_entry(entry)
+    if surface is not None:
+        return surface
+    surface = make()
+    try:
+        write_entry(entry, surface)
+    except OSError as error:
+        # A read-only checkout still runs, just without the cache
+        print(f"Could not cache {entry}: {error}")  # Debug
+    if pygame.display.get_surface() is not None:
+        return to_display_format(surface)
+    return surface
+
+
+def clear(cache_dir=CACHE_DIR):
+    """Deletes every cache entry."""
+    for entry in glob.glob(os.path.join(glob.escape(cache_dir), '*.rgba')):
+        os.remove(entry)
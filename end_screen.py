@@ -1,17 +1,15 @@
 import pygame
 import sys
 import random
-import math
 import subprocess
 
-# Initialize Pygame
-pygame.init()
+import assets
+from fireworks import Fireworks
 
 # Screen dimensions
 SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Card Game - Winning Screen")
-surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+# Opened by show_winning_screen, so importing this module opens no window
+screen = None
 
 # Colors
 WHITE = (255, 255, 255)
@@ -26,55 +24,16 @@ FIREWORK_COLORS = [
     (255, 255, 255),  # White
 ]
 
-# Fonts
-font = pygame.font.Font(None, 74)
-small_font = pygame.font.Font(None, 36)
-
-# Load Uno card images
-notty_card_images = []
-for i in range(1, 5): 
-    image = pygame.image.load(f"game_images/notty_card_{i}.png").convert_alpha()
-    notty_card_images.append(pygame.transform.scale(image, (100, 150)))
-
 # Function to display text
-def draw_text(text, font, color, surface, x, y):
-    text_obj = font.render(text, True, color)
+def draw_text(text, size, color, surface, x, y):
+    text_obj = assets.text(text, size, color)
     text_rect = text_obj.get_rect(center=(x, y))
     surface.blit(text_obj, text_rect)
 
-# Firework particle class
-class FireworkParticle:
-    def __init__(self, x, y, angle, speed, color, lifetime):
-        self.x = x
-        self.y = y
-        self.dx = math.cos(angle) * speed
-        self.dy = math.sin(angle) * speed
-        self.color = color
-        self.lifetime = lifetime
-        self.alpha = 255
-
-    def move(self):
-        self.x += self.dx
-        self.y += self.dy
-        self.lifetime -= 1
-        self.alpha = max(0, int((self.lifetime / 60) * 255))  
-
-    def draw(self, surface):
-        if self.lifetime > 0:
-            color_with_alpha = (*self.color, self.alpha)
-            pygame.draw.circle(surface, color_with_alpha, (int(self.x), int(self.y)), 3)
-
 # Create firework explosion
-def create_firework_explosion(x, y):
-    particles = []
-    num_particles = random.randint(50, 100)
-    speed = random.uniform(2, 4)
-    color = random.choice(FIREWORK_COLORS)
-    lifetime = random.randint(30, 60)
-    for i in range(num_particles):
-        angle = random.uniform(0, 2 * math.pi)
-        particles.append(FireworkParticle(x, y, angle, speed, color, lifetime))
-    return particles
+def create_firework_explosion(fireworks, x, y):
+    fireworks.explode(x, y, count=random.randint(50, 100), speed=random.uniform(2, 4),
+                      color=random.choice(FIREWORK_COLORS), lifetime=random.randint(30, 60))
 
 # Create and animate card fireworks
 def create_card_firework_center():
@@ -82,7 +41,7 @@ def create_card_firework_center():
     Creates a single card firework starting from the center of the screen, moving vertically upward.
     """
     return {
-        "image": random.choice(notty_card_images),
+        "image": random.choice(assets.notty_cards((100, 150))),
         "x": SCREEN_WIDTH // 2 - 50,  
         "y": SCREEN_HEIGHT - 100,    
         "dx": 0,                     
@@ -91,7 +50,7 @@ def create_card_firework_center():
         "timer": 0
     }
 
-def animate_cards(cards, particles):
+def animate_cards(cards, fireworks):
     for card in cards[:]:
         if card["stage"] == "launch":
             card["x"] += card["dx"]
@@ -101,25 +60,13 @@ def animate_cards(cards, particles):
             # Transition to "explode" after a set timer
             if card["timer"] > 30:
                 card["stage"] = "explode"
-                particles.extend(create_firework_explosion(card["x"] + 50, card["y"] + 75))
+                create_firework_explosion(fireworks, card["x"] + 50, card["y"] + 75)
                 cards.remove(card)
 
         # Draw the card
         screen.blit(card["image"], (card["x"], card["y"]))
 
-# Animate fireworks
-def animate_fireworks(particles, surface):
-    for particle in particles[:]:
-        particle.move()
-        particle.draw(surface)
-        if particle.lifetime <= 0:
-            particles.remove(particle)
-
-# Load crying emoji image
-crying_emoji = pygame.image.load("game_images/crying_emoji.png")  
-crying_emoji = pygame.transform.scale(crying_emoji, (100, 100))  # Resize as needed
-
-def draw_button(surface, text, x, y, width, height, font, button_color, text_color, hover_color, action=None):
+def draw_button(surface, text, x, y, width, height, size, button_color, text_color, hover_color, action=None):
   
     mouse = pygame.mouse.get_pos()
     click = pygame.mouse.get_pressed()
@@ -133,7 +80,7 @@ def draw_button(surface, text, x, y, width, height, font, button_color, text_col
         pygame.draw.rect(surface, button_color, (x, y, width, height))
 
     # Draw the button text
-    button_text = font.render(text, True, text_color)
+    button_text = assets.text(text, size, text_color)
     text_rect = button_text.get_rect(center=(x + width // 2, y + height // 2))
     surface.blit(button_text, text_rect)
 
@@ -161,10 +108,12 @@ def show_winning_screen(winner_name, user_name):
     :param winner_name: Name of the player who won (from another file).
     :param user_name: Name of the user.
     """
+    global screen
+    screen = assets.screen("Card Game - Winning Screen")
     clock = pygame.time.Clock()
     running = True
     cards = []
-    particles = []
+    fireworks = Fireworks()
 
     # Check if the user is the winner
     is_user_winner = winner_name == user_name
@@ -181,9 +130,9 @@ def show_winning_screen(winner_name, user_name):
 
         # Determine message based on whether the user won or lost
         if is_user_winner:
-            draw_text("Congratulations, You Won!", font, GREEN, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 5)
+            draw_text("Congratulations, You Won!", 74, GREEN, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 5)
         else:
-            draw_text("Sorry, You Lost!", font, (255, 0, 0), screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 5)
+            draw_text("Sorry, You Lost!", 74, (255, 0, 0), screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 5)
 
        
 
@@ -194,21 +143,22 @@ def show_winning_screen(winner_name, user_name):
                 cards.append(create_card_firework_center())
 
             # Animate the single card
-            animate_cards(cards, particles)
-            animate_fireworks(particles, surface)
+            animate_cards(cards, fireworks)
+            fireworks.update()
 
         else:
             # Display crying emoji when the user loses
+            crying_emoji = assets.image("game_images/crying_emoji.png", (100, 100))
             screen.blit(crying_emoji, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2))  # Centered crying emoji
 
         # Draw buttons
         draw_button(screen, "Play Again", SCREEN_WIDTH // 4 - button_width // 2, button_y, button_width, button_height,
-                    small_font, (0, 200, 0), WHITE, (0, 255, 0), play_again_action)
+                    36, (0, 200, 0), WHITE, (0, 255, 0), play_again_action)
         draw_button(screen, "Exit", 3 * SCREEN_WIDTH // 4 - button_width // 2, button_y, button_width, button_height,
-                    small_font, (200, 0, 0), WHITE, (255, 0, 0), exit_action)
+                    36, (200, 0, 0), WHITE, (255, 0, 0), exit_action)
 
-        # Blit the surface
-        screen.blit(surface, (0, 0))
+        # The fireworks go over everything else
+        fireworks.draw(screen)
 
         # Event handling
         for event in pygame.event.get():
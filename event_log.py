@@ -0,0 +1,292 @@
+"""Compact binary log of a Notty game, and a replayer for it.
+
+A game is a sequence of records, each written as a varint byte length
+followed by the record.  The first record is the header: format version,
+number of players, copies of each card in the deck and the game's seed as
+a varint.  Every other record starts with one byte holding the event kind
+(high 3 bits), an end-of-turn flag (bit 4) and the player (low 4 bits),
+followed by its cards, one byte each (the card's index in
+card_groups.CARD_NAMES):
+
+    DEAL     card               DISCARD  cards of the group
+    DRAW     cards drawn        RETURN   card
+    SNATCH   target, position   SKIP     -
+    WIN      -                  END      - (a turn with nothing to flag)
+
+The end-of-turn flag is set on the last event of a turn, so passing the
+turn costs no bytes unless the turn had no events of its own.  A typical
+draw of two cards takes 4 bytes.
+
+Several games are stored one after another, each behind its own varint
+length, by write_games and read back by read_games.  differences checks a
+replay against the live game it was logged from.
+"""
+
+from collections import Counter
+
+from card_groups import CARD_INDEX, CARD_NAMES, GroupTracker
+from card_knowledge import CardKnowledge
+from notty_cards import Deck
+
+FORMAT_VERSION = 1
+
+DEAL = 0
+DRAW = 1
+SNATCH = 2
+DISCARD = 3
+RETURN = 4
+SKIP = 5
+WIN = 6
+END = 7
+
+EVENT_NAMES = ('deal', 'draw', 'snatch', 'discard', 'return', 'skip', 'win', 'end')
+# Events made by the player whose turn it is.  A deal names the player
+# dealt to, and a win the winner, who may be the player just snatched from.
+_TURN_EVENTS = frozenset((DRAW, SNATCH, DISCARD, RETURN, SKIP, END))
+
+_KIND_SHIFT = 5
+_END_FLAG = 0x10
+_PLAYER_MASK = 0x0F
+
+
+def write_varint(buffer, value):
+    """Appends `value` to `buffer` as a little-endian base-128 varint."""
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, position):
+    """Reads a varint from `data` at `position`.
+
+    Returns:
+        tuple: (value, position after the varint).
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class GameRecorder:
+    """Writes the events of one game into a byte buffer.
+
+    Pass one to NottyGame as `recorder` and every action is logged.
+
+    Attributes:
+        buffer (bytearray): The records written so far.
+        events (int): Events recorded, not counting the header.
+    """
+    def __init__(self, num_players, seed=None, copies=2):
+        self.buffer = bytearray()
+        self.events = 0
+        self._last_event = None
+        header = bytearray((FORMAT_VERSION, num_players, copies))
+        if seed is not None:
+            write_varint(header, seed)
+        self._write(header)
+
+    def _write(self, record):
+        write_varint(self.buffer, len(record))
+        self.buffer += record
+
+    def _event(self, kind, player_id, payload=b''):
+        record = bytearray((kind << _KIND_SHIFT | player_id,))
+        record += payload
+        self._last_event = len(self.buffer) + 1
+        self._write(record)
+        self.events += 1
+
+    def deal(self, player_id, card_info):
+        self._event(DEAL, player_id, bytes((CARD_INDEX[card_info],)))
+
+    def draw(self, player_id, cards):
+        self._event(DRAW, player_id, bytes(CARD_INDEX[card_info] for card_info in cards))
+
+    def snatch(self, player_id, target_player, index):
+        """Logs a snatch of the card at `index` in the target's hand."""
+        self._event(SNATCH, player_id, bytes((target_player, index)))
+
+    def discard(self, player_id, cards):
+        self._event(DISCARD, player_id, bytes(CARD_INDEX[card_info] for card_info in cards))
+
+    def return_card(self, player_id, card_info):
+        self._event(RETURN, player_id, bytes((CARD_INDEX[card_info],)))
+
+    def skip(self, player_id):
+        self._event(SKIP, player_id)
+
+    def win(self, player_id):
+        self._event(WIN, player_id)
+
+    def end_turn(self, player_id):
+        """Flags the turn's last event, or writes END if the turn had none."""
+        if self._last_event is None:
+            self._event(END, player_id)
+        self.buffer[self._last_event] |= _END_FLAG
+        self._last_event = None
+
+    def to_bytes(self):
+        return bytes(self.buffer)
+
+
+def read_header(data):
+    """Reads the header record of a game.
+
+    Returns:
+        tuple: (num_players, copies, seed or None, position of the first event).
+    """
+    length, position = read_varint(data, 0)
+    end = position + length
+    version, num_players, copies = data[position:position + 3]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported event log version: {version}")
+    seed = read_varint(data, position + 3)[0] if end > position + 3 else None
+    return num_players, copies, seed, end
+
+
+def iter_events(data):
+    """Yields (kind, player, ends_turn, cards) for each event of a game.
+
+    `cards` is a bytes object of card indexes, except for SNATCH where it
+    holds the target player and the position of the card in their hand.
+    """
+    position = read_header(data)[3]
+    size = len(data)
+    while position < size:
+        length = data[position]
+        if length < 0x80:
+            position += 1
+        else:
+            length, position = read_varint(data, position)
+        header = data[position]
+        yield (header >> _KIND_SHIFT, header & _PLAYER_MASK, bool(header & _END_FLAG),
+               data[position + 1:position + length])
+        position += length
+
+
+def replay(data, upto=None):
+    """Rebuilds the game state from a log, after `upto` events (all if None).
+
+    Hands are rebuilt exactly, in order.  The deck's contents are exact;
+    draws from a Deck are random, so it holds no order to rebuild.
+
+    Returns:
+        NottyGame: The game as it stood after those events.
+    """
+    from notty_engine import NottyGame
+
+    num_players, copies, seed, _ = read_header(data)
+    hands = {player_id: [] for player_id in range(1, num_players + 1)}
+    trackers = {player_id: GroupTracker(hand) for player_id, hand in hands.items()}
+    deck = Counter({index: copies for index in range(len(CARD_NAMES))})
+    current_player = 1
+    turns = 0
+    turn_action = None
+    drawn = []
+    discards = dict.fromkeys(hands, 0)
+    knowledge = CardKnowledge(num_players, max(1, copies // 2))
+    winner = None
+
+    for count, (kind, player_id, ends_turn, cards) in enumerate(iter_events(data)):
+        if upto is not None and count >= upto:
+            break
+        if kind in _TURN_EVENTS:
+            current_player = player_id
+        if kind == DEAL:
+            deck[cards[0]] -= 1
+            trackers[player_id].add(CARD_NAMES[cards[0]])
+        elif kind == DRAW:
+            names = [CARD_NAMES[index] for index in cards]
+            for index in cards:
+                deck[index] -= 1
+            drawn.extend(names)
+            trackers[player_id].extend(names)
+            turn_action = 'draw'
+        elif kind == SNATCH:
+            card_info = trackers[cards[0]].pop(cards[1])
+            trackers[player_id].add(card_info)
+            knowledge.snatch(player_id, cards[0], card_info)
+            turn_action = 'snatch'
+        elif kind == DISCARD:
+            for index in cards:
+                deck[index] += 1
+                card_info = CARD_NAMES[index]
+                trackers[player_id].remove(card_info)
+                if card_info in drawn:
+                    drawn.remove(card_info)
+            discards[player_id] += 1
+            knowledge.discard(player_id, [CARD_NAMES[index] for index in cards])
+        elif kind == RETURN:
+            deck[cards[0]] += 1
+            trackers[player_id].remove(CARD_NAMES[cards[0]])
+            drawn.remove(CARD_NAMES[cards[0]])
+        elif kind == SKIP:
+            turn_action = 'skip'
+        elif kind == WIN:
+            winner = player_id
+        if ends_turn:
+            current_player = player_id % num_players + 1
+            turns += 1
+            turn_action = None
+            drawn = []
+
+    game = NottyGame(num_players=num_players, seed=seed if seed is not None else 0,
+                     num_decks=max(1, copies // 2))
+    for player_id, hand in hands.items():
+        game.group_trackers[player_id].extend(hand)
+    game.full_deck = Deck((CARD_NAMES[index] for index in sorted(deck.elements())), game.rng)
+    game.current_player = current_player
+    game.turns = turns
+    game.turn_action = turn_action
+    game.drawn_cards = drawn
+    game.discards = discards
+    game.winner = winner
+    game.knowledge = knowledge
+    game.rehash()
+    return game
+
+
+def differences(game, replayed):
+    """Compares a replayed game with the live game it was logged from.
+
+    The deck is compared by its contents, since a Deck holds no order.
+
+    Returns:
+        list: The names of the fields that differ; empty when the replay
+        matches.
+    """
+    fields = ('player_hands', 'current_player', 'turns', 'turn_action', 'drawn_cards', 'discards', 'winner')
+    mismatched = [field for field in fields if getattr(game, field) != getattr(replayed, field)]
+    if Counter(game.full_deck) != Counter(replayed.full_deck):
+        mismatched.append('full_deck')
+    if game.knowledge.known != replayed.knowledge.known:
+        mismatched.append('knowledge')
+    return mismatched
+
+
+def write_games(path, games):
+    """Writes game logs (bytes) to a file, each behind its varint length."""
+    with open(path, 'wb') as file:
+        for data in games:
+            length = bytearray()
+            write_varint(length, len(data))
+            file.write(length)
+            file.write(data)
+
+
+def read_games(path):
+    """Yields the game logs stored in a file by write_games."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    position = 0
+    while position < len(data):
+        length, position = read_varint(data, position)
+        yield data[position:position + length]
+        position += length
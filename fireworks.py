@@ -0,0 +1,150 @@
+"""Firework particles for the winning screen, moved and drawn in batches.
+
+The particles are kept as a structure of NumPy arrays, one entry per
+particle in each, rather than one Python object per particle: a frame
+moves every particle with a few array operations, drops the burnt-out
+ones by moving live particles from the end of the arrays into their
+slots, and draws them all at once by blending a small disc per particle
+into the target surface's pixels through pygame.surfarray.
+
+Particles move a fixed step per frame and fade out over their lifetime,
+like the winning screen's card fireworks, so the screen should run at a
+steady frame rate.
+"""
+
+import math
+
+import numpy
+import pygame
+
+# Radius of a particle in pixels.
+RADIUS = 3
+# Frames over which a particle fades from opaque to gone.
+FADE_FRAMES = 60
+
+
+def _disc_offsets(radius):
+    """Returns the (dx, dy) offsets of the pixels in a disc of `radius`."""
+    span = numpy.arange(-radius, radius + 1, dtype=numpy.intp)
+    dx, dy = numpy.meshgrid(span, span, indexing='ij')
+    inside = dx * dx + dy * dy <= radius * radius
+    return dx[inside], dy[inside]
+
+
+class Fireworks:
+    """Every live firework particle, as parallel arrays.
+
+    Only the first `count` entries of each array are live; the arrays
+    double in size when an explosion does not fit.
+
+    Attributes:
+        count (int): Live particles.
+        x, y (numpy.ndarray): Positions.
+        dx, dy (numpy.ndarray): Movement per frame.
+        lifetime (numpy.ndarray): Frames left to live.
+        color (numpy.ndarray): RGB of each particle, one row each.
+    """
+    _ARRAYS = ('x', 'y', 'dx', 'dy', 'lifetime', 'color')
+
+    def __init__(self, capacity=1024, radius=RADIUS, rng=None):
+        self.count = 0
+        self.rng = rng or numpy.random.default_rng()
+        self.x = numpy.zeros(capacity, numpy.float32)
+        self.y = numpy.zeros(capacity, numpy.float32)
+        self.dx = numpy.zeros(capacity, numpy.float32)
+        self.dy = numpy.zeros(capacity, numpy.float32)
+        self.lifetime = numpy.zeros(capacity, numpy.int32)
+        self.color = numpy.zeros((capacity, 3), numpy.uint8)
+        self._disc_x, self._disc_y = _disc_offsets(radius)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            grown = numpy.zeros((capacity,) + old.shape[1:], old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
+    def explode(self, x, y, count, speed, color, lifetime):
+        """Adds `count` particles flying out of (x, y) at random angles.
+
+        Args:
+            speed (float): Pixels moved per frame.
+            color (tuple): RGB of the explosion.
+            lifetime (int): Frames the particles live for.
+        """
+        self._reserve(self.count + count)
+        new = slice(self.count, self.count + count)
+        angles = self.rng.uniform(0, 2 * math.pi, count)
+        self.x[new] = x
+        self.y[new] = y
+        self.dx[new] = numpy.cos(angles) * speed
+        self.dy[new] = numpy.sin(angles) * speed
+        self.lifetime[new] = lifetime
+        self.color[new] = color
+        self.count += count
+
+    def update(self):
+        """Moves every particle one frame and drops the burnt-out ones."""
+        live = slice(0, self.count)
+        self.x[live] += self.dx[live]
+        self.y[live] += self.dy[live]
+        self.lifetime[live] -= 1
+        alive = self.lifetime[live] > 0
+        remaining = int(numpy.count_nonzero(alive))
+        if remaining == self.count:
+            return
+        # Swap-remove: live particles past the new end fill the dead slots before it
+        holes = numpy.flatnonzero(~alive[:remaining])
+        movers = numpy.flatnonzero(alive[remaining:]) + remaining
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            array[holes] = array[movers]
+        self.count = remaining
+
+    def alpha(self):
+        """Returns the opacity of each live particle, from 0 to 1."""
+        return numpy.minimum(self.lifetime[:self.count] / FADE_FRAMES, 1.0).astype(numpy.float32)
+
+    def draw(self, surface):
+        """Blends every live particle into a 32-bit surface."""
+        if not self.count:
+            return
+        live = self.count
+        width, height = surface.get_size()
+        # One row per particle, one column per pixel of its disc
+        xs = numpy.rint(self.x[:live]).astype(numpy.intp)[:, None] + self._disc_x
+        ys = numpy.rint(self.y[:live]).astype(numpy.intp)[:, None] + self._disc_y
+        on_screen = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        all_on_screen = on_screen.all()
+        if not all_on_screen:
+            numpy.clip(xs, 0, width - 1, out=xs)
+            numpy.clip(ys, 0, height - 1, out=ys)
+
+        # Colours packed in the surface's own pixel format, so a pixel
+        # blends as four bytes without unpacking its channels
+        red, green, blue, _ = surface.get_shifts()
+        color = self.color[:live].astype(numpy.uint32)
+        packed = (color[:, 0] << red) | (color[:, 1] << green) | (color[:, 2] << blue)
+        source = packed.view(numpy.uint8).reshape(live, 1, 4).astype(numpy.int16)
+        alpha = numpy.rint(self.alpha() * 128).astype(numpy.int16)[:, None, None]
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        try:
+            under = pixels[xs, ys].view(numpy.uint8).reshape(live, -1, 4).astype(numpy.int16)
+            under += ((source - under) * alpha) >> 7
+            blended = under.astype(numpy.uint8).view(numpy.uint32)[..., 0]
+            if all_on_screen:
+                pixels[xs, ys] = blended
+            else:
+                pixels[xs[on_screen], ys[on_screen]] = blended[on_screen]
+        finally:
+            # The surface stays locked while the pixel array exists
+            del pixels
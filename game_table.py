@@ -0,0 +1,143 @@
+"""Drawing and computer moves shared by the two- and three-player tables.
+
+Main_code_2_player and Main_code_3_player lay their tables out
+differently, but they draw the same cards, deck, buttons, names and
+message box, and their Computer 1 picks its moves the same way.  Those
+pieces live here, once.  Each drawing function takes the screen to draw
+on and the position to draw at, so each game module passes its own layout
+in.
+"""
+
+from functools import lru_cache
+
+import pygame
+
+import assets
+from text_cache import wrap_text
+
+# How far apart the cards laid out beside the deck sit.
+OVERLAP_SPACING = 30
+
+
+def show_card(screen, card_name, x, y, width=100, height=140, face_down=False, alpha=255):
+    if face_down:
+        screen.blit(assets.card_back(), (x, y))
+    else:
+        card_image = assets.card_cache().get(card_name, width, height)
+        if card_image is not None:
+            if alpha < 255:
+                # The cached surface is shared, so fade a copy
+                card_image = card_image.copy()
+                card_image.set_alpha(alpha)
+            screen.blit(card_image, (x, y))
+        else:
+            print(f"Card {card_name} not found!")
+
+
+def show_beside_deck(screen, x, y, cards, alpha=255):
+    """Shows cards face up where drawn cards are laid out, from (x, y)."""
+    for i, card in enumerate(cards):
+        show_card(screen, card, x + i * OVERLAP_SPACING, y, alpha=alpha)
+
+
+def draw_deck(screen, deck_x, deck_y, offset=0):
+    screen.blit(assets.card_back(), (deck_x, deck_y + offset))
+
+
+def draw_resting_deck(screen, state, deck_x, deck_y):
+    # While shuffling, the deck is drawn by its Bounce
+    if state.full_deck and state.shuffle_complete:
+        draw_deck(screen, deck_x, deck_y)
+
+
+def draw_drawn_cards(screen, state, x, y):
+    """Shows the cards drawn this turn face down beside the deck, from (x, y)."""
+    for i, _ in enumerate(state.drawn_cards):
+        show_card(screen, None, x + i * OVERLAP_SPACING, y, face_down=True)
+
+
+def draw_button(screen, text, x, y, width, height, color=(0, 122, 204), text_color=(0, 0, 0)):
+    pygame.draw.rect(screen, color, (x, y, width, height))
+    text_surf = assets.text(text, 28, text_color)
+    text_rect = text_surf.get_rect(center=(x + width // 2, y + height // 2))
+    screen.blit(text_surf, text_rect)
+
+
+def draw_player_name(screen, name, x, y, color=(255, 255, 255)):
+    text_surf = assets.text(name, 30, color)
+    screen.blit(text_surf, (x, y))
+
+
+@lru_cache(maxsize=32)
+def layout_message(message, box_width, box_height, margin=40, alpha=128, line_spacing=5, lift=0):
+    """
+    Wraps and renders a message for the message box. Cached, so a message
+    is laid out once rather than on every frame it shows for.
+
+    Args:
+        margin (int): Width of the box left free of text, both sides together.
+        alpha (int): Opacity of the box's black background.
+        line_spacing (int): Pixels between lines.
+        lift (int): Pixels the text sits above the centre of the box.
+
+    Returns:
+        tuple: (semi-transparent background, list of (line surface, (x, y))
+        with the positions relative to the box).
+    """
+    font = assets.font(30)
+    lines = wrap_text(font, message, box_width - margin)
+    text_surfaces = [font.render(line.upper(), True, (255, 255, 255)) for line in lines]
+
+    background_surface = pygame.Surface((box_width, box_height))
+    background_surface.set_alpha(alpha)
+    background_surface.fill((0, 0, 0))
+
+    total_text_height = sum(surface.get_height() for surface in text_surfaces)
+    total_height = total_text_height + (line_spacing * (len(lines) - 1)) if len(lines) > 1 else total_text_height
+    current_y = (box_height - total_height) // 2 - lift
+    placed = []
+    for surface in text_surfaces:
+        placed.append((surface, surface.get_rect(centerx=box_width // 2, y=current_y).topleft))
+        current_y += surface.get_height() + line_spacing
+    return background_surface, placed
+
+
+def draw_message(screen, message, box, **style):
+    """Draws `message` in the message box `box`, an (x, y, width, height)
+    rect; `style` is passed on to layout_message."""
+    box_x, box_y, box_width, box_height = box
+    background_surface, lines = layout_message(message, box_width, box_height, **style)
+    screen.blit(background_surface, (box_x, box_y))
+    for surface, (x, y) in lines:
+        screen.blit(surface, (box_x + x, box_y + y))
+
+
+def hand_key(state, player_id):
+    """What display_cards shows for a hand, for the dirty-rect renderer."""
+    return (tuple(state.player_hands[player_id]),
+            tuple(str(card) for card in state.valid_groups[player_id] or ()),
+            tuple(str(card) for card in state.largest_groups[player_id] or ()))
+
+
+def decide_ai_turn(rng, hand, hand_space, opponent_hand_size, knowledge):
+    """
+    Picks Computer 1's moves for ai_turn. Runs on the AI worker, so it only
+    reads the snapshot it is given.
+
+    Args:
+        rng (random.Random): The decision's own random source.
+        hand (HandBits): A copy of the computer's hand.
+        hand_space (int): Cards the computer's hand has room for.
+        opponent_hand_size (int): Cards in the human player's hand.
+        knowledge (CardKnowledge): A copy of the game's knowledge.
+
+    Returns:
+        dict: 'action', plus 'num_draws' for a draw and 'snatch_index' for a snatch.
+    """
+    decision = {'action': rng.choice(['draw', 'snatch', 'skip'])}
+    if decision['action'] == 'draw' and hand_space > 0:
+        # Draw as many cards as give the best odds of completing a group
+        decision['num_draws'] = knowledge.best_draw_count(2, hand, min(3, hand_space))
+    elif decision['action'] == 'snatch' and opponent_hand_size > 0:
+        decision['snatch_index'] = rng.randint(0, opponent_hand_size - 1)
+    return decision
@@ -0,0 +1,80 @@
+"""Catalogue of every legal Notty group, built once at import.
+
+The rules allow same-colour runs of 3 to 10 cards and same-number sets of
+3 or 4 different colours, which is 144 runs and 50 sets.  Each group keeps
+a mask in the `present` layout of card_groups.HandBits, so testing a hand
+against a group is a single AND, and CARD_GROUPS maps every card to the
+groups that contain it.
+"""
+
+from card_groups import CARD_NAMES, CARD_UNIT, COLOURS, NUMBERS
+
+
+class Group:
+    """One legal group of cards.
+
+    Attributes:
+        cards (tuple): Card names in the group, lowest number or colour first.
+        kind (str): 'run' for a same-colour run, 'set' for a same-number set.
+        mask (int): The group's cards in the `present` layout of HandBits.
+    """
+    def __init__(self, cards, kind):
+        self.cards = cards
+        self.kind = kind
+        self.mask = sum(CARD_UNIT[card_info] for card_info in cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __repr__(self):
+        return f"Group({', '.join(self.cards)})"
+
+
+def _build_groups():
+    groups = []
+    for colour in range(len(COLOURS)):
+        for length in range(3, len(NUMBERS) + 1):
+            for start in range(len(NUMBERS) - length + 1):
+                cards = CARD_NAMES[colour * 10 + start:colour * 10 + start + length]
+                groups.append(Group(cards, 'run'))
+    for number in NUMBERS:
+        for left_out in range(len(COLOURS) + 1):
+            # left_out == 4 keeps all four colours
+            cards = tuple(CARD_NAMES[colour * 10 + number] for colour in range(len(COLOURS))
+                          if colour != left_out)
+            groups.append(Group(cards, 'set'))
+    return tuple(groups)
+
+
+def _build_index(groups):
+    index = {card_info: [] for card_info in CARD_NAMES}
+    for group in groups:
+        for card_info in group.cards:
+            index[card_info].append(group)
+    return {card_info: tuple(card_groups) for card_info, card_groups in index.items()}
+
+
+GROUPS = _build_groups()
+CARD_GROUPS = _build_index(GROUPS)
+
+_UNIT_CARD = {unit: card_info for card_info, unit in CARD_UNIT.items()}
+
+
+def reachable_groups(hand):
+    """Finds the groups the hand is exactly one card short of.
+
+    The catalogue has a fixed size, so this costs the same for any hand.
+
+    Args:
+        hand (HandBits): The hand to test.
+
+    Returns:
+        dict: Missing card name -> list of groups that card would complete.
+    """
+    present = hand.present
+    reachable = {}
+    for group in GROUPS:
+        missing = group.mask & ~present
+        if missing and not missing & (missing - 1):
+            reachable.setdefault(_UNIT_CARD[missing], []).append(group)
+    return reachable
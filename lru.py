@@ -0,0 +1,87 @@
+"""Bounded least-recently-used cache, shared by the caches of the game.
+
+The group searches, the scaled card faces and the rendered text are each
+cached in an LRUCache.  Entries are kept in a dict in recency order: a hit
+takes its entry out and puts it back at the newest end, and storing past
+the cap drops entries from the oldest end.  Each entry has a weight, 1
+unless a weigh function is given, and the cap is on the total weight, so
+the same class caps a cache by entry count or by bytes held.
+
+The group caches are read and filled from both the game loop and the AI
+worker thread, so every method holds the cache's lock while it touches the
+dict.
+"""
+
+import threading
+
+
+class LRUCache:
+    """Values keyed by any hashable key, least recently used dropped first.
+
+    The newest entry is always kept, even if it alone weighs more than
+    `maxsize`.
+
+    Attributes:
+        maxsize (int): Most total weight kept before evicting.
+        weigh (function): Returns the weight of a value; None weighs each
+            entry as 1, which caps the number of entries.
+        weight (int): Total weight held now.
+        hits (int): Lookups that found their key.
+        misses (int): Lookups that did not.
+        evictions (int): Entries dropped to stay within maxsize.
+    """
+    def __init__(self, maxsize, weigh=None):
+        self.maxsize = maxsize
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the value stored for `key`, or None."""
+        with self._lock:
+            entries = self._entries
+            value = entries.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            # Re-inserting moves the entry to the newest end of the dict
+            entries[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Stores `value` for `key` as the newest entry and returns it."""
+        weigh = self.weigh
+        with self._lock:
+            entries = self._entries
+            old = entries.pop(key, None)
+            if old is not None:
+                self.weight -= weigh(old) if weigh else 1
+            entries[key] = value
+            self.weight += weigh(value) if weigh else 1
+            while self.weight > self.maxsize and len(entries) > 1:
+                oldest = entries.pop(next(iter(entries)))
+                self.weight -= weigh(oldest) if weigh else 1
+                self.evictions += 1
+            return value
+
+    def clear(self):
+        """Empties the cache and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the counters and size as a dict, for tuning maxsize."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'weight': self.weight, 'maxsize': self.maxsize,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,332 @@
+"""Monte Carlo tree search player for NottyGame.
+
+The player cannot see the other hands or the deck, so the search runs over
+information sets: every iteration samples a determinization, dealing the
+cards the player cannot see at random into the other hands (at their true
+sizes) and the deck, then plays one candidate plan for the turn on it and
+finishes the game with a fast rollout policy.  Plans are chosen with UCB1,
+and the plan visited most when the time budget runs out is played.
+
+Plans not yet visited are visited before UCB1 starts choosing.  These
+first visits discard the largest group rather than solving the hand and
+score the sample straight after the plan, without a rollout, so they cost
+a fraction of an iteration and serve as a cheap prior.  The search stops
+at the budget even if some plans are still unvisited, and the plan is
+picked from those visited; a rollout that reaches the budget is scored
+where it stopped.
+
+A plan is a whole turn: the move (drawing 1 to 3 cards, snatching from
+one of the players, or skipping) and whether to discard, which discards
+the best group held before the move and again after it.  Deeper turns are
+left to short rollouts scored on hand sizes, which keeps each iteration
+to a few dozen engine calls.
+
+With `workers` above 1 the search is root-parallel: worker processes run
+their own searches and their visit counts are added to those of this
+process.  The budget runs from the call to choose_plan, so starting the
+pool and sending the work count against it: the searches stop early
+enough to return in time, and a worker that is late is left out.
+
+The visit counts and scores of each search are stored in a
+zobrist.TranspositionTable under the game's hash_key, one table per game,
+so a state the game comes back to (a card snatched and snatched back, say)
+carries on from the earlier search instead of starting from nothing.
+"""
+
+import math
+import os
+import random
+import time
+import weakref
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from card_groups import HandBits, largest_valid_group
+from hand_solver import best_discard
+from notty_cards import Deck, create_deck
+from notty_engine import DRAW, SKIP, SNATCH, NottyGame
+from zobrist import TranspositionTable
+
+# Per-move time budgets in seconds.
+INTERACTIVE_BUDGET = 0.05
+BATCH_BUDGET = 0.005
+
+# Share of the budget kept for workers to send their results back.
+RETURN_SHARE = 0.2
+
+EXPLORATION = math.sqrt(2)
+# Turns played out after the plan before the game is scored.
+ROLLOUT_TURNS = 6
+# Slots in the transposition table of each game.
+TABLE_BITS = 10
+
+_pool = None
+_pool_workers = 0
+# A table per game, so no result crosses from one game into another and a
+# seeded game plays the same whatever else the process has played.
+_tables = weakref.WeakKeyDictionary()
+
+
+def transposition_table(game):
+    """Returns the TranspositionTable of `game`'s searches, made on first use."""
+    table = _tables.get(game)
+    if table is None:
+        table = _tables[game] = TranspositionTable(TABLE_BITS)
+    return table
+
+
+def unseen_cards(game, player_id):
+    """Lists the cards `player_id` cannot see: every card not in their hand."""
+    return list((Counter(create_deck(game.num_decks)) - Counter(game.player_hands[player_id])).elements())
+
+
+def determinize(game, player_id, rng, unseen=None):
+    """Samples a full game consistent with what `player_id` can see.
+
+    The player's own hand and everything public (hand sizes, deck size,
+    whose turn it is) are kept; the unseen cards are dealt at random.
+
+    Args:
+        unseen (list): unseen_cards(game, player_id), if already known.
+
+    Returns:
+        NottyGame: A copy that plays with `rng`.
+    """
+    sample = NottyGame(num_players=game.num_players, rng=rng, max_draw_per_turn=game.max_draw_per_turn,
+                       max_cards_in_hand=game.max_cards_in_hand, num_decks=game.num_decks)
+    own_hand = game.player_hands[player_id]
+    unseen = list(unseen) if unseen is not None else unseen_cards(game, player_id)
+    rng.shuffle(unseen)
+    position = 0
+    for other, hand in game.player_hands.items():
+        if other == player_id:
+            sample.group_trackers[other].extend(own_hand)
+        else:
+            sample.group_trackers[other].extend(unseen[position:position + len(hand)])
+            position += len(hand)
+    sample.full_deck = Deck(unseen[position:], rng)
+    sample.current_player = game.current_player
+    sample.turn_action = game.turn_action
+    sample.drawn_cards = list(game.drawn_cards)
+    sample.turns = game.turns
+    sample.discards = dict(game.discards)
+    sample.winner = game.winner
+    return sample
+
+
+def turn_plans(game):
+    """Lists the plans open to the current player at the start of a turn.
+
+    Returns:
+        list: (move, discard) tuples, where move is an action tuple for
+        NottyGame.apply and discard says whether to discard groups.
+    """
+    moves = [(DRAW, count) for count in range(1, min(game.max_draw_per_turn, len(game.full_deck)) + 1)]
+    moves.extend((SNATCH, target) for target in game.snatch_targets())
+    moves.append((SKIP,))
+    return [(move, discard) for move in moves for discard in (True, False)]
+
+
+def play_plan(game, plan, discard=None):
+    """Plays a plan for the current player and ends the turn.
+
+    A move the hand has no room for is played as a skip.
+
+    Args:
+        discard (function): Picks the group to discard from a list of card
+            names, hand_solver.best_discard if None.
+    """
+    discard = discard or best_discard
+    move, discards = plan
+    if discards:
+        _discard_with(game, discard)
+    if not game.game_over:
+        if not game.apply(move):
+            game.skip()
+        if discards and not game.game_over:
+            _discard_with(game, discard)
+    if not game.game_over:
+        game.end_turn()
+
+
+def _largest_group(notty_cards_list):
+    return largest_valid_group(HandBits(notty_cards_list))
+
+
+def _discard_with(game, discard):
+    group = discard(game.player_hands[game.current_player])
+    if group is not None:
+        game.discard(group)
+
+
+def rollout_turn(game):
+    """Plays one turn of the rollout policy: discard the largest group held,
+    otherwise draw, snatch or skip at random."""
+    tracker = game.group_trackers[game.current_player]
+    largest = tracker.groups()[1]
+    if largest is not None:
+        game.discard(largest)
+        if game.game_over:
+            return
+    action = game.rng.random()
+    if action < 0.6 and game.full_deck and game.hand_space():
+        most = min(game.max_draw_per_turn, game.hand_space(), len(game.full_deck))
+        game.draw(game.rng.randint(1, most))
+    elif action < 0.9 and game.hand_space() and game.snatch_targets():
+        game.snatch(game.rng.choice(game.snatch_targets()))
+    else:
+        game.skip()
+    largest = tracker.groups()[1]
+    if largest is not None:
+        game.discard(largest)
+    if not game.game_over:
+        game.end_turn()
+
+
+def score(game, player_id):
+    """Returns the result of a game for `player_id` between 0 and 1.
+
+    A win scores 1 and a loss 0.  An unfinished game scores the share of
+    opponents holding more cards, with ties counted as half.
+    """
+    if game.winner is not None:
+        return 1.0 if game.winner == player_id else 0.0
+    own = len(game.player_hands[player_id])
+    others = [len(game.player_hands[other]) for other in game.players_after(player_id)]
+    return sum(1.0 if size > own else 0.5 if size == own else 0.0 for size in others) / len(others)
+
+
+def search(game, plans, budget=BATCH_BUDGET, iterations=None, seed=None, rollout_turns=ROLLOUT_TURNS,
+           visits=None, totals=None, deadline=None):
+    """Runs UCB1 over `plans` on determinizations of `game`.
+
+    Stops after `iterations` iterations if given, otherwise when `budget`
+    seconds have passed, even in the middle of a rollout.  An iteration or
+    a rollout turn is only started if the slowest so far would end in time.
+
+    Args:
+        visits (list): Visits of each plan from an earlier search of the
+            same state, to carry on from.
+        totals (list): Total scores of that search.
+        deadline (float): time.time() to stop at instead of `budget` from
+            now, shared by the searches of every worker.
+
+    Returns:
+        tuple: (visits, total score) lists, one entry per plan.
+    """
+    deadline = time.time() + budget if deadline is None else deadline
+    rng = random.Random(seed)
+    player_id = game.current_player
+    unseen = unseen_cards(game, player_id)
+    visits = list(visits) if visits is not None else [0] * len(plans)
+    totals = list(totals) if totals is not None else [0.0] * len(plans)
+    visited = sum(visits)
+    done = 0
+    # Longest an iteration has taken to reach its rollout, and longest rollout turn
+    lead = step = 0.0
+    while (done < iterations) if iterations is not None else (time.time() + lead < deadline):
+        began = time.time()
+        turns = rollout_turns
+        discard = None
+        if 0 in visits:
+            # First visit: scored without a rollout, as a prior
+            choice = visits.index(0)
+            turns = 0
+            discard = _largest_group
+        else:
+            log_visited = math.log(visited)
+            choice = max(range(len(plans)), key=lambda index: totals[index] / visits[index]
+                         + EXPLORATION * math.sqrt(log_visited / visits[index]))
+        sample = determinize(game, player_id, rng, unseen)
+        play_plan(sample, plans[choice], discard)
+        lead = max(lead, time.time() - began)
+        end = sample.turns + turns
+        while not sample.game_over and sample.turns < end:
+            now = time.time()
+            if iterations is None and now + step >= deadline:
+                break
+            rollout_turn(sample)
+            step = max(step, time.time() - now)
+        visits[choice] += 1
+        totals[choice] += score(sample, player_id)
+        visited += 1
+        done += 1
+    return visits, totals
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def choose_plan(game, budget=BATCH_BUDGET, workers=1, iterations=None, seed=None):
+    """Picks the plan for the current player's turn.
+
+    Args:
+        game (NottyGame): The game, at the start of the current player's turn.
+        budget (float): Seconds to take, e.g. INTERACTIVE_BUDGET, counted
+            from this call.
+        workers (int): Processes searching in parallel, os.cpu_count() if None.
+        iterations (int): Fixed iterations per process instead of a budget,
+            for reproducible searches; every worker is waited for.
+        seed (int): Seed for the search, drawn from the game's rng if None.
+
+    Returns:
+        tuple: The most visited plan, as listed by turn_plans, or the first
+        plan if the budget ran out before any was visited.
+    """
+    deadline = time.time() + budget
+    plans = turn_plans(game)
+    if len(plans) == 1:
+        return plans[0]
+    table = transposition_table(game)
+    key = game.hash_key
+    entry = table.probe(key)
+    earlier = entry[2] if entry is not None else (None, None)
+    seed = game.rng.getrandbits(64) if seed is None else seed
+    # Workers are sent a determinization, so they never see the hidden hands.
+    view = determinize(game, game.current_player, random.Random(seed))
+    workers = workers or os.cpu_count() or 1
+    futures = []
+    stop = deadline
+    if workers > 1:
+        stop = deadline - budget * RETURN_SHARE
+        pool = _get_pool(workers - 1)
+        futures = [pool.submit(search, view, plans, budget, iterations, seed + worker, deadline=stop)
+                   for worker in range(1, workers)]
+    visits, totals = search(view, plans, budget, iterations, seed, visits=earlier[0], totals=earlier[1],
+                            deadline=stop)
+    if futures:
+        done, late = wait(futures, timeout=None if iterations is not None else max(0.0, deadline - time.time()))
+        for future in late:
+            future.cancel()
+        futures = done
+    for future in futures:
+        more_visits, more_totals = future.result()
+        for index in range(len(plans)):
+            visits[index] += more_visits[index]
+            totals[index] += more_totals[index]
+    # Most visits wins; a tie goes to the better total score.
+    best = plans[max(range(len(plans)), key=lambda index: (visits[index], totals[index]))]
+    # The visits so far are the depth, so the longest search of a state is kept
+    table.store(key, sum(visits), (visits, totals), best)
+    return best
+
+
+def mcts_turn(game, budget=BATCH_BUDGET, workers=1):
+    """Policy for simulate/ai_policies: plays the turn chosen by choose_plan.
+
+    One process per move, since simulate already plays a game per core.
+    """
+    play_plan(game, choose_plan(game, budget, workers))
+
+
+def mcts_interactive_turn(game):
+    """Plays the turn chosen by choose_plan within INTERACTIVE_BUDGET on
+    every core, for a player someone is waiting on."""
+    play_plan(game, choose_plan(game, INTERACTIVE_BUDGET, workers=None))
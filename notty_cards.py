@@ -0,0 +1,132 @@
+"""Card classes and the deck shared by every version of the game.
+
+The two- and three-player modules used to carry their own copies of Card,
+CollectionOfCards and create_deck; both now import them from here, as does
+the headless engine.  Nothing here imports pygame.
+"""
+
+import random
+
+from card_groups import (CARD_NAMES, CARD_PARTS, MAX_COPIES, HandBits, is_valid_group, valid_group,
+                         largest_valid_group)
+
+# Each deck holds two copies of every card.
+COPIES_PER_DECK = 2
+MAX_DECKS = MAX_COPIES // COPIES_PER_DECK
+
+
+class Card:
+    """
+    Represents a single card in the game.
+
+    Attributes:
+        colour (str): The color of the card (e.g., 'red', 'blue').
+        number (int): The number on the card (0-9).
+    """
+    def __init__(self, colour, number):
+        assert isinstance(number, int)
+        self.colour = colour
+        self.number = number
+
+    def __str__(self):
+        return f'{self.colour}_{self.number}'
+
+
+# One shared Card per card name, handed out by the group searches
+card_objects = {card_info: Card(*CARD_PARTS[card_info]) for card_info in CARD_NAMES}
+
+
+def cards_of(group):
+    """Turns a group of card names into Card objects, keeping None as None."""
+    if group is None:
+        return None
+    return [card_objects[card_info] for card_info in group]
+
+
+class CollectionOfCards:
+    """Represents a collection of cards and provides function to validate
+    and finding groups of cards.
+
+    Attributes:
+        collection (list): A list of Card objects.
+    """
+    def __init__(self, notty_cards_list):
+        self.hand = HandBits(notty_cards_list)
+
+    @property
+    def collection(self):
+        """list: The cards as Card objects, built only when asked for."""
+        return [card_objects[card_info] for card_info in self.hand.cards]
+
+    def is_valid_group(self):
+        """Checks if the collection contains a valid group of cards.
+        - A valid group is:
+            - At least 3 cards with consecutive numbers of the same color, OR
+            - At least 3 cards of the same number but different colors.
+
+        Returns:
+            bool: True if the group is valid, False otherwise.
+        """
+        return is_valid_group(self.hand)
+
+    def find_valid_group(self):
+        return cards_of(valid_group(self.hand))
+
+    def find_largest_valid_group(self):
+        return cards_of(largest_valid_group(self.hand))
+
+
+def create_deck(num_decks=1):
+    """Builds an unshuffled deck with two copies of every card per deck.
+
+    Args:
+        num_decks (int): Decks shuffled together, 1 to MAX_DECKS.
+
+    Returns:
+        list: Card names such as 'red_5'.
+    """
+    if not 1 <= num_decks <= MAX_DECKS:
+        raise ValueError(f"num_decks must be between 1 and {MAX_DECKS}, got {num_decks}")
+    return list(CARD_NAMES) * (COPIES_PER_DECK * num_decks)
+
+
+class Deck:
+    """The cards left to draw, kept as an unordered pile.
+
+    A shuffled deck whose top card is drawn hands out a uniformly random
+    card of those left, and putting cards back and reshuffling keeps that
+    true.  Deck draws a uniformly random card directly instead, by swapping
+    it with the last card and popping, so drawing and returning cards are
+    both O(1) and no reshuffle is ever needed.  The cards drawn follow
+    exactly the same distribution as drawing from a fully reshuffled deck.
+
+    Attributes:
+        cards (list): The cards in the deck, in no meaningful order.
+        rng (random.Random): Source of the random draws.
+    """
+    def __init__(self, cards=(), rng=None):
+        self.cards = list(cards)
+        self.rng = rng if rng is not None else random.Random()
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card_info):
+        return card_info in self.cards
+
+    def pop(self):
+        """Draws the top card, which is a uniformly random card of the deck."""
+        cards = self.cards
+        index = self.rng.randrange(len(cards))
+        cards[index], cards[-1] = cards[-1], cards[index]
+        return cards.pop()
+
+    def append(self, card_info):
+        """Puts a card back; it is as likely to come up next as any other."""
+        self.cards.append(card_info)
+
+    def extend(self, cards):
+        self.cards.extend(cards)
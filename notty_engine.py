@@ -0,0 +1,382 @@
+"""Headless Notty rules engine.
+
+The game rules without any drawing, sound or waiting, for batch jobs that
+play many games.  NottyGame keeps the same fields as GameState in
+Main_code_2_player (player_hands, current_player, full_deck, drawn_cards,
+valid_groups, largest_groups, ...) and changes them only through explicit
+actions.  Nothing here imports pygame.
+
+A turn is one of drawing up to `max_draw_per_turn` cards, snatching a card
+from another player or skipping.  Drawn cards can be returned to the deck
+before the turn ends, and any valid group in the hand can be discarded on
+the player's own turn.  A player whose hand becomes empty wins.
+
+One engine serves every table size: 2 to MAX_PLAYERS players, playing with
+one or more decks shuffled together.  Turn order, snatch targets and group
+searches cost the same per player whatever the size of the table.
+
+The pygame tables in Main_code_2_player and Main_code_3_player do not run
+on NottyGame: their turns are scripted around animations, prompts and the
+AI worker, and stay in those modules.  Their GameState classes keep the
+same fields, though, so the rules both sides apply to hands, has_room and
+take_card, are written once here and used by the tables and the engine.
+"""
+
+import os
+import random
+
+from card_groups import GroupTracker, HandBits, is_valid_group
+from card_knowledge import CardKnowledge
+from notty_cards import COPIES_PER_DECK, Deck, create_deck
+from zobrist import DECK, ZobristHash
+
+DRAW = 'draw'
+SNATCH = 'snatch'
+DISCARD = 'discard'
+RETURN = 'return'
+SKIP = 'skip'
+END_TURN = 'end_turn'
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 8
+
+
+def game_seed(game_id, base_seed=0):
+    """Derives the seed of one game from its ID.
+
+    The seed is a hash of the base seed and the ID, so workers can each
+    derive the streams of their own games without coordinating and no two
+    games share a stream.
+
+    Returns:
+        int: A 64-bit seed for random.Random.
+    """
+    return random.Random(f'{base_seed}:{game_id}').getrandbits(64)
+
+
+def new_game_seed():
+    """Returns a fresh 64-bit seed, or the NOTTY_SEED environment variable to replay a game."""
+    if os.environ.get('NOTTY_SEED'):
+        return int(os.environ['NOTTY_SEED'])
+    return random.SystemRandom().getrandbits(64)
+
+
+def has_room(state, player_id, count=1):
+    """Whether `player_id`'s hand can take `count` more cards.
+
+    Args:
+        state: NottyGame, GameState or GameState2.
+    """
+    return len(state.player_hands[player_id]) + count <= state.max_cards_in_hand
+
+
+def take_card(state, player_id, target_player, index):
+    """Moves the card at `index` of `target_player`'s hand into
+    `player_id`'s, and records that `player_id` now holds it.
+
+    Args:
+        state: NottyGame, GameState or GameState2.
+
+    Returns:
+        str: The card taken.
+    """
+    card_info = state.group_trackers[target_player].pop(index)
+    state.group_trackers[player_id].add(card_info)
+    state.knowledge.snatch(player_id, target_player, card_info)
+    return card_info
+
+
+class NottyGame:
+    """The state of one game and the actions that change it.
+
+    Attributes:
+        num_players (int): Players in the game, numbered from 1.
+        num_decks (int): Decks shuffled together into `full_deck`.
+        player_hands (dict): Card names held by each player.
+        group_trackers (dict): A GroupTracker per player over their hand.
+        current_player (int): The player whose turn it is.
+        full_deck (Deck): Cards left to draw, each draw a random one of them.
+        drawn_cards (list): Cards the current player drew this turn.
+        turn_action (str): DRAW, SNATCH or SKIP once the turn's move is made.
+        valid_groups (dict): First valid group of each hand, as card names.
+        largest_groups (dict): Largest valid group of each hand.
+        turns (int): Turns finished so far.
+        discards (dict): Groups each player has discarded.
+        winner (int): The player who emptied their hand, or None.
+        seed (int): Seed of `rng`; the same seed and moves replay the game.
+        rng (random.Random): Source of every random choice in the game.
+        recorder (GameRecorder): Logs every event of the game, if given.
+        knowledge (CardKnowledge): The cards each player knows to be in other hands.
+        zobrist (ZobristHash): Hash of the hands, the deck and the player to move,
+            or None until hash_key is first read; kept up to date by every
+            action from then on.
+    """
+    def __init__(self, num_players=2, rng=None, max_draw_per_turn=3, max_cards_in_hand=20, seed=None,
+                 recorder=None, num_decks=1):
+        if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"num_players must be between {MIN_PLAYERS} and {MAX_PLAYERS}, got {num_players}")
+        self.num_players = num_players
+        self.num_decks = num_decks
+        self.recorder = recorder
+        self.seed = seed
+        if rng is None:
+            if seed is None:
+                self.seed = new_game_seed()
+            rng = random.Random(self.seed)
+        self.rng = rng
+        self.max_draw_per_turn = max_draw_per_turn
+        self.max_cards_in_hand = max_cards_in_hand
+        self.player_hands = {player_id: [] for player_id in self.players()}
+        self.group_trackers = {player_id: GroupTracker(hand) for player_id, hand in self.player_hands.items()}
+        self.current_player = 1
+        self.full_deck = self.create_deck()
+        self.drawn_cards = []
+        self.turn_action = None
+        self.turns = 0
+        self.discards = {player_id: 0 for player_id in self.players()}
+        self.winner = None
+        self.knowledge = CardKnowledge(num_players, num_decks)
+        self.rehash()
+
+    @property
+    def copies(self):
+        """int: Copies of each card in the game."""
+        return COPIES_PER_DECK * self.num_decks
+
+    def create_deck(self):
+        return Deck(create_deck(self.num_decks), self.rng)
+
+    def rehash(self):
+        """Drops the hash after changing fields directly; hash_key hashes
+        the state from scratch when next read."""
+        self.zobrist = None
+
+    @property
+    def hash_key(self):
+        """int: 64-bit Zobrist hash of the state, for transposition tables.
+
+        Games that are never hashed, such as the samples of a search, pay
+        nothing for it: the hash is only built on the first read.
+        """
+        if self.zobrist is None:
+            self.zobrist = ZobristHash.of(self, self.copies)
+        return self.zobrist.value
+
+    def players(self):
+        return range(1, self.num_players + 1)
+
+    def next_player(self, player_id=None):
+        player_id = self.current_player if player_id is None else player_id
+        return player_id % self.num_players + 1
+
+    @property
+    def valid_groups(self):
+        return {player_id: tracker.groups()[0] for player_id, tracker in self.group_trackers.items()}
+
+    @property
+    def largest_groups(self):
+        return {player_id: tracker.groups()[1] for player_id, tracker in self.group_trackers.items()}
+
+    @property
+    def game_over(self):
+        return self.winner is not None
+
+    def deal(self, cards_each=5):
+        """Deals cards one at a time round the table, player 1 first."""
+        for _ in range(cards_each):
+            for player_id in self.players():
+                if self.full_deck:
+                    card_info = self.full_deck.pop()
+                    self.group_trackers[player_id].add(card_info)
+                    if self.zobrist is not None:
+                        self.zobrist.move(card_info, DECK, player_id)
+                    if self.recorder is not None:
+                        self.recorder.deal(player_id, card_info)
+
+    def snatch_targets(self, player_id=None):
+        """Lists the other players who still hold cards."""
+        player_id = self.current_player if player_id is None else player_id
+        return [target for target in self.players() if target != player_id and self.player_hands[target]]
+
+    def players_after(self, player_id=None):
+        """The other players in turn order, starting with the next one."""
+        player_id = self.current_player if player_id is None else player_id
+        return [(player_id + offset - 1) % self.num_players + 1 for offset in range(1, self.num_players)]
+
+    def hand_space(self, player_id=None):
+        player_id = self.current_player if player_id is None else player_id
+        return self.max_cards_in_hand - len(self.player_hands[player_id])
+
+    # Actions.  Each returns a false value and changes nothing when the
+    # move is not allowed, like snatch_card in the game modules.
+
+    def draw(self, count=1):
+        """Draws `count` cards from the deck into the current player's hand.
+
+        Returns:
+            list: The cards drawn, or an empty list if the draw is not allowed.
+        """
+        if (self.game_over or self.turn_action not in (None, DRAW) or count < 1
+                or len(self.drawn_cards) + count > self.max_draw_per_turn
+                or count > self.hand_space() or count > len(self.full_deck)):
+            return []
+        drawn = [self.full_deck.pop() for _ in range(count)]
+        self.group_trackers[self.current_player].extend(drawn)
+        if self.zobrist is not None:
+            for card_info in drawn:
+                self.zobrist.move(card_info, DECK, self.current_player)
+        self.drawn_cards.extend(drawn)
+        self.turn_action = DRAW
+        if self.recorder is not None:
+            self.recorder.draw(self.current_player, drawn)
+        return drawn
+
+    def return_card(self, card_info=None):
+        """Puts a card drawn this turn back into the deck.
+
+        Args:
+            card_info (str): The drawn card to return, the last one if None.
+        """
+        if self.game_over or not self.drawn_cards:
+            return None
+        if card_info is None:
+            card_info = self.drawn_cards[-1]
+        elif card_info not in self.drawn_cards:
+            return None
+        self.drawn_cards.remove(card_info)
+        self.group_trackers[self.current_player].remove(card_info)
+        self.full_deck.append(card_info)
+        if self.zobrist is not None:
+            self.zobrist.move(card_info, self.current_player, DECK)
+        if self.recorder is not None:
+            self.recorder.return_card(self.current_player, card_info)
+        return card_info
+
+    def snatch(self, target_player):
+        """Takes a random card from `target_player` into the current hand.
+
+        Taking the target's last card empties their hand, so the target
+        wins, as check_winning_state does in the game modules.
+
+        Returns:
+            str: The card taken, or None if the snatch is not allowed.
+        """
+        if (self.game_over or self.turn_action is not None or target_player == self.current_player
+                or target_player not in self.player_hands or not self.player_hands[target_player]
+                or not self.hand_space()):
+            return None
+        target = self.group_trackers[target_player]
+        index = self.rng.randrange(len(target.cards))
+        card_info = take_card(self, self.current_player, target_player, index)
+        if self.zobrist is not None:
+            self.zobrist.move(card_info, target_player, self.current_player)
+        self.turn_action = SNATCH
+        if self.recorder is not None:
+            self.recorder.snatch(self.current_player, target_player, index)
+        if not target.cards:
+            self.winner = target_player
+            if self.recorder is not None:
+                self.recorder.win(target_player)
+        return card_info
+
+    def discard(self, group_cards):
+        """Discards a valid group from the current hand into the deck.
+
+        One copy of each card leaves the hand for the deck, and emptying
+        the hand wins the game.
+
+        Returns:
+            bool: True if the group was discarded.
+        """
+        tracker = self.group_trackers[self.current_player]
+        if self.game_over or not is_valid_group(HandBits(list(group_cards))):
+            return False
+        if any(tracker.hand.count(card_info) < 1 for card_info in group_cards):
+            return False
+        for card_info in group_cards:
+            tracker.remove(card_info)
+            if card_info in self.drawn_cards:
+                self.drawn_cards.remove(card_info)
+        self.full_deck.extend(group_cards)
+        if self.zobrist is not None:
+            for card_info in group_cards:
+                self.zobrist.move(card_info, self.current_player, DECK)
+        self.discards[self.current_player] += 1
+        self.knowledge.discard(self.current_player, group_cards)
+        if self.recorder is not None:
+            self.recorder.discard(self.current_player, group_cards)
+        if not tracker.cards:
+            self.winner = self.current_player
+            if self.recorder is not None:
+                self.recorder.win(self.current_player)
+        return True
+
+    def skip(self):
+        """Uses the turn's move on nothing."""
+        if self.game_over or self.turn_action is not None:
+            return False
+        self.turn_action = SKIP
+        if self.recorder is not None:
+            self.recorder.skip(self.current_player)
+        return True
+
+    def end_turn(self):
+        """Passes the turn to the next player."""
+        if self.game_over:
+            return False
+        if self.recorder is not None:
+            self.recorder.end_turn(self.current_player)
+        self.current_player = self.next_player()
+        if self.zobrist is not None:
+            self.zobrist.set_player(self.current_player)
+        self.drawn_cards = []
+        self.turn_action = None
+        self.turns += 1
+        return True
+
+    def apply(self, action):
+        """Applies an action tuple such as (DRAW, 2), (SNATCH, 1) or (END_TURN,).
+
+        Returns:
+            The result of the matching action method.
+        """
+        kind = action[0]
+        if kind == DRAW:
+            return self.draw(*action[1:])
+        if kind == SNATCH:
+            return self.snatch(action[1])
+        if kind == DISCARD:
+            return self.discard(action[1])
+        if kind == RETURN:
+            return self.return_card(*action[1:])
+        if kind == SKIP:
+            return self.skip()
+        if kind == END_TURN:
+            return self.end_turn()
+        raise ValueError(f"Unknown action: {kind}")
+
+    def legal_actions(self):
+        """Lists the actions the current player can take now.
+
+        Discards are offered for the first and the largest valid group.
+        """
+        if self.game_over:
+            return []
+        actions = []
+        if self.turn_action in (None, DRAW):
+            most = min(self.max_draw_per_turn - len(self.drawn_cards), self.hand_space(), len(self.full_deck))
+            actions.extend((DRAW, count) for count in range(1, most + 1))
+        if self.turn_action is None:
+            if self.hand_space():
+                actions.extend((SNATCH, player_id) for player_id in self.snatch_targets())
+            actions.append((SKIP,))
+        valid, largest = self.group_trackers[self.current_player].groups()
+        if valid:
+            actions.append((DISCARD, tuple(valid)))
+        if largest and largest != valid:
+            actions.append((DISCARD, tuple(largest)))
+        if self.drawn_cards:
+            actions.append((RETURN,))
+        if self.turn_action is not None:
+            actions.append((END_TURN,))
+        return actions
@@ -0,0 +1,216 @@
+"""Plays many headless games between AI policies and reports how they do.
+
+Games are split into chunks and played across a process pool, each worker
+running whole games on its own with notty_engine, so workers share nothing
+but the results they send back.  Seats are rotated from game to game so no
+policy keeps the advantage of moving first.
+
+Some pairings rarely empty a hand (a policy that keeps drawing hovers near
+a full hand), so games still going at `max_turns` are stopped, counted as
+unfinished and left out of the statistics.
+
+With `record` every game is logged by an event_log.GameRecorder and the
+logs are written to one file, in game order, to be replayed later.
+
+Run from the command line, for example:
+
+    python simulate.py random strategic --games 10000 --workers 4
+    python simulate.py mcts random --games 100 --record games.bin
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ai_policies import POLICIES
+from event_log import GameRecorder, write_games
+from notty_engine import NottyGame, game_seed
+
+# z for a two-sided 95% confidence interval
+Z_95 = 1.959964
+
+
+def play_game(policy_names, game_number, seed, max_turns=1000, timed=False, recorder=None):
+    """Plays one game, rotating the seats by game number.
+
+    Game n seats policy (i + n) % len(policy_names) as player i + 1, so
+    over a run no policy keeps the advantage of moving first.  The results
+    are given back per policy, in the order of `policy_names`.
+
+    Args:
+        timed (bool): Time every turn each policy plays.
+        recorder (GameRecorder): Logs the game's events, if given.
+
+    Returns:
+        tuple: (winning policy index or None, turns played, discards per
+        policy, cards left per policy, turn times in seconds per policy,
+        or None if not `timed`).
+    """
+    count = len(policy_names)
+    seating = [(seat + game_number) % count for seat in range(count)]
+    game = NottyGame(num_players=count, seed=seed, recorder=recorder)
+    game.deal()
+    policies = [POLICIES[policy_names[index]] for index in seating]
+    times = [[] for _ in seating] if timed else None
+    while not game.game_over and game.turns < max_turns:
+        seat = game.current_player - 1
+        if timed:
+            start = time.perf_counter()
+            policies[seat](game)
+            times[seating[seat]].append(time.perf_counter() - start)
+        else:
+            policies[seat](game)
+    discards = [0] * count
+    cards = [0] * count
+    for seat, index in enumerate(seating):
+        discards[index] = game.discards[seat + 1]
+        cards[index] = len(game.player_hands[seat + 1])
+    winner = seating[game.winner - 1] if game.winner is not None else None
+    return winner, game.turns, discards, cards, times
+
+
+def _play_chunk(policy_names, seeds, max_turns, record=False):
+    """Plays the games of one chunk.
+
+    Returns:
+        tuple: (results, logs).  results lists (winning policy index or
+        None, turns, discards per policy) for each game, and logs the
+        bytes of each game's log if `record`, otherwise nothing.
+    """
+    results = []
+    logs = []
+    for game_number, seed in seeds:
+        recorder = GameRecorder(len(policy_names), seed) if record else None
+        winner, turns, discards, _, _ = play_game(policy_names, game_number, seed, max_turns, recorder=recorder)
+        results.append((winner, turns, discards))
+        if recorder is not None:
+            logs.append(recorder.to_bytes())
+    return results, logs
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Returns the Wilson score interval (low, high) for a proportion."""
+    if not trials:
+        return 0.0, 0.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return centre - spread, centre + spread
+
+
+def mean_interval(values, z=Z_95):
+    """Returns (mean, half width of the normal confidence interval)."""
+    if not values:
+        return 0.0, 0.0
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, 0.0
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return mean, z * math.sqrt(variance / len(values))
+
+
+def simulate(policy_names, games=1000, workers=None, seed=0, max_turns=1000, chunk_size=None, record=None):
+    """Plays `games` games between the named policies over a process pool.
+
+    Args:
+        policy_names (list): Names from ai_policies.POLICIES, one per seat.
+        games (int): Number of games to play.
+        workers (int): Worker processes, os.cpu_count() if None.  With 1
+            the games run in this process.
+        seed (int): Base seed; game n plays with game_seed(n, seed).
+        max_turns (int): Turns after which a game is stopped as unfinished.
+        chunk_size (int): Games per task sent to a worker.
+        record (str): File to write every game's log to, with
+            event_log.write_games.
+
+    Returns:
+        dict: The summary described in `report`.
+    """
+    unknown = [name for name in policy_names if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(games / (workers * 8)))
+    seeds = [(game_number, game_seed(game_number, seed)) for game_number in range(games)]
+    chunks = [seeds[start:start + chunk_size] for start in range(0, games, chunk_size)]
+
+    results = []
+    logs = []
+    if workers == 1:
+        for chunk in chunks:
+            chunk_games, chunk_logs = _play_chunk(policy_names, chunk, max_turns, record is not None)
+            results.extend(chunk_games)
+            logs.extend(chunk_logs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_chunk, policy_names, chunk, max_turns, record is not None)
+                       for chunk in chunks]
+            for future in futures:
+                chunk_games, chunk_logs = future.result()
+                results.extend(chunk_games)
+                logs.extend(chunk_logs)
+    if record is not None:
+        write_games(record, logs)
+    return summarise(policy_names, results)
+
+
+def summarise(policy_names, results):
+    """Turns per-game results into win rates, game lengths and discard rates.
+
+    Games still unfinished at max_turns are counted but left out of every
+    statistic, so win rates and lengths describe finished games only.
+    """
+    finished = [result for result in results if result[0] is not None]
+    games = len(finished)
+    lengths = [turns for _, turns, _ in finished]
+    summary = {
+        'games': len(results),
+        'finished': games,
+        'unfinished': len(results) - games,
+        'turns': mean_interval(lengths),
+        'policies': {},
+    }
+    for index, name in enumerate(policy_names):
+        wins = sum(1 for winner, _, _ in finished if winner == index)
+        discards = [by_policy[index] for _, _, by_policy in finished]
+        summary['policies'][f'{index + 1}:{name}'] = {
+            'wins': wins,
+            'win_rate': wins / games if games else 0.0,
+            'win_interval': wilson_interval(wins, games),
+            'discards_per_game': mean_interval(discards),
+            'discards_per_turn': sum(discards) / sum(lengths) if sum(lengths) else 0.0,
+        }
+    return summary
+
+
+def report(summary):
+    """Prints a summary from `simulate` as a table."""
+    mean, half_width = summary['turns']
+    print(f"Games: {summary['games']}  unfinished at max turns: {summary['unfinished']}  "
+          f"(statistics over the {summary['finished']} finished)")
+    print(f"Turns per finished game: {mean:.1f} ± {half_width:.1f}")
+    print(f"{'policy':<16}{'wins':>8}{'win rate':>10}{'95% CI':>18}{'discards/game':>18}{'discards/turn':>15}")
+    for name, stats in summary['policies'].items():
+        low, high = stats['win_interval']
+        discards, discard_width = stats['discards_per_game']
+        print(f"{name:<16}{stats['wins']:>8}{stats['win_rate']:>10.3f}{f'{low:.3f}-{high:.3f}':>18}"
+              f"{f'{discards:.2f} ± {discard_width:.2f}':>18}{stats['discards_per_turn']:>15.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Notty AI policies against each other.")
+    parser.add_argument('policies', nargs='+', choices=sorted(POLICIES), help="One policy per seat")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=1000)
+    parser.add_argument('--record', metavar='PATH', help="Write every game's event log to this file")
+    args = parser.parse_args()
+    report(simulate(args.policies, args.games, args.workers, args.seed, args.max_turns, record=args.record))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,13 @@
 import pygame
 import os
 import math
-import Main_code_2_player
-import Main_code_3_player
+
+import assets
 
 # Screen dimensions
 SCREEN_HEIGHT = 768
 SCREEN_WIDTH = 1024
 
-# Initialize Pygame
-pygame.init()
-
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -21,19 +18,8 @@ LIGHT_GREEN = (0, 255, 0)
 RED = (200, 0, 0)  # Red for the "Exit" button
 LIGHT_RED = (255, 100, 100) 
 
-# Screen setup
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Notty Game Start Screen')
-
-# Fonts
-font = pygame.font.Font(None, 74)
-small_font = pygame.font.Font(None, 36)
-
-# Load UNO card images
-notty_card_images = []
-for i in range(1, 5): 
-    image = pygame.image.load(f"game_images/notty_card_{i}.png").convert_alpha()
-    notty_card_images.append(pygame.transform.scale(image, (80, 120)))
+# Opened by start_screen, so importing this module opens no window
+screen = None
 
 # Initialize snake animation cards
 def initialize_snake_cards():
@@ -41,6 +27,7 @@ def initialize_snake_cards():
     Initialize snake cards with positions and images.
     """
     snake_cards = []
+    notty_card_images = assets.notty_cards((80, 120))
     card_spacing = 100  # Distance between each card
     num_cards = 10  # Total number of cards in the animation
     for i in range(num_cards):
@@ -88,7 +75,7 @@ def draw_text_button(text, x, y, width, height, color, hover_color, action=None)
         pygame.draw.rect(screen, color, button_rect)
 
     # Render and draw button text
-    button_text = small_font.render(text, True, WHITE)
+    button_text = assets.text(text, 36, WHITE)
     text_rect = button_text.get_rect(center=button_rect.center)
     screen.blit(button_text, text_rect)
 
@@ -97,6 +84,8 @@ def start_screen():
     """
     Display the main screen with 1 Player, 2 Player, and Exit buttons.
     """
+    global screen
+    screen = assets.screen('Notty Game Start Screen')
     running = True
     snake_cards = initialize_snake_cards()  # Initialize cards for animation
 
@@ -104,7 +93,7 @@ def start_screen():
         screen.fill(BACKGROUND_COLOR)  # Set background color
 
         # Draw the title text
-        title_text = font.render("Welcome to Notty Card Game!", True, GOLD)
+        title_text = assets.text("Welcome to Notty Card Game!", 74, GOLD)
         screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 150))
 
         # Draw the 1 Player, 2 Player, and Exit buttons
@@ -132,11 +121,14 @@ def run_game(mode):
     """
     Run the game based on the selected mode.
     """
+    # The game modules are only imported once a mode is picked
     if mode == "1 Player":
         print("Running 1 Player mode...")
+        import Main_code_2_player
         Main_code_2_player.main_game2_loop()  # Call the 1 Player game loop
     elif mode == "2 Player":
         print("Running 2 Player mode...")
+        import Main_code_3_player
         Main_code_3_player.main_game3_loop()
     elif mode == "Exit":
         print("Exiting game.")
@@ -0,0 +1,67 @@
+"""Cache of rendered text, so labels drawn every frame are rendered once.
+
+The screens draw the same strings every frame: button labels, player
+names, the card counter, titles.  Rendering a string with a font is far
+slower than blitting the result, so TextCache keeps the surfaces it has
+rendered, keyed by (text, size, colour, antialias), and hands the same one
+back while it is in use.  Fonts come from a font function, normally
+assets.font, so each size is opened once as well.
+
+It is an lru.LRUCache capped at `max_size` entries, so text that
+changes, such as the card counter, only pushes out strings no longer drawn.
+
+wrap_text splits a message into lines that fit a width, for the message
+boxes of the game tables.
+"""
+
+from lru import LRUCache
+
+# Enough for the labels of every screen many times over.
+MAX_SIZE = 256
+
+
+class TextCache(LRUCache):
+    """Rendered text surfaces, keyed by (text, size, colour, antialias).
+
+    Attributes:
+        font (function): Returns the font for a size.
+    """
+    def __init__(self, font, max_size=MAX_SIZE):
+        super().__init__(max_size)
+        self.font = font
+
+    def render(self, text, size, color, antialias=True):
+        """Returns `text` rendered in the font of `size`.
+
+        The surface is shared: copy it before changing it.
+        """
+        key = (text, size, tuple(color), antialias)
+        surface = self.get(key)
+        if surface is None:
+            surface = self.put(key, self.font(size).render(text, antialias, color))
+        return surface
+
+
+def wrap_text(font, text, max_width):
+    """Splits text into lines no wider than `max_width` in `font`.
+
+    Widths are measured with font.size, which renders nothing.  A single
+    word wider than `max_width` gets a line to itself.
+
+    Returns:
+        list: The lines, in order.
+    """
+    words = text.split()
+    if not words:
+        return []
+    lines = []
+    current_line = words[0]
+    for word in words[1:]:
+        test_line = current_line + " " + word
+        if font.size(test_line)[0] <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    lines.append(current_line)
+    return lines
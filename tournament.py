@@ -0,0 +1,225 @@
+"""Round-robin tournaments between AI policies, with Elo ratings and gating.
+
+Every combination of the chosen policies meets at each table size (2 and 3
+players by default) over the same seeds, with seats rotated from game to
+game.  Games are played by simulate.play_game across a process pool, and
+every turn a policy plays is timed.
+
+Each game is scored pairwise: a winner beats everyone else, and in a game
+still unfinished at max_turns a player with fewer cards beats one with
+more (equal hands draw).  Elo ratings are updated from those pairs in game
+order, so the same seeds always give the same ratings.
+
+A run can be saved as a baseline and later runs checked against it: a
+policy fails the gate when its rating drops by more than `elo_tolerance`
+or its 90th percentile turn time grows by more than `latency_tolerance`
+times.  For example:
+
+    python tournament.py random strategic computer --games 200 --save-baseline baseline.json
+    python tournament.py random strategic computer --games 200 --baseline baseline.json
+
+With `record` every game is logged by an event_log.GameRecorder and the
+logs are written to one file, pairing by pairing, to be replayed later.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from ai_policies import POLICIES
+from event_log import GameRecorder, write_games
+from notty_engine import game_seed
+from simulate import play_game
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 16.0
+PERCENTILES = (50, 90, 99)
+# Policies played when none are named.  mcts_interactive searches on every
+# core itself, so it would start a process pool inside each worker.
+DEFAULT_POLICIES = tuple(sorted(name for name in POLICIES if name != 'mcts_interactive'))
+
+
+def _play_match(policy_names, games, seed, max_turns, record=False):
+    """Plays one pairing over `games` seeds, rotating seats.
+
+    Returns:
+        list: (cards left, winning policy index, turn times, game log),
+        each per policy in the order of `policy_names`, for each game.  The
+        game log is the log's bytes if `record`, otherwise None.
+    """
+    results = []
+    for game_number in range(games):
+        this_seed = game_seed(game_number, seed)
+        recorder = GameRecorder(len(policy_names), this_seed) if record else None
+        winner, _, _, cards, times = play_game(policy_names, game_number, this_seed, max_turns, timed=True,
+                                               recorder=recorder)
+        results.append((cards, winner, times, recorder.to_bytes() if recorder is not None else None))
+    return results
+
+
+def pairwise_scores(policy_names, cards, winner):
+    """Splits one game into (policy, opponent, score) results for Elo.
+
+    Args:
+        policy_names (list): The policies of the game; `cards` and
+            `winner` index into it.
+    """
+    scores = []
+    for first, second in combinations(range(len(policy_names)), 2):
+        if winner is not None:
+            score = 1.0 if winner == first else 0.0 if winner == second else None
+            if score is None:
+                continue
+        else:
+            score = 1.0 if cards[first] < cards[second] else 0.0 if cards[first] > cards[second] else 0.5
+        scores.append((policy_names[first], policy_names[second], score))
+    return scores
+
+
+def update_elo(ratings, first, second, score, k_factor=K_FACTOR):
+    """Updates two ratings in place after `first` scored `score` against `second`."""
+    expected = 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / 400))
+    ratings[first] += k_factor * (score - expected)
+    ratings[second] -= k_factor * (score - expected)
+
+
+def percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_tournament(policy_names, games=100, formats=(2, 3), workers=None, seed=0, max_turns=1000, record=None):
+    """Plays every combination of the policies at each table size.
+
+    Args:
+        policy_names (list): Names from ai_policies.POLICIES.
+        games (int): Games per pairing.
+        formats (tuple): Table sizes to play.
+        workers (int): Worker processes, os.cpu_count() if None.  With 1
+            the games run in this process.
+        seed (int): Base seed; game n of every pairing uses game_seed(n, seed).
+        max_turns (int): Turns after which a game is scored on cards left.
+        record (str): File to write every game's log to, with
+            event_log.write_games.
+
+    Returns:
+        dict: 'ratings' (policy -> Elo), 'latency' (policy -> milliseconds
+        at each of PERCENTILES), 'wins', 'games' and 'unfinished'.
+    """
+    unknown = [name for name in policy_names if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+    matches = [pairing for size in formats if size <= len(policy_names)
+               for pairing in combinations(policy_names, size)]
+    workers = workers or os.cpu_count() or 1
+    recording = record is not None
+    if workers == 1:
+        match_results = [_play_match(pairing, games, seed, max_turns, recording) for pairing in matches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_match, pairing, games, seed, max_turns, recording) for pairing in matches]
+            match_results = [future.result() for future in futures]
+    if recording:
+        write_games(record, [log for results in match_results for _, _, _, log in results])
+
+    ratings = {name: INITIAL_RATING for name in policy_names}
+    wins = dict.fromkeys(policy_names, 0)
+    times = {name: [] for name in policy_names}
+    played = unfinished = 0
+    for pairing, results in zip(matches, match_results):
+        for cards, winner, turn_times, _ in results:
+            played += 1
+            if winner is None:
+                unfinished += 1
+            else:
+                wins[pairing[winner]] += 1
+            for name, seat_times in zip(pairing, turn_times):
+                times[name].extend(seat_times)
+            for first, second, score in pairwise_scores(pairing, cards, winner):
+                update_elo(ratings, first, second, score)
+
+    latency = {}
+    for name, values in times.items():
+        values.sort()
+        latency[name] = {f'p{percent}': percentile(values, percent) * 1000 for percent in PERCENTILES}
+    return {'ratings': ratings, 'latency': latency, 'wins': wins, 'games': played, 'unfinished': unfinished}
+
+
+def check_against_baseline(result, baseline, elo_tolerance=50.0, latency_tolerance=1.5):
+    """Flags the policies that got weaker or slower than in `baseline`.
+
+    Policies missing from the baseline are not checked.
+
+    Returns:
+        list: One message per failure; empty when the gate passes.
+    """
+    failures = []
+    for name, rating in result['ratings'].items():
+        if name not in baseline['ratings']:
+            continue
+        if rating < baseline['ratings'][name] - elo_tolerance:
+            failures.append(f"{name}: Elo {rating:.0f} is below baseline {baseline['ratings'][name]:.0f}")
+        now = result['latency'][name]['p90']
+        before = baseline['latency'][name]['p90']
+        if before and now > before * latency_tolerance:
+            failures.append(f"{name}: p90 turn time {now:.3f} ms is above {latency_tolerance}x "
+                            f"baseline {before:.3f} ms")
+    return failures
+
+
+def report(result):
+    """Prints a tournament result as a table, strongest first."""
+    print(f"Games: {result['games']}  unfinished (scored on cards left): {result['unfinished']}")
+    header = ''.join(f"{f'p{percent} ms':>10}" for percent in PERCENTILES)
+    print(f"{'policy':<14}{'Elo':>8}{'wins':>8}{header}")
+    for name, rating in sorted(result['ratings'].items(), key=lambda item: -item[1]):
+        latency = ''.join(f"{result['latency'][name][f'p{percent}']:>10.3f}" for percent in PERCENTILES)
+        print(f"{name:<14}{rating:>8.0f}{result['wins'][name]:>8}{latency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between Notty AI policies.")
+    # No choices here: argparse rejects an empty list against them
+    parser.add_argument('policies', nargs='*', metavar='policy',
+                        help=f"Policies to play, of {', '.join(sorted(POLICIES))}; all but mcts_interactive if none")
+    parser.add_argument('--games', type=int, default=100, help="Games per pairing")
+    parser.add_argument('--formats', type=int, nargs='+', default=[2, 3], help="Table sizes")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=1000)
+    parser.add_argument('--baseline', help="Fail if weaker or slower than this saved result")
+    parser.add_argument('--save-baseline', help="Save this result as a baseline")
+    parser.add_argument('--elo-tolerance', type=float, default=50.0)
+    parser.add_argument('--latency-tolerance', type=float, default=1.5)
+    parser.add_argument('--record', metavar='PATH', help="Write every game's event log to this file")
+    args = parser.parse_args()
+    unknown = [name for name in args.policies if name not in POLICIES]
+    if unknown:
+        parser.error(f"unknown policies: {', '.join(unknown)}")
+
+    result = run_tournament(args.policies or list(DEFAULT_POLICIES), args.games, tuple(args.formats), args.workers,
+                            args.seed, args.max_turns, args.record)
+    report(result)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(result, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            failures = check_against_baseline(result, json.load(file), args.elo_tolerance,
+                                              args.latency_tolerance)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("Gate passed")
+
+
+if __name__ == '__main__':
+    main()
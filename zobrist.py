@@ -0,0 +1,179 @@
+"""Zobrist hashing of Notty game states, and a transposition table.
+
+A state is hashed as the XOR of one random 64-bit key per card copy held by
+each owner (the deck or a player) and one key for the player to move.
+Hands and the deck are multisets, so the k-th copy of a card held by an
+owner has its own key; adding or removing a copy XORs a single key in or
+out.  Moving a card therefore costs two XORs, and states reached along
+different paths (a card snatched and snatched back, say) hash the same.
+
+NottyGame builds a ZobristHash the first time its hash_key is read and
+keeps it up to date through its actions from then on, so games that are
+never hashed pay nothing.  mcts_ai keeps the results of its searches in a
+TranspositionTable keyed by it.  States of the game modules can be hashed
+from scratch with hash_state.
+"""
+
+import random
+
+from card_groups import CARD_INDEX, CARD_NAMES
+
+# Owner index of the deck; players are 1 to num_players.
+DECK = 0
+
+# Keys are drawn from a fixed seed, so hashes are stable between runs.
+_KEY_SEED = 0x4E6F747479
+_keys = {}
+
+
+def zobrist_keys(num_players, copies):
+    """Returns the keys for a table size, made once and shared.
+
+    Returns:
+        tuple: (card keys, turn keys), where card_keys[owner][card][k] is
+        the key of the (k + 1)-th copy of a card and turn_keys[player] the
+        key of the player to move.
+    """
+    keys = _keys.get((num_players, copies))
+    if keys is None:
+        rng = random.Random(_KEY_SEED)
+        card_keys = [[[rng.getrandbits(64) for _ in range(copies)] for _ in CARD_NAMES]
+                     for _ in range(num_players + 1)]
+        turn_keys = [rng.getrandbits(64) for _ in range(num_players + 1)]
+        keys = _keys[(num_players, copies)] = (card_keys, turn_keys)
+    return keys
+
+
+class ZobristHash:
+    """An incrementally updated hash of who holds which cards and who moves.
+
+    Attributes:
+        value (int): The 64-bit hash of the current state.
+        player (int): The player to move.
+    """
+    def __init__(self, num_players, copies=2):
+        self._card_keys, self._turn_keys = zobrist_keys(num_players, copies)
+        self._counts = [[0] * len(CARD_NAMES) for _ in range(num_players + 1)]
+        self.player = 0
+        self.value = 0
+
+    @classmethod
+    def of(cls, state, copies=2):
+        """Hashes a state from scratch.
+
+        Args:
+            state: Anything with player_hands, full_deck and current_player,
+                such as NottyGame, GameState or GameState2.
+        """
+        zobrist = cls(len(state.player_hands), copies)
+        for card_info in state.full_deck:
+            zobrist.add(DECK, card_info)
+        for player_id, hand in state.player_hands.items():
+            for card_info in hand:
+                zobrist.add(player_id, card_info)
+        zobrist.set_player(state.current_player)
+        return zobrist
+
+    def add(self, owner, card_info):
+        """Records one more copy of `card_info` held by `owner`."""
+        counts = self._counts[owner]
+        index = CARD_INDEX[card_info]
+        self.value ^= self._card_keys[owner][index][counts[index]]
+        counts[index] += 1
+
+    def remove(self, owner, card_info):
+        """Records one copy of `card_info` leaving `owner`."""
+        counts = self._counts[owner]
+        index = CARD_INDEX[card_info]
+        counts[index] -= 1
+        self.value ^= self._card_keys[owner][index][counts[index]]
+
+    def move(self, card_info, source, target):
+        self.remove(source, card_info)
+        self.add(target, card_info)
+
+    def set_player(self, player_id):
+        """Records `player_id` as the player to move."""
+        self.value ^= self._turn_keys[self.player] ^ self._turn_keys[player_id]
+        self.player = player_id
+
+
+def hash_state(state, copies=2):
+    """Returns the 64-bit Zobrist hash of a state, computed from scratch."""
+    return ZobristHash.of(state, copies).value
+
+
+class TranspositionTable:
+    """Bounded table of search results keyed by Zobrist hash.
+
+    Each slot, picked by the low bits of the hash, holds two entries: one
+    kept for the deepest search stored there and one that is always
+    replaced.  A deeper result takes the first place and moves the entry it
+    displaces into the second, so expensive results survive a stream of
+    shallow ones while recent positions still get cached.  A shallower
+    result for a state already stored deeper is dropped.
+
+    Entries are (key, depth, value, move) tuples; the full key is stored so
+    a lookup never returns the result of a different state in the same slot.
+
+    Attributes:
+        size (int): Slots in the table, a power of two.
+        hits (int): Lookups that found their state.
+        misses (int): Lookups that did not.
+        replacements (int): Stores that overwrote another state's entry.
+    """
+    def __init__(self, size_bits=16):
+        self.size = 1 << size_bits
+        self._mask = self.size - 1
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.replacements = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self._deep) + sum(entry is not None for entry in self._recent)
+
+    def probe(self, key):
+        """Returns the (key, depth, value, move) entry for `key`, or None."""
+        slot = key & self._mask
+        entry = self._deep[slot]
+        if entry is None or entry[0] != key:
+            entry = self._recent[slot]
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, move=None):
+        """Stores a search result for `key`, searched to `depth`."""
+        slot = key & self._mask
+        entry = (key, depth, value, move)
+        deep = self._deep[slot]
+        if deep is not None and deep[0] == key and depth < deep[1]:
+            return
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            self._deep[slot] = entry
+            if deep is not None and deep[0] != key:
+                self._store_recent(slot, deep)
+        else:
+            self._store_recent(slot, entry)
+
+    def _store_recent(self, slot, entry):
+        recent = self._recent[slot]
+        if recent is not None and recent[0] != entry[0]:
+            self.replacements += 1
+        self._recent[slot] = entry
+
+    def clear(self):
+        """Empties the table and resets the counters."""
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self.hits = self.misses = self.replacements = 0
+
+    def stats(self):
+        """Returns the counters as a dict, for tuning size_bits."""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'replacements': self.replacements,
+                'size': self.size, 'hit_rate': self.hits / lookups if lookups else 0.0}